@@ -0,0 +1,259 @@
+"""Synthetic dataset generator for the PO Approvals benchmarks.
+
+Creates a reproducible set of users, suppliers, parts, purchase orders with
+line items, and approval histories. Everything is written with bulk_create,
+so that 100k orders can be generated in a reasonable time.
+"""
+
+import random
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+# Prefix for all generated objects, so they are easy to recognise
+PREFIX = 'bench'
+
+# Name of the group given purchase order permissions
+APPROVER_GROUP = f'{PREFIX}-purchasing'
+
+BATCH_SIZE = 1000
+
+
+def create_users(count, rng):
+    """Create approver users with view/change permissions for purchase orders."""
+    from django.contrib.auth import get_user_model
+    from django.contrib.auth.models import Group, Permission
+
+    User = get_user_model()
+
+    group, _ = Group.objects.get_or_create(name=APPROVER_GROUP)
+
+    # Use InvenTree's role rulesets where available, so that the
+    # permissions are not reset when the group is synchronised
+    try:
+        from users.models import RuleSet
+
+        RuleSet.objects.filter(group=group, name='purchase_order').update(
+            can_view=True, can_change=True, can_add=True
+        )
+        group.save()
+    except ImportError:
+        pass
+
+    group.permissions.add(*Permission.objects.filter(
+        content_type__app_label='order',
+        codename__in=['view_purchaseorder', 'change_purchaseorder'],
+    ))
+
+    users = User.objects.bulk_create([
+        User(
+            username=f'{PREFIX}-user-{i:05d}',
+            first_name=rng.choice(['Alex', 'Sam', 'Jo', 'Chris', 'Pat', 'Robin']),
+            last_name=f'User{i}',
+            email=f'{PREFIX}-user-{i:05d}@example.com',
+            is_active=True,
+        )
+        for i in range(count)
+    ], batch_size=BATCH_SIZE)
+
+    users = list(User.objects.filter(username__startswith=f'{PREFIX}-user-').order_by('pk'))
+    group.user_set.add(*users)
+
+    return users
+
+
+def create_suppliers(count):
+    """Create supplier companies."""
+    from company.models import Company
+
+    Company.objects.bulk_create([
+        Company(
+            name=f'{PREFIX} Supplier {i:04d}',
+            description='Generated supplier',
+            is_supplier=True,
+            currency='USD',
+        )
+        for i in range(count)
+    ], batch_size=BATCH_SIZE)
+
+    return list(Company.objects.filter(name__startswith=f'{PREFIX} Supplier').order_by('pk'))
+
+
+def create_supplier_parts(suppliers, parts_per_supplier, rng):
+    """Create purchaseable parts, in a few categories, with one supplier part each."""
+    from company.models import SupplierPart
+    from part.models import Part, PartCategory
+
+    categories = [
+        PartCategory.objects.create(name=f'{PREFIX} Category {i}', description='Generated')
+        for i in range(5)
+    ]
+
+    Part.objects.bulk_create([
+        Part(
+            name=f'{PREFIX} Part {i:06d}',
+            description='Generated part',
+            category=rng.choice(categories),
+            purchaseable=True,
+            active=True,
+        )
+        for i in range(len(suppliers) * parts_per_supplier)
+    ], batch_size=BATCH_SIZE)
+
+    parts = list(Part.objects.filter(name__startswith=f'{PREFIX} Part').order_by('pk'))
+
+    SupplierPart.objects.bulk_create([
+        SupplierPart(
+            part=part,
+            supplier=suppliers[i // parts_per_supplier],
+            SKU=f'{PREFIX}-SKU-{i:06d}',
+        )
+        for i, part in enumerate(parts)
+    ], batch_size=BATCH_SIZE)
+
+    supplier_parts = {}
+    for supplier_part in SupplierPart.objects.filter(SKU__startswith=f'{PREFIX}-SKU-'):
+        supplier_parts.setdefault(supplier_part.supplier_id, []).append(supplier_part)
+
+    return supplier_parts
+
+
+def make_approval_history(rng, users, requested_at):
+    """Build a realistic approval history for one order.
+
+    Returns:
+        The approval data dict to store in the order metadata
+    """
+    from inventree_approvals import helpers
+
+    outcome = rng.choices(
+        ['none', 'pending', 'approved', 'rejected', 'rejected_then_approved'],
+        weights=[40, 20, 25, 5, 10],
+    )[0]
+
+    data = {'approvals': []}
+
+    if outcome == 'none':
+        return data
+
+    requester, approver = rng.sample(users, 2)
+
+    def entry(round_number, entry_status, decided=True):
+        return {
+            'level': 1,
+            'round': round_number,
+            'status': entry_status,
+            'requested_by_id': requester.pk,
+            'requested_by_name': requester.get_full_name(),
+            'requested_approver_id': approver.pk,
+            'requested_approver_name': approver.get_full_name(),
+            'actual_approver_id': approver.pk if decided else None,
+            'actual_approver_name': approver.get_full_name() if decided else None,
+            'requested_at': requested_at.isoformat(),
+            'decided_at': (requested_at + timedelta(hours=rng.randint(1, 96))).isoformat() if decided else None,
+            'notes': rng.choice(['', 'Urgent', 'Freight cost too high', 'Budget approved']),
+        }
+
+    if outcome == 'pending':
+        data['approvals'] = [entry(1, 'pending', decided=False)]
+    elif outcome == 'approved':
+        data['approvals'] = [entry(1, 'approved')]
+    elif outcome == 'rejected':
+        data['approvals'] = [entry(1, 'rejected')]
+    else:
+        data['approvals'] = [entry(1, 'rejected'), entry(2, 'approved')]
+
+    helpers.update_approval_state(data, required=1)
+
+    return data
+
+
+def create_purchase_orders(count, users, suppliers, supplier_parts, rng, max_lines=10):
+    """Create purchase orders with line items and approval histories."""
+    from djmoney.money import Money
+    from order.models import PurchaseOrder, PurchaseOrderLineItem
+    from order.status_codes import PurchaseOrderStatus
+
+    from inventree_approvals import helpers
+
+    statuses = [
+        PurchaseOrderStatus.PENDING.value,
+        PurchaseOrderStatus.PLACED.value,
+        PurchaseOrderStatus.COMPLETE.value,
+    ]
+
+    start = datetime(2024, 1, 1)
+
+    for batch_start in range(0, count, BATCH_SIZE):
+        batch_range = range(batch_start, min(batch_start + BATCH_SIZE, count))
+
+        orders = []
+        lines = []
+
+        for i in batch_range:
+            supplier = rng.choice(suppliers)
+            created = start + timedelta(minutes=i * 7)
+            approval_data = make_approval_history(rng, users, created)
+
+            order_lines = [
+                (rng.choice(supplier_parts[supplier.pk]), rng.randint(1, 500), Decimal(rng.randint(50, 50000)) / 100)
+                for _ in range(rng.randint(1, max_lines))
+            ]
+
+            order = PurchaseOrder(
+                reference=f'PO-{i + 1:06d}',
+                reference_int=i + 1,
+                description=f'Generated order {i + 1}',
+                supplier=supplier,
+                status=rng.choice(statuses) if approval_data['approvals'] else PurchaseOrderStatus.PENDING.value,
+                created_by=rng.choice(users),
+                creation_date=created.date(),
+                order_currency='USD',
+                total_price=Money(sum(q * p for _, q, p in order_lines), 'USD'),
+                metadata={helpers.METADATA_KEY: approval_data},
+            )
+
+            orders.append(order)
+            lines.append(order_lines)
+
+        PurchaseOrder.objects.bulk_create(orders)
+
+        # bulk_create does not return primary keys on every backend
+        orders = PurchaseOrder.objects.filter(
+            reference_int__gte=batch_range.start + 1,
+            reference_int__lte=batch_range.stop,
+        ).order_by('reference_int')
+
+        PurchaseOrderLineItem.objects.bulk_create([
+            PurchaseOrderLineItem(
+                order=order,
+                part=supplier_part,
+                quantity=quantity,
+                purchase_price=Money(price, 'USD'),
+            )
+            for order, order_lines in zip(orders, lines)
+            for supplier_part, quantity, price in order_lines
+        ], batch_size=BATCH_SIZE)
+
+
+def generate(orders=1000, seed=42):
+    """Generate the full benchmark dataset.
+
+    The number of users, suppliers and parts scales with the number of
+    orders. The same seed always produces the same dataset.
+
+    Args:
+        orders: Number of purchase orders to create
+        seed: Random seed
+
+    Returns:
+        List of the generated users
+    """
+    rng = random.Random(seed)
+
+    users = create_users(max(10, orders // 200), rng)
+    suppliers = create_suppliers(max(5, orders // 100))
+    supplier_parts = create_supplier_parts(suppliers, 20, rng)
+
+    create_purchase_orders(orders, users, suppliers, supplier_parts, rng)
+
+    return users
@@ -0,0 +1,211 @@
+"""Startup benchmark for the PO Approvals plugin.
+
+Measures what loading the plugin costs, separately from Django and
+InvenTree themselves:
+
+- Import time: a fresh interpreter sets up Django with the plugin registry
+  disabled (INVENTREE_PLUGINS_ENABLED=False), so that the plugin is not
+  loaded during setup, then imports the plugin module, instantiates the
+  plugin and builds its URL patterns (what a registry load does), under
+  ``python -X importtime``. Only the modules imported after Django setup
+  are counted.
+- Reload time: the plugin registry is reloaded in-process, and the time of
+  each reload is reported.
+
+The script exits with an error if the plugin load imports any of the
+LAZY_MODULES, so it can also be run as a check.
+
+Run from the InvenTree backend directory (or set INVENTREE_BACKEND), with
+the plugin installed:
+
+    python /path/to/inventree-approvals/benchmarks/importtime.py --reloads 10
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Printed to stderr by the child process between Django setup and the plugin import
+MARKER = 'po-approvals-import-start'
+
+# Printed to stderr by the child process, followed by the watched modules already imported by Django setup
+PRELOADED_MARKER = 'po-approvals-preloaded:'
+
+# Modules which must not be imported by the plugin load (exit code 1 if they are)
+LAZY_MODULES = (
+    'inventree_approvals.action_links',
+    'inventree_approvals.api',
+    'inventree_approvals.metrics',
+    'inventree_approvals.profiling',
+    'inventree_approvals.replicas',
+    'inventree_approvals.search',
+    'inventree_approvals.throttling',
+    'inventree_approvals.webhooks',
+    'rest_framework.views',
+)
+
+CHILD_SCRIPT = f"""
+import os, sys
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'InvenTree.settings')
+import django
+django.setup()
+preloaded = sorted(
+    name for name in sys.modules
+    if name.split('.')[0] == 'inventree_approvals' or name in {LAZY_MODULES!r}
+)
+print({PRELOADED_MARKER!r}, ','.join(preloaded), file=sys.stderr, flush=True)
+print({MARKER!r}, file=sys.stderr, flush=True)
+from inventree_approvals.approvals_plugin import POApprovalsPlugin
+POApprovalsPlugin().setup_urls()
+"""
+
+
+def child_environment():
+    """Build the environment for the child interpreter."""
+    env = dict(os.environ)
+    paths = [REPO_ROOT]
+
+    if env.get('INVENTREE_BACKEND'):
+        paths.insert(0, env['INVENTREE_BACKEND'])
+
+    env['PYTHONPATH'] = os.pathsep.join(paths + [env.get('PYTHONPATH', '')])
+
+    # Otherwise the registry loads the plugin during setup, before the marker
+    env['INVENTREE_PLUGINS_ENABLED'] = 'False'
+
+    return env
+
+
+def parse_preloaded(lines):
+    """Get the watched modules which Django setup had already imported."""
+    for line in lines:
+        if line.startswith(PRELOADED_MARKER):
+            return [name for name in line[len(PRELOADED_MARKER):].strip().split(',') if name]
+
+    return []
+
+
+def parse_importtime(stderr):
+    """Parse the -X importtime output after the marker.
+
+    Returns:
+        Tuple of (list of (module, self microseconds, cumulative microseconds)
+        tuples, list of the watched modules imported before the marker)
+
+    Raises:
+        RuntimeError: If the plugin import failed, or the plugin was already
+            imported by Django setup (so its import could not be measured)
+    """
+    lines = stderr.splitlines()
+
+    if MARKER not in lines:
+        raise RuntimeError(f'Plugin import failed:\n{stderr}')
+
+    preloaded = parse_preloaded(lines)
+    plugin_preloaded = [name for name in preloaded if name.split('.')[0] == 'inventree_approvals']
+
+    if plugin_preloaded:
+        raise RuntimeError(
+            f"The plugin was imported during Django setup, so nothing can be measured: {', '.join(plugin_preloaded)}"
+        )
+
+    modules = []
+
+    for line in lines[lines.index(MARKER) + 1:]:
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        modules.append((name.strip(), int(self_us), int(cumulative_us)))
+
+    return modules, preloaded
+
+
+def measure_imports(runs):
+    """Measure the plugin import in fresh interpreters, keeping the fastest run."""
+    best = None
+
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', CHILD_SCRIPT],
+            capture_output=True,
+            text=True,
+            env=child_environment(),
+        )
+
+        modules, preloaded = parse_importtime(result.stderr)
+        total = sum(self_us for _, self_us, _ in modules)
+
+        if best is None or total < best[0]:
+            best = (total, modules, preloaded)
+
+    return best
+
+
+def measure_reloads(count):
+    """Time full reloads of the plugin registry in this process."""
+    backend = os.environ.get('INVENTREE_BACKEND')
+    if backend:
+        sys.path.insert(0, backend)
+
+    sys.path.insert(0, REPO_ROOT)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'InvenTree.settings')
+
+    import django
+
+    django.setup()
+
+    from plugin import registry
+
+    timings = []
+
+    for _ in range(count):
+        start = time.perf_counter()
+        registry.reload_plugins(full_reload=True, force_reload=True, collect=True)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    return timings
+
+
+def main():
+    """Run the startup benchmark."""
+    parser = argparse.ArgumentParser(description='Benchmark the PO Approvals plugin load time')
+    parser.add_argument('--runs', type=int, default=5, help='Fresh interpreter runs (the fastest is reported)')
+    parser.add_argument('--top', type=int, default=15, help='Number of slowest modules to list')
+    parser.add_argument('--reloads', type=int, default=0, help='Number of plugin registry reloads to time')
+    args = parser.parse_args()
+
+    total, modules, preloaded = measure_imports(args.runs)
+    plugin_modules = [m for m in modules if m[0].startswith('inventree_approvals')]
+
+    print(f'Modules imported by the plugin load: {len(modules)} ({total / 1000:.1f} ms)')
+    print(f"Plugin modules: {', '.join(name for name, _, _ in plugin_modules)}")
+
+    print(f"\n{'module':<60}{'self ms':>10}{'cumul. ms':>12}")
+    for name, self_us, cumulative_us in sorted(modules, key=lambda m: m[1], reverse=True)[:args.top]:
+        print(f'{name:<60}{self_us / 1000:>10.2f}{cumulative_us / 1000:>12.2f}')
+
+    imported = sorted({name for name, _, _ in modules}.intersection(LAZY_MODULES))
+
+    # Imported by InvenTree itself, so the plugin load cannot be checked for them
+    if preloaded:
+        print(f"\nAlready imported by Django setup (not checked): {', '.join(preloaded)}")
+
+    if args.reloads:
+        timings = sorted(measure_reloads(args.reloads))
+        print(
+            f'\nRegistry reload: min {timings[0]:.1f} ms, '
+            f'median {timings[len(timings) // 2]:.1f} ms, max {timings[-1]:.1f} ms'
+        )
+
+    if imported:
+        print(f"\nModules which should be imported lazily: {', '.join(imported)}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
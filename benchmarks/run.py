@@ -0,0 +1,444 @@
+"""Benchmark runner for the PO Approvals plugin API.
+
+Generates a synthetic dataset in a fresh test database, then times every
+endpoint registered by the plugin's setup_urls(), recording latency
+percentiles, query counts and peak memory. Results are written to a JSON
+file, which can be compared against a previous baseline.
+
+Run from the InvenTree backend directory (or set INVENTREE_BACKEND), with
+the plugin installed. The database backend is whatever InvenTree is
+configured to use (e.g. INVENTREE_DB_ENGINE=sqlite3 or postgresql):
+
+    python /path/to/inventree-approvals/benchmarks/run.py --orders 10000 \\
+        --output benchmarks/results/sqlite-10k.json \\
+        --compare benchmarks/results/sqlite-10k-baseline.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# How each plugin URL is exercised: HTTP method, which orders (or tokens) it needs and the payload
+ENDPOINTS = {
+    'approval-status': ('get', 'any', None),
+    'approval-request': ('post', 'requestable', {'notes': 'Benchmark request'}),
+    'approval-approve': ('post', 'pending', {'notes': 'Benchmark approval'}),
+    'approval-reject': ('post', 'pending', {'notes': 'Benchmark rejection'}),
+    'approval-pending-list': ('get', None, None),
+    'approval-pending-any-approver': ('get', None, None),
+    'approval-users': ('get', None, None),
+    'po-list-with-approvals': ('get', None, None),
+    'approval-search': ('get', None, {'q': 'freight cost'}),
+    'approval-turnaround-analytics': ('get', None, None),
+    'approval-profiles': ('get', None, None),
+    'approval-metrics': ('get', None, None),
+    'approval-action-link': ('get', 'action-link', None),
+}
+
+# Pending orders set aside for the action link pages
+ACTION_LINK_ORDERS = 10
+
+# Plugin settings applied for the run (and restored afterwards)
+BENCHMARK_SETTINGS = {
+    # The action link pages only render when the links are enabled
+    'EMAIL_ACTION_LINKS': True,
+    # Back-to-back calls would otherwise be answered with 429s
+    'THROTTLE_USER_RATE': '',
+    'THROTTLE_GLOBAL_RATE': '',
+    'THROTTLE_CONCURRENCY': 0,
+}
+
+# Metrics compared against the baseline
+COMPARED_METRICS = ('p50_ms', 'p95_ms', 'queries', 'peak_memory_kb')
+
+
+def setup_django():
+    """Configure Django using the InvenTree settings."""
+    backend = os.environ.get('INVENTREE_BACKEND')
+    if backend:
+        sys.path.insert(0, backend)
+
+    sys.path.insert(0, REPO_ROOT)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'InvenTree.settings')
+
+    import django
+
+    django.setup()
+
+
+def create_database(keepdb=False):
+    """Create (or reuse) the test database which the benchmark runs against.
+
+    A database left over from an earlier run without keepdb is replaced,
+    rather than prompting.
+
+    Returns:
+        Tuple of (connection, name of the configured database)
+    """
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+
+    setup_test_environment()
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=keepdb)
+
+    return connection, old_name
+
+
+def destroy_database(connection, old_name, keepdb=False):
+    """Destroy the test database (unless it is kept), and switch back to the configured one."""
+    from django.test.utils import teardown_test_environment
+
+    connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=keepdb)
+    teardown_test_environment()
+
+
+def load_plugin():
+    """Activate the approvals plugin and return it."""
+    from plugin import registry
+
+    plugin = registry.get_plugin('approvals')
+
+    if plugin is None:
+        registry.set_plugin_state('approvals', True)
+        plugin = registry.get_plugin('approvals')
+
+    if plugin is None:
+        raise RuntimeError('The approvals plugin is not installed')
+
+    return plugin
+
+
+@contextmanager
+def plugin_settings(plugin, values):
+    """Apply plugin settings for the duration of the benchmark, then restore them."""
+    previous = {key: plugin.get_setting(key) for key in values}
+
+    for key, value in values.items():
+        plugin.set_setting(key, value)
+
+    try:
+        yield
+    finally:
+        for key, value in previous.items():
+            plugin.set_setting(key, value)
+
+
+def percentile(values, pct):
+    """Return the given percentile of a list of values (nearest rank)."""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def get_order_pools(rng):
+    """Collect the orders each kind of endpoint can be exercised against.
+
+    Returns:
+        Dict with 'any', 'requestable', 'pending' and 'action-link' lists.
+        Pending entries are (order pk, approver user) tuples, so that each
+        approval is made by the requested approver. Action link entries are
+        approve link tokens of pending approvals.
+    """
+    from django.contrib.auth import get_user_model
+    from order.models import PurchaseOrder
+    from order.status_codes import PurchaseOrderStatus
+
+    from inventree_approvals import action_links, helpers
+
+    users = {user.pk: user for user in get_user_model().objects.filter(is_active=True)}
+
+    pools = {'any': [], 'requestable': [], 'pending': [], 'action-link': []}
+
+    for order in PurchaseOrder.objects.only('pk', 'status', 'metadata').iterator():
+        state = helpers.get_approval_state(order)
+        pools['any'].append(order.pk)
+
+        if order.status != PurchaseOrderStatus.PENDING.value:
+            continue
+
+        if state['status'] in ('none', 'rejected'):
+            pools['requestable'].append(order.pk)
+        elif state['status'] == 'pending' and state['pending_approver_ids']:
+            approver = users.get(state['pending_approver_ids'][0])
+            if approver:
+                pools['pending'].append((order.pk, approver))
+
+    for pool in pools.values():
+        rng.shuffle(pool)
+
+    # Orders reserved for the action link pages, which are not approved or rejected by the run
+    reserved = dict(pools['pending'][:ACTION_LINK_ORDERS])
+    pools['pending'] = pools['pending'][ACTION_LINK_ORDERS:]
+
+    for order in PurchaseOrder.objects.filter(pk__in=list(reserved)).order_by('pk'):
+        approver = reserved[order.pk]
+
+        for approval in helpers.get_pending_approvals(order):
+            if approval.get('requested_approver_id') == approver.pk:
+                pools['action-link'].append(action_links.make_tokens(order, approval, approver)['approve'])
+                break
+
+    return pools
+
+
+def get_busiest_approver():
+    """Get the user with the most pending approval requests."""
+    from collections import Counter
+
+    from django.contrib.auth import get_user_model
+    from order.models import PurchaseOrder
+
+    from inventree_approvals import helpers
+
+    counts = Counter()
+    for order in PurchaseOrder.objects.only('pk', 'metadata').iterator():
+        counts.update(helpers.get_approval_state(order).get('pending_approver_ids', []))
+
+    User = get_user_model()
+
+    if counts:
+        return User.objects.get(pk=counts.most_common(1)[0][0])
+
+    return User.objects.filter(is_active=True).first()
+
+
+def call_endpoint(pattern, method, user, payload, kwargs):
+    """Call a plugin view directly, including response rendering."""
+    from rest_framework.test import APIRequestFactory, force_authenticate
+
+    factory = APIRequestFactory()
+    path = f'/plugin/approvals/{pattern.pattern}'
+
+    if method == 'post':
+        request = factory.post(path, payload or {}, format='json')
+    else:
+        # GET payloads are sent as query parameters
+        request = factory.get(path, payload or {})
+
+    force_authenticate(request, user=user)
+    response = pattern.callback(request, **kwargs)
+
+    if hasattr(response, 'render'):
+        response.render()
+
+    return response
+
+
+def benchmark_endpoint(pattern, pools, default_user, iterations):
+    """Time a single endpoint.
+
+    Returns:
+        Dict of metrics for the endpoint, or None if it could not be exercised
+    """
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    method, pool_name, payload = ENDPOINTS.get(pattern.name, ('get', None, None))
+
+    # URL arguments which the harness cannot provide (e.g. a new endpoint not in ENDPOINTS)
+    if pool_name is None and pattern.pattern.converters:
+        return None
+
+    def next_call():
+        """Get the user and URL kwargs for the next call."""
+        if pool_name is None:
+            return default_user, {}
+
+        if pool_name == 'action-link':
+            # Showing the confirmation page does not use the token up
+            token = pools['action-link'][0]
+            pools['action-link'].append(pools['action-link'].pop(0))
+            return default_user, {'token': token}
+
+        if pool_name == 'pending':
+            pk, user = pools['pending'].pop()
+            return user, {'pk': pk}
+
+        if pool_name == 'requestable':
+            return default_user, {'pk': pools['requestable'].pop()}
+
+        pk = pools['any'][0]
+        pools['any'].append(pools['any'].pop(0))
+        return default_user, {'pk': pk}
+
+    # Mutating endpoints consume one order per call (plus one for the memory pass)
+    if pool_name in ('pending', 'requestable'):
+        iterations = min(iterations, len(pools[pool_name]) - 1)
+    elif pool_name is not None and not pools[pool_name]:
+        return None
+
+    if iterations < 1:
+        return None
+
+    timings = []
+    queries = []
+    status_codes = {}
+
+    for _ in range(iterations):
+        user, kwargs = next_call()
+
+        with CaptureQueriesContext(connection) as context:
+            start = time.perf_counter()
+            response = call_endpoint(pattern, method, user, payload, kwargs)
+            timings.append((time.perf_counter() - start) * 1000)
+
+        queries.append(len(context.captured_queries))
+        status_codes[str(response.status_code)] = status_codes.get(str(response.status_code), 0) + 1
+
+    # Peak memory is measured separately, as tracing slows every allocation down
+    user, kwargs = next_call()
+    tracemalloc.start()
+    call_endpoint(pattern, method, user, payload, kwargs)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'method': method.upper(),
+        'iterations': iterations,
+        'p50_ms': round(percentile(timings, 50), 3),
+        'p95_ms': round(percentile(timings, 95), 3),
+        'mean_ms': round(sum(timings) / len(timings), 3),
+        'queries': percentile(queries, 50),
+        'peak_memory_kb': round(peak / 1024, 1),
+        'status_codes': status_codes,
+    }
+
+
+def compare(results, baseline, threshold):
+    """Print the differences against a baseline.
+
+    Returns:
+        True if any metric regressed by more than the threshold
+    """
+    regressed = False
+
+    print(f"\n{'endpoint':<32}{'metric':<16}{'baseline':>12}{'current':>12}{'change':>10}")
+
+    for name, metrics in results['endpoints'].items():
+        previous = baseline.get('endpoints', {}).get(name)
+        if not previous:
+            print(f'{name:<32}(new endpoint)')
+            continue
+
+        for metric in COMPARED_METRICS:
+            old, new = previous.get(metric), metrics.get(metric)
+            if old is None or new is None:
+                continue
+
+            change = (new - old) / old if old else (1.0 if new else 0.0)
+            flag = ''
+
+            # Query counts are deterministic, so any increase is a regression
+            if (metric == 'queries' and new > old) or (metric != 'queries' and change > threshold):
+                flag = '  <-- regression'
+                regressed = True
+
+            print(f'{name:<32}{metric:<16}{old:>12}{new:>12}{change:>+10.1%}{flag}')
+
+    return regressed
+
+
+def run(args, connection):
+    """Generate the dataset if needed, then benchmark every endpoint."""
+    import random
+
+    from django import get_version
+    from order.models import PurchaseOrder
+
+    from benchmarks import dataset
+
+    if not PurchaseOrder.objects.exists():
+        start = time.perf_counter()
+        dataset.generate(orders=args.orders, seed=args.seed)
+        print(f'Generated {args.orders} orders in {time.perf_counter() - start:.1f}s')
+
+    from inventree_approvals import analytics, approval_index, search
+
+    # The dataset is written with bulk_create, which bypasses the derived tables
+    if analytics.rollups_available():
+        analytics.rebuild_rollups()
+
+    if approval_index.index_available():
+        approval_index.rebuild_index()
+
+    if search.search_available():
+        search.rebuild_search_index()
+
+    plugin = load_plugin()
+
+    results = {
+        'meta': {
+            'orders': args.orders,
+            'seed': args.seed,
+            'iterations': args.iterations,
+            'database': connection.vendor,
+            'python': platform.python_version(),
+            'django': get_version(),
+            'plugin_version': plugin.VERSION,
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+        },
+        'endpoints': {},
+    }
+
+    with plugin_settings(plugin, BENCHMARK_SETTINGS):
+        pools = get_order_pools(random.Random(args.seed))
+        default_user = get_busiest_approver()
+
+        for pattern in plugin.setup_urls():
+            metrics = benchmark_endpoint(pattern, pools, default_user, args.iterations)
+
+            if metrics is None:
+                print(f'{pattern.name:<32}skipped (no suitable orders)')
+                continue
+
+            results['endpoints'][pattern.name] = metrics
+            print(
+                f"{pattern.name:<32}p50 {metrics['p50_ms']:>9.2f} ms  p95 {metrics['p95_ms']:>9.2f} ms  "
+                f"{metrics['queries']:>6} queries  {metrics['peak_memory_kb']:>10.1f} KB"
+            )
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+            f.write('\n')
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+        if compare(results, baseline, args.threshold):
+            sys.exit(1)
+
+
+def main():
+    """Run the benchmarks."""
+    parser = argparse.ArgumentParser(description='Benchmark the PO Approvals plugin API')
+    parser.add_argument('--orders', type=int, default=1000, help='Number of purchase orders to generate')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed for the dataset')
+    parser.add_argument('--iterations', type=int, default=25, help='Calls per endpoint')
+    parser.add_argument('--output', help='Write the results to this JSON file')
+    parser.add_argument('--compare', help='Compare the results against this baseline JSON file')
+    parser.add_argument('--threshold', type=float, default=0.25, help='Allowed relative slowdown before flagging a regression')
+    parser.add_argument('--keepdb', action='store_true', help='Reuse an existing benchmark database')
+    args = parser.parse_args()
+
+    setup_django()
+    connection, old_name = create_database(keepdb=args.keepdb)
+
+    try:
+        run(args, connection)
+    finally:
+        destroy_database(connection, old_name, keepdb=args.keepdb)
+
+
+if __name__ == '__main__':
+    main()
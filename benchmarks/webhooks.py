@@ -0,0 +1,298 @@
+"""Delivery benchmark for the PO Approvals event webhooks.
+
+Starts three local stub subscribers - one which answers at once, one which
+answers slowly and one which always fails - and pushes a stream of events
+through a WebhookDispatcher, delivering with the plugin's own post_batch().
+It reports:
+
+- Enqueue time: what publishing an event costs the request which raised it
+- Batching: requests and events per request received by each subscriber
+- Latency: the time from enqueueing an event to its receipt, per subscriber
+- Backoff: the intervals between the attempts of the failing subscriber
+
+The script exits with an error if a signature does not verify, if the fast
+subscriber does not receive every event, or if its p95 latency reaches the
+delay of the slow subscriber (i.e. the slow or failing subscriber held it
+up), so it can also be run as a check.
+
+InvenTree is not needed, only Django, requests and structlog:
+
+    python /path/to/inventree-approvals/benchmarks/webhooks.py --events 500 --rate 200
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SECRET = 'benchmark-secret'
+
+
+def percentile(values, pct):
+    """Return the given percentile of a list of values (nearest rank)."""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+class Subscriber:
+    """A stub webhook endpoint, recording what it receives."""
+
+    def __init__(self, name, delay=0.0, status=200):
+        """Initialize the subscriber.
+
+        Args:
+            name: Name of the subscriber in the report
+            delay: Time taken to answer each request (seconds)
+            status: HTTP status code of every response
+        """
+        self.name = name
+        self.delay = delay
+        self.status = status
+        self.lock = threading.Lock()
+        # (received, number of events) per request
+        self.requests = []
+        # Event id -> time of its first receipt
+        self.received = {}
+        self.bad_signatures = 0
+
+        subscriber = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                subscriber.handle(self)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}/hook'
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def handle(self, request):
+        """Record a delivery, then answer it after the configured delay."""
+        from inventree_approvals import webhooks
+
+        received = time.monotonic()
+        body = request.rfile.read(int(request.headers['Content-Length']))
+        signature = webhooks.sign(SECRET, request.headers[webhooks.TIMESTAMP_HEADER], body)
+        events = json.loads(body)['events']
+
+        with self.lock:
+            self.requests.append((received, len(events)))
+
+            if signature != request.headers[webhooks.SIGNATURE_HEADER]:
+                self.bad_signatures += 1
+
+            if self.status < 300:
+                for event in events:
+                    self.received.setdefault(event['id'], received)
+
+        time.sleep(self.delay)
+
+        request.send_response(self.status)
+        request.send_header('Content-Length', '0')
+        request.end_headers()
+
+    def stop(self):
+        """Stop the stub server."""
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def setup_django():
+    """Configure Django with its defaults (the local-memory cache is all the metrics need)."""
+    sys.path.insert(0, REPO_ROOT)
+
+    import logging
+
+    import structlog
+    from django.conf import settings
+
+    if not settings.configured:
+        settings.configure()
+
+    # The failing subscriber logs a warning per attempt, which is expected here
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.CRITICAL))
+
+
+def publish(dispatcher, subscriptions, count, rate):
+    """Enqueue events at the given rate, as the API requests would.
+
+    Returns:
+        Tuple of (event id -> enqueue time, list of enqueue durations in ms)
+    """
+    enqueued = {}
+    durations = []
+    interval = 1 / rate if rate else 0
+    start = time.monotonic()
+
+    for i in range(count):
+        event = {
+            'id': uuid.uuid4().hex,
+            'event': 'approval.approved',
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'order': {'pk': i + 1, 'reference': f'PO-{i + 1:05d}', 'supplier': 1},
+        }
+
+        enqueued[event['id']] = time.monotonic()
+        begin = time.perf_counter()
+        dispatcher.enqueue(subscriptions, event)
+        durations.append((time.perf_counter() - begin) * 1000)
+
+        delay = start + (i + 1) * interval - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    return enqueued, durations
+
+
+def wait_for_delivery(dispatcher, timeout):
+    """Wait until every queued event has been delivered or dropped.
+
+    Returns:
+        True if the queues drained before the timeout
+    """
+    deadline = time.monotonic() + timeout
+
+    while time.monotonic() < deadline:
+        if not dispatcher.pending():
+            return True
+        time.sleep(0.05)
+
+    return False
+
+
+def summarize(subscriber, enqueued):
+    """Summarize the deliveries received by a subscriber."""
+    requests = sorted(subscriber.requests)
+    latencies = [(received - enqueued[pk]) * 1000 for pk, received in subscriber.received.items()]
+    gaps = [(b[0] - a[0]) * 1000 for a, b in zip(requests, requests[1:])]
+
+    return {
+        'delay_ms': round(subscriber.delay * 1000, 1),
+        'status': subscriber.status,
+        'requests': len(requests),
+        'events_received': sum(n for _, n in requests),
+        'events_delivered': len(subscriber.received),
+        'events_per_request': round(sum(n for _, n in requests) / len(requests), 1) if requests else 0,
+        'p50_ms': round(percentile(latencies, 50), 1) if latencies else None,
+        'p95_ms': round(percentile(latencies, 95), 1) if latencies else None,
+        'max_ms': round(max(latencies), 1) if latencies else None,
+        'request_gaps_ms': [round(gap, 1) for gap in gaps[:10]],
+        'bad_signatures': subscriber.bad_signatures,
+    }
+
+
+def main():
+    """Run the webhook benchmark."""
+    parser = argparse.ArgumentParser(description='Benchmark the PO Approvals webhook delivery')
+    parser.add_argument('--events', type=int, default=500, help='Number of events to publish')
+    parser.add_argument('--rate', type=float, default=200, help='Events published per second (0 for as fast as possible)')
+    parser.add_argument('--workers', type=int, default=4, help='Dispatcher threads (the Webhook Workers setting)')
+    parser.add_argument('--slow-delay', type=float, default=1.0, help='Response time of the slow subscriber (seconds)')
+    parser.add_argument('--retry-backoff', type=float, default=0.1, help='First retry delay (seconds), instead of RETRY_BACKOFF')
+    parser.add_argument('--timeout', type=float, default=120, help='Maximum time to wait for the queues to drain (seconds)')
+    parser.add_argument('--output', help='Write the results to this JSON file')
+    args = parser.parse_args()
+
+    setup_django()
+
+    from inventree_approvals import webhooks
+
+    # The default backoff would make the failing subscriber take minutes to give up
+    webhooks.RETRY_BACKOFF = args.retry_backoff
+
+    subscribers = [
+        Subscriber('fast'),
+        Subscriber('slow', delay=args.slow_delay),
+        Subscriber('failing', status=500),
+    ]
+    subscriptions = [{'url': s.url, 'secret': SECRET, 'events': list(webhooks.EVENTS)} for s in subscribers]
+
+    dispatcher = webhooks.WebhookDispatcher(args.workers, send=webhooks.post_batch)
+
+    try:
+        start = time.monotonic()
+        enqueued, durations = publish(dispatcher, subscriptions, args.events, args.rate)
+        published = time.monotonic() - start
+
+        drained = wait_for_delivery(dispatcher, args.timeout)
+        elapsed = time.monotonic() - start
+    finally:
+        dispatcher.shutdown()
+
+        for subscriber in subscribers:
+            subscriber.stop()
+
+    results = {
+        'meta': {
+            'events': args.events,
+            'rate': args.rate,
+            'workers': args.workers,
+            'batch_delay_s': webhooks.BATCH_DELAY,
+            'max_batch': webhooks.MAX_BATCH,
+            'max_attempts': webhooks.MAX_ATTEMPTS,
+            'retry_backoff_s': args.retry_backoff,
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+        },
+        'enqueue': {
+            'p50_ms': round(percentile(durations, 50), 4),
+            'p95_ms': round(percentile(durations, 95), 4),
+            'max_ms': round(max(durations), 4),
+        },
+        'subscribers': {s.name: summarize(s, enqueued) for s in subscribers},
+        'drained': drained,
+    }
+
+    if drained:
+        print(f'Published {args.events} events in {published:.1f}s, queues drained after {elapsed:.1f}s')
+    else:
+        print(f'Published {args.events} events in {published:.1f}s, queues not drained after {args.timeout:.0f}s')
+    print(
+        f"Enqueue: p50 {results['enqueue']['p50_ms']:.4f} ms  p95 {results['enqueue']['p95_ms']:.4f} ms  "
+        f"max {results['enqueue']['max_ms']:.4f} ms"
+    )
+
+    print(f"\n{'subscriber':<12}{'requests':>10}{'events':>10}{'per req':>10}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}")
+    for name, summary in results['subscribers'].items():
+        latency = [f"{summary[key]:>10.1f}" if summary[key] is not None else f"{'-':>10}" for key in ('p50_ms', 'p95_ms', 'max_ms')]
+        print(
+            f"{name:<12}{summary['requests']:>10}{summary['events_delivered']:>10}"
+            f"{summary['events_per_request']:>10}{''.join(latency)}"
+        )
+
+    failing = results['subscribers']['failing']
+    print(f"\nFailing subscriber, intervals between attempts (ms): {', '.join(str(gap) for gap in failing['request_gaps_ms'])}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+            f.write('\n')
+
+    fast = results['subscribers']['fast']
+    problems = []
+
+    if any(summary['bad_signatures'] for summary in results['subscribers'].values()):
+        problems.append('signatures which do not verify')
+
+    if fast['events_delivered'] != args.events:
+        problems.append(f"the fast subscriber received {fast['events_delivered']} of {args.events} events")
+    elif fast['p95_ms'] >= args.slow_delay * 1000:
+        problems.append('the fast subscriber was held up by the slow or failing one')
+
+    if problems:
+        print(f"\nProblems: {'; '.join(problems)}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
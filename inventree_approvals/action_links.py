@@ -0,0 +1,229 @@
+"""Signed one-click approve / reject links for the approval request emails.
+
+Each approval request email can include an approve link and a reject link.
+The link token is signed with the Django SECRET_KEY (HMAC, via
+django.core.signing), and carries the order, the emailed approver, the
+action, the approval round and a nonce. Tokens expire after
+EMAIL_ACTION_LINK_EXPIRY hours, and the approve and reject links of one
+email share their nonce, so only one of them can be used, once.
+
+The link opens a small confirmation page (so that mail scanners which
+follow links do not decide anything), which posts back to the same URL.
+The token identifies the approver: no session or login is needed, and the
+decision goes through the same checks as the API (can_user_approve).
+
+Used nonces are kept in the Django cache. With the default local-memory
+cache this is per process; a link used twice in different processes still
+fails the approval checks, as the approver has already decided.
+"""
+
+import secrets
+
+from django.core import signing
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.html import format_html
+from django.views import View
+
+import structlog
+
+from .instrumentation import instrumented
+
+logger = structlog.get_logger('inventree')
+
+# Namespace of the token signatures, so tokens cannot be reused elsewhere
+SIGNING_SALT = 'inventree_approvals.action_link'
+
+ACTIONS = ('approve', 'reject')
+
+USED_NONCE_KEY = 'po_approvals:action_link:{nonce}'
+
+
+class ActionLinkError(Exception):
+    """An action link token which cannot be used."""
+
+
+def get_expiry(plugin):
+    """Get the lifetime of action links (seconds)."""
+    return max(int(plugin.get_setting('EMAIL_ACTION_LINK_EXPIRY') or 0), 1) * 3600
+
+
+def make_tokens(order, approval, user):
+    """Make the approve and reject tokens for an approval request email.
+
+    Args:
+        order: The PurchaseOrder instance
+        approval: The pending approval dict the email is about
+        user: The emailed approver (or delegate), who the links act as
+
+    Returns:
+        Dict of action -> token
+    """
+    nonce = secrets.token_urlsafe(12)
+
+    return {
+        action: signing.dumps(
+            {
+                'o': order.pk,
+                'u': user.pk,
+                'a': action,
+                'r': approval.get('round', 1),
+                'n': nonce,
+            },
+            salt=SIGNING_SALT,
+        )
+        for action in ACTIONS
+    }
+
+
+def get_link_urls(order, approval, user, plugin):
+    """Build the absolute approve and reject URLs for an approval request email."""
+    from InvenTree.helpers_model import construct_absolute_url
+
+    return {
+        action: construct_absolute_url(f'/{plugin.base_url.strip("/")}/action/{token}/')
+        for action, token in make_tokens(order, approval, user).items()
+    }
+
+
+def read_token(token, plugin):
+    """Verify a token and return its payload.
+
+    Raises:
+        ActionLinkError: If the token is invalid, expired or already used
+    """
+    try:
+        payload = signing.loads(token, salt=SIGNING_SALT, max_age=get_expiry(plugin))
+    except signing.SignatureExpired:
+        raise ActionLinkError('This link has expired')
+    except signing.BadSignature:
+        raise ActionLinkError('This link is not valid')
+
+    if payload.get('a') not in ACTIONS:
+        raise ActionLinkError('This link is not valid')
+
+    if cache.get(USED_NONCE_KEY.format(nonce=payload['n'])):
+        raise ActionLinkError('This link has already been used')
+
+    return payload
+
+
+def use_token(payload, plugin):
+    """Mark the nonce of a token as used.
+
+    Raises:
+        ActionLinkError: If another request used it first
+    """
+    if not cache.add(USED_NONCE_KEY.format(nonce=payload['n']), True, timeout=get_expiry(plugin)):
+        raise ActionLinkError('This link has already been used')
+
+
+def render_page(title, message, form=None, status=200):
+    """Render the minimal HTML page shown by the action links."""
+    body = format_html(
+        '<!DOCTYPE html><html><head><meta charset="utf-8">'
+        '<meta name="viewport" content="width=device-width, initial-scale=1">'
+        '<title>{}</title>'
+        '<style>body{{font-family:sans-serif;max-width:28em;margin:2em auto;padding:0 1em}}'
+        'textarea{{width:100%;margin:1em 0}}button{{font-size:1.1em;padding:.5em 1.5em}}</style>'
+        '</head><body><h2>{}</h2><p>{}</p>{}</body></html>',
+        title,
+        title,
+        message,
+        form or '',
+    )
+
+    return HttpResponse(body, status=status)
+
+
+class ActionLinkView(View):
+    """Approve or reject a pending approval from a signed email link."""
+
+    http_method_names = ['get', 'post']
+
+    def load(self, token):
+        """Load the plugin, token payload, order and user of a request.
+
+        Raises:
+            ActionLinkError: If the link cannot be used
+        """
+        from django.contrib.auth import get_user_model
+
+        from order.models import PurchaseOrder
+        from plugin import registry
+
+        plugin = registry.get_plugin('approvals')
+
+        if not plugin or not plugin.get_setting('EMAIL_ACTION_LINKS'):
+            raise ActionLinkError('Approval links are disabled')
+
+        payload = read_token(token, plugin)
+
+        order = PurchaseOrder.objects.filter(pk=payload['o']).first()
+        user = get_user_model().objects.filter(pk=payload['u'], is_active=True).first()
+
+        if order is None or user is None:
+            raise ActionLinkError('This link is not valid')
+
+        return plugin, payload, order, user
+
+    @instrumented
+    def get(self, request, token):
+        """Show the confirmation form for the action."""
+        try:
+            plugin, payload, order, user = self.load(token)
+        except ActionLinkError as e:
+            return render_page('Approval link', str(e), status=400)
+
+        action = payload['a']
+
+        form = format_html(
+            '<form method="post"><label>Notes (optional)<textarea name="notes" rows="3"></textarea></label>'
+            '<button type="submit">{}</button></form>',
+            action.capitalize(),
+        )
+
+        return render_page(
+            f'{action.capitalize()} {order.reference}',
+            f'{action.capitalize()} purchase order {order.reference} as {user.get_full_name() or user.username}?',
+            form=form,
+        )
+
+    @instrumented
+    def post(self, request, token):
+        """Approve or reject the order."""
+        from . import api, helpers
+
+        try:
+            plugin, payload, order, user = self.load(token)
+        except ActionLinkError as e:
+            return render_page('Approval link', str(e), status=400)
+
+        action = payload['a']
+        title = f'{action.capitalize()} {order.reference}'
+
+        # The link only applies to the request round it was sent for
+        pending = helpers.get_pending_approval(order)
+        if not pending or pending.get('round', 1) != payload['r']:
+            return render_page(title, 'This approval request is no longer pending', status=409)
+
+        if not user.has_perm('order.change_purchaseorder'):
+            return render_page(title, 'Permission denied', status=403)
+
+        can_approve, reason = helpers.can_user_approve(user, order, plugin)
+        if not can_approve:
+            return render_page(title, reason, status=403)
+
+        try:
+            use_token(payload, plugin)
+        except ActionLinkError as e:
+            return render_page(title, str(e), status=400)
+
+        data = api.apply_decision(order, user, action == 'approve', request.POST.get('notes', ''), plugin)
+
+        if data is None:
+            return render_page(title, 'This approval request is no longer pending', status=409)
+
+        logger.info('Approval decided from email link', order=order.pk, user=user.pk, action=action)
+
+        return render_page(title, data['message'])
@@ -0,0 +1,298 @@
+"""Approval turnaround analytics for the PO Approvals plugin.
+
+Turnaround is the time from an approval request to its decision. Rather
+than parsing the timestamps out of every order's metadata on each query,
+decisions are aggregated into ApprovalTurnaroundRollup rows (one per
+month, approver, supplier and outcome) holding a count, a sum and a
+histogram. Rows are updated incrementally whenever a decision is recorded,
+and rebuilt from the order metadata by a nightly task, which also corrects
+any drift (e.g. from decisions recorded while the rollup table was
+unavailable).
+
+Percentiles are estimated from the histogram buckets by linear
+interpolation, so their accuracy is bounded by the bucket widths.
+"""
+
+from bisect import bisect_left
+from datetime import date, datetime
+
+import structlog
+
+logger = structlog.get_logger('inventree')
+
+# Histogram bucket upper bounds (seconds); one more bucket counts anything longer
+TURNAROUND_BUCKETS = (
+    60, 300, 900, 1800, 3600, 7200, 14400, 28800, 43200,
+    86400, 172800, 259200, 432000, 604800, 1209600, 2592000,
+)
+
+# Outcomes which are rolled up
+DECISIONS = ('approved', 'rejected', 'auto_approved')
+
+# Dimensions results can be grouped by
+GROUP_BY_FIELDS = {
+    'month': 'month',
+    'approver': 'approver_pk',
+    'supplier': 'supplier_pk',
+    'decision': 'decision',
+}
+
+PERCENTILES = (50, 90, 99)
+
+
+def rollups_available():
+    """Check whether the rollup table is installed (requires app integration)."""
+    from django.apps import apps
+
+    return apps.is_installed('inventree_approvals')
+
+
+def empty_buckets():
+    """Return a zeroed histogram."""
+    return [0] * (len(TURNAROUND_BUCKETS) + 1)
+
+
+def get_decision(approval):
+    """Get the rolled up outcome of an approval entry, or None if it is undecided."""
+    if approval.get('auto_rule'):
+        return 'auto_approved'
+
+    if approval.get('status') in ('approved', 'rejected'):
+        return approval['status']
+
+    return None
+
+
+def get_turnaround(approval):
+    """Get the request-to-decision time of an approval entry.
+
+    Returns:
+        Tuple of (decided_at datetime, seconds), or None if either timestamp is missing
+    """
+    try:
+        requested_at = datetime.fromisoformat(approval['requested_at'])
+        decided_at = datetime.fromisoformat(approval['decided_at'])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+    return decided_at, max(0.0, (decided_at - requested_at).total_seconds())
+
+
+def accumulate(rollups, order, approval):
+    """Add one approval entry to a dict of rollup totals keyed by rollup row."""
+    decision = get_decision(approval)
+    turnaround = get_turnaround(approval)
+
+    if decision is None or turnaround is None:
+        return
+
+    decided_at, seconds = turnaround
+
+    key = (
+        decided_at.date().replace(day=1),
+        approval.get('actual_approver_id') or 0,
+        order.supplier_id or 0,
+        decision,
+    )
+
+    totals = rollups.setdefault(key, {'count': 0, 'total_seconds': 0.0, 'buckets': empty_buckets()})
+    totals['count'] += 1
+    totals['total_seconds'] += seconds
+    totals['buckets'][bisect_left(TURNAROUND_BUCKETS, seconds)] += 1
+
+
+def record_decisions(entries):
+    """Add newly recorded decisions to the rollups.
+
+    Failures are logged rather than raised, as the decision itself has
+    already been saved and the nightly rebuild will include it.
+
+    Args:
+        entries: Iterable of (order, approval dict) tuples
+    """
+    from django.db import transaction
+
+    if not rollups_available():
+        return
+
+    deltas = {}
+    for order, approval in entries:
+        accumulate(deltas, order, approval)
+
+    if not deltas:
+        return
+
+    from .models import ApprovalTurnaroundRollup
+
+    try:
+        with transaction.atomic():
+            for (month, approver_pk, supplier_pk, decision), delta in deltas.items():
+                rollup, _ = ApprovalTurnaroundRollup.objects.select_for_update().get_or_create(
+                    month=month,
+                    approver_pk=approver_pk,
+                    supplier_pk=supplier_pk,
+                    decision=decision,
+                    defaults={'buckets': empty_buckets()},
+                )
+
+                rollup.count += delta['count']
+                rollup.total_seconds += delta['total_seconds']
+                rollup.buckets = [a + b for a, b in zip(rollup.buckets or empty_buckets(), delta['buckets'])]
+                rollup.save()
+    except Exception:
+        logger.exception('Failed to update approval turnaround rollups')
+
+
+def compute_rollups(batch_size=2000):
+    """Compute the rollup totals of every decision from the order metadata.
+
+    Returns:
+        Dict of (month, approver_pk, supplier_pk, decision) -> totals
+    """
+    from order.models import PurchaseOrder
+
+    from . import helpers
+
+    rollups = {}
+
+    orders = PurchaseOrder.objects.filter(
+        metadata__has_key=helpers.METADATA_KEY
+    ).only('pk', 'supplier', 'metadata')
+
+    for order in orders.iterator(chunk_size=batch_size):
+        for approval in helpers.get_approval_data(order).get('approvals', []):
+            accumulate(rollups, order, approval)
+
+    return rollups
+
+
+def read_rollups():
+    """Read the stored rollup totals, keyed as by compute_rollups()."""
+    from .models import ApprovalTurnaroundRollup
+
+    return {
+        (row.month, row.approver_pk, row.supplier_pk, row.decision): {
+            'count': row.count,
+            'total_seconds': row.total_seconds,
+            'buckets': row.buckets,
+        }
+        for row in ApprovalTurnaroundRollup.objects.all()
+    }
+
+
+def write_rollups(rollups):
+    """Replace the stored rollups with the given totals."""
+    from django.db import transaction
+
+    from .models import ApprovalTurnaroundRollup
+
+    with transaction.atomic():
+        ApprovalTurnaroundRollup.objects.all().delete()
+        ApprovalTurnaroundRollup.objects.bulk_create([
+            ApprovalTurnaroundRollup(
+                month=month,
+                approver_pk=approver_pk,
+                supplier_pk=supplier_pk,
+                decision=decision,
+                **totals,
+            )
+            for (month, approver_pk, supplier_pk, decision), totals in rollups.items()
+        ], batch_size=1000)
+
+
+def rebuild_rollups(batch_size=2000):
+    """Rebuild all rollups from the order metadata.
+
+    Returns:
+        Number of rollup rows written
+    """
+    rollups = compute_rollups(batch_size=batch_size)
+    write_rollups(rollups)
+
+    logger.info('Approval turnaround rollups rebuilt', rows=len(rollups))
+
+    return len(rollups)
+
+
+def estimate_percentile(buckets, pct):
+    """Estimate a percentile (seconds) from histogram bucket counts."""
+    count = sum(buckets)
+
+    if not count:
+        return None
+
+    rank = pct / 100 * count
+    cumulative = 0
+
+    for i, n in enumerate(buckets):
+        if n and cumulative + n >= rank:
+            lower = TURNAROUND_BUCKETS[i - 1] if i > 0 else 0
+
+            # Nothing is known about the overflow bucket beyond its lower bound
+            if i >= len(TURNAROUND_BUCKETS):
+                return lower
+
+            return lower + (TURNAROUND_BUCKETS[i] - lower) * (rank - cumulative) / n
+
+        cumulative += n
+
+    return None
+
+
+def query_turnaround(group_by=(), decisions=('approved',), approver=None, supplier=None, start=None, end=None):
+    """Get turnaround statistics from the rollups.
+
+    Args:
+        group_by: Sequence of GROUP_BY_FIELDS keys
+        decisions: Outcomes to include
+        approver: Optional approver user pk to filter by
+        supplier: Optional supplier company pk to filter by
+        start: Optional first month (date) to include
+        end: Optional last month (date) to include
+
+    Returns:
+        List of dicts with the group values, count, mean and percentiles (seconds)
+    """
+    from .models import ApprovalTurnaroundRollup
+
+    rows = ApprovalTurnaroundRollup.objects.filter(decision__in=decisions)
+
+    if approver is not None:
+        rows = rows.filter(approver_pk=approver)
+    if supplier is not None:
+        rows = rows.filter(supplier_pk=supplier)
+    if start is not None:
+        rows = rows.filter(month__gte=start)
+    if end is not None:
+        rows = rows.filter(month__lte=end)
+
+    columns = [GROUP_BY_FIELDS[field] for field in group_by]
+    groups = {}
+
+    for row in rows.values(*columns, 'count', 'total_seconds', 'buckets'):
+        key = tuple(row[column] for column in columns)
+        totals = groups.setdefault(key, {'count': 0, 'total_seconds': 0.0, 'buckets': empty_buckets()})
+        totals['count'] += row['count']
+        totals['total_seconds'] += row['total_seconds']
+        totals['buckets'] = [a + b for a, b in zip(totals['buckets'], row['buckets'])]
+
+    results = []
+
+    for key, totals in sorted(groups.items(), key=lambda item: tuple(str(value) for value in item[0])):
+        result = dict(zip(group_by, key))
+        result['count'] = totals['count']
+        result['mean_seconds'] = round(totals['total_seconds'] / totals['count'], 1) if totals['count'] else None
+
+        for pct in PERCENTILES:
+            value = estimate_percentile(totals['buckets'], pct)
+            result[f'p{pct}_seconds'] = None if value is None else round(value, 1)
+
+        results.append(result)
+
+    return results
+
+
+def parse_month(value):
+    """Parse a YYYY-MM string into the first day of the month."""
+    year, month = value.split('-')
+    return date(int(year), int(month), 1)
@@ -2,12 +2,15 @@
 
 from django.contrib.auth import get_user_model
 from django.core.mail import send_mail
+from django.db.models import Count, F, Q
+from django.http import HttpResponse
 from django.template.loader import render_to_string
 from django.utils.translation import gettext_lazy as _
 
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from rest_framework.views import APIView
 
 import structlog
@@ -15,22 +18,141 @@ import structlog
 from order.models import PurchaseOrder
 from plugin import registry
 
-from . import helpers
+from . import analytics, approval_index, helpers, metrics, profiling, projection, rules, search, webhooks
+from .delegation import get_routing_table
+from .idempotency import idempotent
+from .instrumentation import instrumented, timed
+from .renderers import CompactJSONRenderer
+from .replicas import read_replica, stick_to_primary
+from .throttling import ThrottledViewMixin
 
 logger = structlog.get_logger('inventree')
 User = get_user_model()
 
+# List endpoints can also be rendered in the compact columnar format
+LIST_RENDERER_CLASSES = [*api_settings.DEFAULT_RENDERER_CLASSES, CompactJSONRenderer]
+
 
 def get_plugin():
     """Get the POApprovalsPlugin instance."""
     return registry.get_plugin('approvals')
 
 
+def get_status_summary(order, user, plugin):
+    """Build the approval status of an order, as seen by the given user.
+
+    Returned by the status endpoint, and with the result of each approval
+    action, so that clients do not need to request the status again.
+    """
+    summary = helpers.get_approval_summary(order)
+
+    # Add user-specific info
+    can_approve, approve_reason = helpers.can_user_approve(user, order, plugin)
+    can_request, request_reason = helpers.can_request_approval(order)
+    is_high_value = plugin.is_high_value_order(order)
+
+    summary.update({
+        'order_id': order.pk,
+        'order_reference': order.reference,
+        'order_status': order.status,
+        'order_total': str(order.total_price) if order.total_price else None,
+        'is_high_value': is_high_value,
+        'required_approvals': plugin.get_required_approvals(order, is_high_value=is_high_value),
+        'user_can_approve': can_approve,
+        'user_can_approve_reason': approve_reason if not can_approve else None,
+        'can_request_approval': can_request,
+        'can_request_reason': request_reason if not can_request else None,
+    })
+
+    return summary
+
+
+def apply_decision(order, user, approved, notes, plugin):
+    """Approve or reject the pending approval of an order, as the given user.
+
+    Records the decision with its side effects (metrics, analytics, custom
+    status and the notification email). The caller must check that the
+    user can approve the order first (see helpers.can_user_approve).
+
+    Returns:
+        Dict describing the result, or None if there was no pending approval
+    """
+    approval = helpers.record_approval(
+        order,
+        approving_user=user,
+        approved=approved,
+        notes=notes,
+        plugin=plugin,
+    )
+
+    if not approval:
+        return None
+
+    stick_to_primary(user, plugin)
+    metrics.record_decision('approved' if approved else 'rejected', approval)
+    analytics.record_decisions([(order, approval)])
+
+    if not approved:
+        # Set custom status to REJECTED if configured
+        plugin.set_po_custom_status(order, 'REJECTED')
+
+        # Send notification email to requestor
+        if plugin.get_setting('SEND_EMAIL_NOTIFICATIONS'):
+            send_decision_notification_email(order, approval, approved=False)
+
+        # After rejection, remove the pending approval so it can be re-requested
+        # We keep the rejection in history but allow new request
+        helpers.remove_pending_approval(order)
+
+        webhooks.publish(plugin, 'approval.rejected', order, approval=approval)
+
+        return {
+            'success': True,
+            'rejection_level': approval['level'],
+            'can_re_request': True,
+            'message': 'Approval rejected. A new approval can be requested.',
+        }
+
+    # Get updated counts
+    state = helpers.get_approval_state(order)
+    approval_count = state.get('approved_count', 0)
+    fully_approved = state.get('status') == 'approved'
+
+    if fully_approved:
+        # Set custom status to APPROVED if configured
+        plugin.set_po_custom_status(order, 'APPROVED')
+
+        # Send notification email to requestor once the quorum is reached
+        if plugin.get_setting('SEND_EMAIL_NOTIFICATIONS'):
+            send_decision_notification_email(order, approval, approved=True)
+
+    webhooks.publish(
+        plugin,
+        'approval.approved',
+        order,
+        approval=approval,
+        approved_count=approval_count,
+        fully_approved=fully_approved,
+    )
+
+    return {
+        'success': True,
+        'approval_level': approval['level'],
+        'approval_count': approval_count,
+        'required_approvals': state.get('required', 1),
+        'fully_approved': fully_approved,
+        'can_place_order': fully_approved,
+        'message': 'Approval granted' if fully_approved else 'Approval recorded, waiting for further approvals',
+    }
+
+
 class ApprovalStatusView(APIView):
     """API endpoint to get the approval status of a Purchase Order."""
 
     permission_classes = [IsAuthenticated]
 
+    @instrumented
+    @read_replica
     def get(self, request, pk):
         """Get the approval status for a specific PurchaseOrder."""
         try:
@@ -48,28 +170,7 @@ class ApprovalStatusView(APIView):
                 status=status.HTTP_403_FORBIDDEN,
             )
 
-        plugin = get_plugin()
-        summary = helpers.get_approval_summary(order)
-
-        # Add user-specific info
-        can_approve, approve_reason = helpers.can_user_approve(
-            request.user, order, plugin
-        )
-        can_request, request_reason = helpers.can_request_approval(order)
-
-        summary.update({
-            'order_id': order.pk,
-            'order_reference': order.reference,
-            'order_status': order.status,
-            'order_total': str(order.total_price) if order.total_price else None,
-            'is_high_value': plugin.is_high_value_order(order),
-            'user_can_approve': can_approve,
-            'user_can_approve_reason': approve_reason if not can_approve else None,
-            'can_request_approval': can_request,
-            'can_request_reason': request_reason if not can_request else None,
-        })
-
-        return Response(summary)
+        return Response(get_status_summary(order, request.user, get_plugin()))
 
 
 class RequestApprovalView(APIView):
@@ -77,6 +178,8 @@ class RequestApprovalView(APIView):
 
     permission_classes = [IsAuthenticated]
 
+    @instrumented
+    @idempotent
     def post(self, request, pk):
         """Request an approval for a specific PurchaseOrder."""
         try:
@@ -104,39 +207,87 @@ class RequestApprovalView(APIView):
 
         # Get optional parameters
         requested_approver_id = request.data.get('approver_id')
+        requested_approver_ids = request.data.get('approver_ids') or []
         notes = request.data.get('notes', '')
 
         # Check if Teams channel was selected
         teams_channel_selected = requested_approver_id == 'teams_channel'
-        
-        # Validate requested approver if specified (and not Teams channel)
-        requested_approver = None
+
         if requested_approver_id and not teams_channel_selected:
+            requested_approver_ids = [requested_approver_id, *requested_approver_ids]
+        
+        # Validate requested approvers if specified (and not Teams channel)
+        requested_approvers = []
+        if requested_approver_ids and not teams_channel_selected:
             try:
-                requested_approver_id = int(requested_approver_id)
-                requested_approver = User.objects.get(pk=requested_approver_id)
-            except (ValueError, User.DoesNotExist):
+                requested_approver_ids = list(dict.fromkeys(
+                    int(approver_id) for approver_id in requested_approver_ids
+                ))
+            except (TypeError, ValueError):
+                return Response(
+                    {'error': 'Invalid approver ID'},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+            requested_approvers = list(User.objects.filter(pk__in=requested_approver_ids))
+
+            if len(requested_approvers) != len(requested_approver_ids):
                 return Response(
                     {'error': 'Invalid approver ID'},
                     status=status.HTTP_400_BAD_REQUEST,
                 )
         
-        # If Teams channel selected, clear the approver_id
+        # If Teams channel selected, clear the approver_ids
         if teams_channel_selected:
-            requested_approver_id = None
+            requested_approver_ids = []
 
         plugin = get_plugin()
+        required = plugin.get_required_approvals(order)
 
         # Create the approval request
-        approval = helpers.request_approval(
+        approvals = helpers.request_approval(
             order,
             requesting_user=request.user,
-            requested_approver_id=requested_approver_id,
+            requested_approver_ids=requested_approver_ids,
             notes=notes,
+            required=required,
         )
+        stick_to_primary(request.user, plugin)
+
+        # Check the auto-approval rules before notifying anyone (a rule cannot
+        # stand in for several approvers)
+        auto_rule = rules.match_order(
+            order, plugin.get_auto_approval_rules(), plugin.get_high_value_threshold()
+        ) if required == 1 else None
+        if auto_rule:
+            auto_approval = helpers.record_auto_approval(order, auto_rule['name'])
+            metrics.record_decision('auto_approved', auto_approval)
+            analytics.record_decisions([(order, auto_approval)])
+            plugin.set_po_custom_status(order, 'APPROVED')
+            webhooks.publish(plugin, 'approval.auto_approved', order, approval=auto_approval, rule=auto_rule['name'])
+
+            logger.info(
+                'Order auto-approved',
+                order=order.pk,
+                rule=auto_rule['name'],
+            )
+
+            return Response({
+                'success': True,
+                'approval_level': approvals[0]['level'],
+                'approval_round': approvals[0]['round'],
+                'required_approvals': required,
+                'auto_approved': True,
+                'auto_rule': auto_rule['name'],
+                'email_sent': False,
+                'teams_sent': False,
+                'message': f"Order auto-approved by rule '{auto_rule['name']}'",
+                'summary': get_status_summary(order, request.user, plugin),
+            })
 
         # Set custom status to PENDING_APPROVAL if configured
         plugin.set_po_custom_status(order, 'PENDING_APPROVAL')
+        webhooks.publish(plugin, 'approval.requested', order, approvals=approvals, required_approvals=required)
 
         # Send notifications
         email_sent = False
@@ -146,19 +297,41 @@ class RequestApprovalView(APIView):
         if teams_channel_selected:
             teams_sent = send_teams_webhook(order, request, plugin)
         
-        # Send email notification if enabled and specific approver selected
-        if plugin.get_setting('SEND_EMAIL_NOTIFICATIONS') and requested_approver:
-            email_sent = send_approval_request_email(
-                order, approval, requested_approver, request
-            )
+        # Send email notifications to all selected approvers (and their delegates) at once
+        if plugin.get_setting('SEND_EMAIL_NOTIFICATIONS'):
+            routing = get_routing_table(plugin)
+            delegate_ids = {
+                approval['requested_approver_id']: routing.get_delegates(approval['requested_approver_id'])
+                for approval in approvals if approval.get('requested_approver_id')
+            }
+
+            approvers_by_id = {approver.pk: approver for approver in requested_approvers}
+            missing_ids = {pk for ids in delegate_ids.values() for pk in ids} - set(approvers_by_id)
+            if missing_ids:
+                approvers_by_id.update({user.pk: user for user in User.objects.filter(pk__in=missing_ids)})
+
+            for approval in approvals:
+                approver_id = approval.get('requested_approver_id')
+                for recipient_id in [approver_id, *delegate_ids.get(approver_id, [])]:
+                    recipient = approvers_by_id.get(recipient_id)
+                    if recipient:
+                        email_sent = send_approval_request_email(
+                            order, approval, recipient, request
+                        ) or email_sent
+
+        requested_names = [a.get('requested_approver_name') for a in approvals if a.get('requested_approver_name')]
 
         return Response({
             'success': True,
-            'approval_level': approval['level'],
-            'requested_approver': approval.get('requested_approver_name') or ('Teams Channel' if teams_channel_selected else None),
+            'approval_level': approvals[0]['level'],
+            'approval_round': approvals[0]['round'],
+            'required_approvals': required,
+            'auto_approved': False,
+            'requested_approver': ', '.join(requested_names) or ('Teams Channel' if teams_channel_selected else None),
             'email_sent': email_sent,
             'teams_sent': teams_sent,
             'message': 'Approval requested successfully',
+            'summary': get_status_summary(order, request.user, plugin),
         })
 
 
@@ -167,6 +340,8 @@ class ApproveView(APIView):
 
     permission_classes = [IsAuthenticated]
 
+    @instrumented
+    @idempotent
     def post(self, request, pk):
         """Approve a pending approval request."""
         try:
@@ -197,39 +372,17 @@ class ApproveView(APIView):
         # Get optional notes
         notes = request.data.get('notes', '')
 
-        # Record the approval
-        approval = helpers.record_approval(
-            order,
-            approving_user=request.user,
-            approved=True,
-            notes=notes,
-        )
+        data = apply_decision(order, request.user, True, notes, plugin)
 
-        if not approval:
+        if data is None:
             return Response(
                 {'error': 'No pending approval to approve'},
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        # Get updated counts
-        approval_count = helpers.get_approval_count(order)
-        fully_approved = approval_count >= 1
-
-        # Set custom status to APPROVED if configured
-        plugin.set_po_custom_status(order, 'APPROVED')
-        
-        # Send notification email to requestor
-        if plugin.get_setting('SEND_EMAIL_NOTIFICATIONS'):
-            send_decision_notification_email(order, approval, approved=True)
+        data['summary'] = get_status_summary(order, request.user, plugin)
 
-        return Response({
-            'success': True,
-            'approval_level': approval['level'],
-            'approval_count': approval_count,
-            'fully_approved': fully_approved,
-            'can_place_order': fully_approved,
-            'message': 'Approval granted',
-        })
+        return Response(data)
 
 
 class RejectView(APIView):
@@ -237,6 +390,8 @@ class RejectView(APIView):
 
     permission_classes = [IsAuthenticated]
 
+    @instrumented
+    @idempotent
     def post(self, request, pk):
         """Reject a pending approval request."""
         try:
@@ -267,44 +422,27 @@ class RejectView(APIView):
         # Get optional notes
         notes = request.data.get('notes', '')
 
-        # Record the rejection
-        approval = helpers.record_approval(
-            order,
-            approving_user=request.user,
-            approved=False,
-            notes=notes,
-        )
+        data = apply_decision(order, request.user, False, notes, plugin)
 
-        if not approval:
+        if data is None:
             return Response(
                 {'error': 'No pending approval to reject'},
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        # Set custom status to REJECTED if configured
-        plugin.set_po_custom_status(order, 'REJECTED')
-        
-        # Send notification email to requestor
-        if plugin.get_setting('SEND_EMAIL_NOTIFICATIONS'):
-            send_decision_notification_email(order, approval, approved=False)
+        data['summary'] = get_status_summary(order, request.user, plugin)
 
-        # After rejection, remove the pending approval so it can be re-requested
-        # We keep the rejection in history but allow new request
-        helpers.remove_pending_approval(order)
-
-        return Response({
-            'success': True,
-            'rejection_level': approval['level'],
-            'can_re_request': True,
-            'message': 'Approval rejected. A new approval can be requested.',
-        })
+        return Response(data)
 
 
-class PendingApprovalsView(APIView):
+class PendingApprovalsView(ThrottledViewMixin, APIView):
     """API endpoint to list pending approvals for the current user."""
 
     permission_classes = [IsAuthenticated]
+    renderer_classes = LIST_RENDERER_CLASSES
 
+    @instrumented
+    @read_replica
     def get(self, request):
         """Get list of PurchaseOrders pending user's approval."""
         if not request.user.has_perm('order.view_purchaseorder'):
@@ -313,23 +451,21 @@ class PendingApprovalsView(APIView):
                 status=status.HTTP_403_FORBIDDEN,
             )
 
+        try:
+            fields = projection.parse_fields(request, projection.PENDING_FIELDS)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
         plugin = get_plugin()
-        pending_orders = helpers.get_user_pending_approvals(request.user, plugin)
+        queryset = projection.project_queryset(
+            PurchaseOrder.objects.all(), projection.PENDING_FIELDS, fields, required=['status', 'metadata']
+        )
+        pending_orders = helpers.get_user_pending_approvals(request.user, plugin, queryset=queryset)
 
-        result = []
-        for order in pending_orders:
-            pending = helpers.get_pending_approval(order)
-            result.append({
-                'order_id': order.pk,
-                'order_reference': order.reference,
-                'order_total': str(order.total_price) if order.total_price else None,
-                'supplier': order.supplier.name if order.supplier else None,
-                'approval_level': pending.get('level') if pending else None,
-                'requested_by': pending.get('requested_by_name') if pending else None,
-                'requested_at': pending.get('requested_at') if pending else None,
-                'is_high_value': plugin.is_high_value_order(order),
-                'url': f'/web/purchasing/purchase-order/{order.pk}/po-approvals-panel',
-            })
+        result = [
+            projection.project(order, projection.PENDING_FIELDS, fields, plugin)
+            for order in pending_orders
+        ]
 
         return Response({
             'count': len(result),
@@ -337,11 +473,14 @@ class PendingApprovalsView(APIView):
         })
 
 
-class AnyApproverPendingView(APIView):
+class AnyApproverPendingView(ThrottledViewMixin, APIView):
     """API endpoint to list all pending non-high-value approvals (any approver can approve)."""
 
     permission_classes = [IsAuthenticated]
+    renderer_classes = LIST_RENDERER_CLASSES
 
+    @instrumented
+    @read_replica
     def get(self, request):
         """Get list of all non-high-value PurchaseOrders with pending approvals."""
         if not request.user.has_perm('order.view_purchaseorder'):
@@ -350,23 +489,29 @@ class AnyApproverPendingView(APIView):
                 status=status.HTTP_403_FORBIDDEN,
             )
 
+        try:
+            fields = projection.parse_fields(request, projection.PENDING_FIELDS)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
         plugin = get_plugin()
-        pending_orders = helpers.get_any_approver_pending_orders(plugin)
+
+        # The total is always needed to exclude high-value orders
+        queryset = projection.project_queryset(
+            PurchaseOrder.objects.all(),
+            projection.PENDING_FIELDS,
+            fields,
+            required=['status', 'metadata', 'total_price', 'total_price_currency'],
+        )
+        pending_orders = helpers.get_any_approver_pending_orders(plugin, queryset=queryset)
+
+        # By definition, these are non-high-value, so the check is not repeated
+        computed = [field for field in fields if field != 'is_high_value']
 
         result = []
         for order in pending_orders:
-            pending = helpers.get_pending_approval(order)
-            result.append({
-                'order_id': order.pk,
-                'order_reference': order.reference,
-                'order_total': str(order.total_price) if order.total_price else None,
-                'supplier': order.supplier.name if order.supplier else None,
-                'approval_level': pending.get('level') if pending else None,
-                'requested_by': pending.get('requested_by_name') if pending else None,
-                'requested_at': pending.get('requested_at') if pending else None,
-                'is_high_value': False,  # By definition, these are non-high-value
-                'url': f'/web/purchasing/purchase-order/{order.pk}/po-approvals-panel',
-            })
+            row = projection.project(order, projection.PENDING_FIELDS, computed, plugin)
+            result.append({field: row.get(field, False) for field in fields})
 
         return Response({
             'count': len(result),
@@ -374,11 +519,43 @@ class AnyApproverPendingView(APIView):
         })
 
 
-class AllPurchaseOrdersWithApprovalsView(APIView):
-    """API endpoint to list all purchase orders with their approval status."""
+class AllPurchaseOrdersWithApprovalsView(ThrottledViewMixin, APIView):
+    """API endpoint to list all purchase orders with their approval status.
 
-    permission_classes = [IsAuthenticated]
+    Sorting, searching, filtering and paging are done in the database, so
+    that tables can request only the rows they display:
+
+    - ordering: A key of ORDERING_FIELDS, prefixed with '-' for descending
+    - search: Text matched against the SEARCH_FIELDS
+    - approval_status, pending_approver: See approval_index.filter_orders
+    - limit, offset: Return one page of the results (all results without limit)
+
+    The count is the number of matching orders, before paging.
+    """
 
+    permission_classes = [IsAuthenticated]
+    renderer_classes = LIST_RENDERER_CLASSES
+
+    ORDERING_FIELDS = {
+        'reference': [F('reference_int'), F('reference')],
+        'description': [F('description')],
+        'supplier': [F('supplier__name')],
+        'supplier_reference': [F('supplier_reference')],
+        'line_items': [Count('lines')],
+        'status': [F('status')],
+        'target_date': [F('target_date')],
+        'creation_date': [F('creation_date')],
+        'total_price': [F('total_price')],
+        # Annotated by the approval index (requires app integration)
+        'approval_status': [F('approval_status')],
+    }
+
+    SEARCH_FIELDS = ['reference', 'description', 'supplier__name', 'supplier_reference']
+
+    MAX_LIMIT = 1000
+
+    @instrumented
+    @read_replica
     def get(self, request):
         """Get all PurchaseOrders with approval status data."""
         if not request.user.has_perm('order.view_purchaseorder'):
@@ -387,78 +564,208 @@ class AllPurchaseOrdersWithApprovalsView(APIView):
                 status=status.HTTP_403_FORBIDDEN,
             )
 
+        try:
+            fields = projection.parse_fields(request, projection.PO_LIST_FIELDS)
+            ordering = self.parse_ordering(request)
+            limit, offset = self.parse_paging(request)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
         plugin = get_plugin()
 
         # Get query params for filtering
         supplier = request.query_params.get('supplier')
         status_filter = request.query_params.get('status')
+        search = request.query_params.get('search', '').strip()
 
-        orders = PurchaseOrder.objects.select_related('supplier').all()
+        orders = PurchaseOrder.objects.all()
 
         # Apply filters
         if supplier:
             orders = orders.filter(supplier_id=supplier)
         if status_filter:
             orders = orders.filter(status=status_filter)
+        if search:
+            query = Q()
+            for field in self.SEARCH_FIELDS:
+                query |= Q(**{f'{field}__icontains': search})
+            orders = orders.filter(query)
+
+        if approval_index.index_available():
+            orders = approval_index.filter_orders(orders, request)
+        elif ordering and ordering[0] == 'approval_status':
+            return Response(
+                {'error': 'Ordering by approval_status requires app integration'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        if ordering:
+            key, descending = ordering
+            orders = orders.order_by(*[
+                expression.desc() if descending else expression.asc()
+                for expression in self.ORDERING_FIELDS[key]
+            ], 'pk')
+        elif limit is not None:
+            # Pages need a stable order
+            orders = orders.order_by('pk')
+
+        count = orders.count() if limit is not None else None
+
+        # Only load, join and annotate what the requested fields need
+        orders = projection.project_queryset(orders, projection.PO_LIST_FIELDS, fields)
+
+        if limit is not None:
+            orders = orders[offset:offset + limit]
+
+        results = [
+            projection.project(order, projection.PO_LIST_FIELDS, fields, plugin)
+            for order in orders
+        ]
+
+        return Response({
+            'count': len(results) if count is None else count,
+            'results': results,
+        })
+
+    def parse_ordering(self, request):
+        """Get the (key, descending) ordering of the request, or None.
+
+        Raises:
+            ValueError: If the ordering is not one of ORDERING_FIELDS
+        """
+        value = request.query_params.get('ordering', '').strip()
+
+        if not value:
+            return None
+
+        key = value.lstrip('-')
+
+        if key not in self.ORDERING_FIELDS:
+            raise ValueError(f'Invalid ordering: {value}')
+
+        return key, value.startswith('-')
+
+    def parse_paging(self, request):
+        """Get the (limit, offset) of the request; limit is None if not paging.
+
+        Raises:
+            ValueError: If limit or offset are not non-negative integers
+        """
+        limit = request.query_params.get('limit')
+        offset = request.query_params.get('offset') or 0
+
+        try:
+            offset = int(offset)
+            limit = None if limit in (None, '') else min(int(limit), self.MAX_LIMIT)
+        except (TypeError, ValueError):
+            raise ValueError('limit and offset must be integers')
+
+        if offset < 0 or (limit is not None and limit < 0):
+            raise ValueError('limit and offset must not be negative')
+
+        return limit, offset
+
+
+class SearchView(ThrottledViewMixin, APIView):
+    """API endpoint for full-text search over purchase orders and their approvals.
+
+    Matches the order reference, description and supplier name, the names
+    of the requesters and approvers, and the approval notes (see search.py):
+
+    - q: The search text; every term must match
+    - limit, offset: Return one page of the hits (DEFAULT_LIMIT by default)
+
+    Hits are returned best first, with their rank (null if the database
+    backend does not rank them). The count is the number of hits, before paging.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    DEFAULT_LIMIT = 25
+    MAX_LIMIT = 100
+
+    @instrumented
+    @read_replica
+    def get(self, request):
+        """Search the purchase orders."""
+        if not request.user.has_perm('order.view_purchaseorder'):
+            return Response(
+                {'error': 'Permission denied'},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        if not search.search_available():
+            return Response(
+                {'error': 'Search requires the plugin app integration to be enabled'},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            )
+
+        text = request.query_params.get('q', '').strip()
+
+        if not search.parse_terms(text):
+            return Response({'error': 'q is required'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            limit, offset = self.parse_paging(request)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        count, hits = search.search_orders(text, limit, offset)
+
+        orders = PurchaseOrder.objects.select_related('supplier').only(
+            'pk', 'reference', 'description', 'status', 'metadata', 'supplier__name'
+        ).in_bulk([pk for pk, _ in hits])
 
         results = []
-        for order in orders:
-            # Get approval summary from helpers
-            summary = helpers.get_approval_summary(order)
-
-            # Determine approval_status string
-            if summary.get('has_pending'):
-                approval_status = 'pending'
-            elif summary.get('approved_count', 0) >= 1:
-                approval_status = 'approved'
-            elif summary.get('rejected_count', 0) > 0:
-                approval_status = 'rejected'
-            else:
-                approval_status = 'none'
+
+        for pk, rank in hits:
+            order = orders.get(pk)
+
+            # Deleted since the hit was read
+            if order is None:
+                continue
 
             results.append({
                 'pk': order.pk,
                 'reference': order.reference,
                 'description': order.description,
-                'status': order.status,
-                'status_custom_key': getattr(order, 'status_custom_key', order.status),
                 'supplier': order.supplier_id,
-                'supplier_detail': {
-                    'pk': order.supplier.pk,
-                    'name': order.supplier.name,
-                    'image': order.supplier.image.url if order.supplier.image else None,
-                } if order.supplier else None,
-                'supplier_reference': order.supplier_reference,
-                'line_items': order.line_count,
-                'completed_lines': order.completed_line_count,
-                'total_price': str(order.total_price) if order.total_price else None,
-                'order_currency': order.order_currency,
-                'target_date': order.target_date.isoformat() if order.target_date else None,
-                'creation_date': order.creation_date.isoformat() if order.creation_date else None,
-                'complete_date': order.complete_date.isoformat() if order.complete_date else None,
-                'responsible_detail': {
-                    'pk': order.responsible.pk,
-                    'name': str(order.responsible),
-                } if order.responsible else None,
-                'project_code_detail': {
-                    'pk': order.project_code.pk,
-                    'code': order.project_code.code,
-                } if order.project_code else None,
-                # Approval-specific fields
-                'approval_status': approval_status,
+                'supplier_name': order.supplier.name if order.supplier else None,
+                'status': order.status,
+                'approval_status': helpers.get_approval_state(order).get('status', 'none'),
+                'rank': rank,
             })
 
         return Response({
-            'count': len(results),
+            'count': count,
             'results': results,
         })
 
+    def parse_paging(self, request):
+        """Get the (limit, offset) of the request.
+
+        Raises:
+            ValueError: If limit or offset are not non-negative integers
+        """
+        try:
+            limit = min(int(request.query_params.get('limit') or self.DEFAULT_LIMIT), self.MAX_LIMIT)
+            offset = int(request.query_params.get('offset') or 0)
+        except (TypeError, ValueError):
+            raise ValueError('limit and offset must be integers')
 
-class ApproverUsersView(APIView):
+        if limit < 0 or offset < 0:
+            raise ValueError('limit and offset must not be negative')
+
+        return limit, offset
+
+
+class ApproverUsersView(ThrottledViewMixin, APIView):
     """API endpoint to list users who can be selected as approvers."""
 
     permission_classes = [IsAuthenticated]
 
+    @instrumented
+    @read_replica
     def get(self, request):
         """Get list of users who can be selected as approvers.
         
@@ -501,6 +808,138 @@ class ApproverUsersView(APIView):
         })
 
 
+class TurnaroundAnalyticsView(APIView):
+    """API endpoint for approval turnaround percentiles, answered from the rollups."""
+
+    permission_classes = [IsAuthenticated]
+
+    @instrumented
+    @read_replica
+    def get(self, request):
+        """Get turnaround statistics, optionally grouped by approver, supplier, month or decision."""
+        if not request.user.has_perm('order.view_purchaseorder'):
+            return Response(
+                {'error': 'Permission denied'},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        if not analytics.rollups_available():
+            return Response(
+                {'error': 'Turnaround analytics require the plugin app integration to be enabled'},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            )
+
+        params = request.query_params
+
+        group_by = [field for field in params.get('group_by', '').split(',') if field]
+        decisions = [d for d in params.get('decision', 'approved').split(',') if d]
+
+        invalid = [field for field in group_by if field not in analytics.GROUP_BY_FIELDS]
+        invalid += [d for d in decisions if d not in analytics.DECISIONS]
+
+        if invalid:
+            return Response(
+                {'error': f'Invalid group_by or decision value: {", ".join(invalid)}'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            approver = int(params['approver']) if params.get('approver') else None
+            supplier = int(params['supplier']) if params.get('supplier') else None
+            start = analytics.parse_month(params['from']) if params.get('from') else None
+            end = analytics.parse_month(params['to']) if params.get('to') else None
+        except ValueError:
+            return Response(
+                {'error': 'approver and supplier must be IDs, from and to must be YYYY-MM'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        results = analytics.query_turnaround(
+            group_by=group_by,
+            decisions=decisions,
+            approver=approver,
+            supplier=supplier,
+            start=start,
+            end=end,
+        )
+
+        # Resolve the names of the grouped approvers and suppliers
+        if 'approver' in group_by:
+            users = User.objects.in_bulk([r['approver'] for r in results if r['approver']])
+            for result in results:
+                user = users.get(result['approver'])
+                result['approver_name'] = (user.get_full_name() or user.username) if user else None
+
+        if 'supplier' in group_by:
+            from company.models import Company
+
+            suppliers = Company.objects.in_bulk([r['supplier'] for r in results if r['supplier']])
+            for result in results:
+                supplier_obj = suppliers.get(result['supplier'])
+                result['supplier_name'] = supplier_obj.name if supplier_obj else None
+
+        if 'month' in group_by:
+            for result in results:
+                result['month'] = result['month'].strftime('%Y-%m')
+
+        return Response({
+            'count': len(results),
+            'results': results,
+        })
+
+
+class MetricsView(APIView):
+    """API endpoint exposing approval metrics in the Prometheus text format."""
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        """Get the approval throughput, latency and queue depth metrics."""
+        if not request.user.is_staff:
+            return Response(
+                {'error': 'Permission denied'},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        return HttpResponse(
+            metrics.render_prometheus(),
+            content_type='text/plain; version=0.0.4; charset=utf-8',
+        )
+
+
+class ProfilesView(APIView):
+    """API endpoint for downloading the stored request profiles."""
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        """Download the stored profiles as a JSON file, oldest first."""
+        if not request.user.is_staff:
+            return Response(
+                {'error': 'Permission denied'},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        return Response(
+            profiling.get_profiles(),
+            headers={'Content-Disposition': 'attachment; filename="approvals-profiles.json"'},
+        )
+
+    def delete(self, request):
+        """Clear the stored profiles."""
+        if not request.user.is_staff:
+            return Response(
+                {'error': 'Permission denied'},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        profiling.clear_profiles()
+
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+@timed('notify_email')
+@metrics.track_notification('email')
 def send_approval_request_email(order, approval, requested_approver, request):
     """Send email notification for approval request.
 
@@ -530,6 +969,16 @@ def send_approval_request_email(order, approval, requested_approver, request):
 
         subject = f"[InvenTree] Approval Required: {order.reference}"
 
+        # One-click approve / reject links, acting as the emailed user
+        plugin = get_plugin()
+        action_links_section = ''
+
+        if plugin.get_setting('EMAIL_ACTION_LINKS'):
+            from .action_links import get_link_urls
+
+            links = get_link_urls(order, approval, requested_approver, plugin)
+            action_links_section = f"\nApprove: {links['approve']}\nReject: {links['reject']}\n"
+
         # Build email body
         context = {
             'order': order,
@@ -555,7 +1004,7 @@ Order Details:
 - Total Value: {order.total_price if order.total_price else 'N/A'}{notes_section}
 
 View and approve: {order_url}
-
+{action_links_section}
 ---
 This is an automated message from InvenTree.
 """
@@ -584,6 +1033,8 @@ This is an automated message from InvenTree.
         return False
 
 
+@timed('notify_teams')
+@metrics.track_notification('teams')
 def send_teams_webhook(order, request, plugin):
     """Send a Teams webhook message for approval request.
 
@@ -696,6 +1147,8 @@ def send_teams_webhook(order, request, plugin):
         return False
 
 
+@timed('notify_email')
+@metrics.track_notification('email')
 def send_decision_notification_email(order, approval, approved=True):
     """Send email notification to requestor when approval is approved/rejected.
 
@@ -0,0 +1,239 @@
+"""Indexed approval status for filtering the core PurchaseOrder API.
+
+The ApprovalIndex and ApprovalIndexApprover tables mirror the approval
+status and pending approvers from the order metadata into indexed columns.
+They are written whenever the approval data of an order is saved, and
+rebuilt from the metadata by a nightly task.
+
+install_core_api_filters() extends InvenTree's /api/order/po/ list with:
+
+- ?approval_status=pending (comma-separated: none, pending, approved, rejected)
+- ?pending_approver=<user id>, =me or =any (open requests any approver can take)
+- an approval_status field on every returned order
+
+so that paginated core tables can filter by approval state server-side.
+"""
+
+import structlog
+
+logger = structlog.get_logger('inventree')
+
+APPROVAL_STATUSES = ('none', 'pending', 'approved', 'rejected')
+
+
+def index_available():
+    """Check whether the index tables are installed (requires app integration)."""
+    from django.apps import apps
+
+    return apps.is_installed('inventree_approvals')
+
+
+def get_index_entry(order):
+    """Get the indexed values of an order from its metadata.
+
+    Returns:
+        Tuple of (status, any_approver, frozenset of pending approver pks)
+    """
+    from . import helpers
+
+    state = helpers.get_approval_state(order)
+    status = state.get('status', 'none')
+
+    if status != 'pending':
+        return status, False, frozenset()
+
+    return status, bool(state.get('any_approver')), frozenset(state.get('pending_approver_ids', []))
+
+
+def read_index_entries(order_pks):
+    """Read the stored index values of the given orders, keyed by order pk (as get_index_entry)."""
+    from .models import ApprovalIndex, ApprovalIndexApprover
+
+    approvers = {}
+
+    for order_id, approver_pk in ApprovalIndexApprover.objects.filter(order_id__in=order_pks).values_list(
+        'order_id', 'approver_pk'
+    ):
+        approvers.setdefault(order_id, set()).add(approver_pk)
+
+    return {
+        order_id: (status, any_approver, frozenset(approvers.get(order_id, ())))
+        for order_id, status, any_approver in ApprovalIndex.objects.filter(order_id__in=order_pks).values_list(
+            'order_id', 'status', 'any_approver'
+        )
+    }
+
+
+def sync_orders(orders, raise_errors=False):
+    """Write the approval index rows of the given orders from their metadata.
+
+    Args:
+        orders: The PurchaseOrder instances, with their metadata loaded
+        raise_errors: Raise database errors, rather than logging them
+    """
+    from django.db import transaction
+
+    from .models import ApprovalIndex, ApprovalIndexApprover
+
+    orders = [order for order in orders if order.pk]
+
+    if not orders or not index_available():
+        return
+
+    indexes = []
+    approvers = []
+
+    for order in orders:
+        status, any_approver, approver_pks = get_index_entry(order)
+
+        indexes.append(ApprovalIndex(order_id=order.pk, status=status, any_approver=any_approver))
+        approvers.extend(
+            ApprovalIndexApprover(order_id=order.pk, approver_pk=approver_pk)
+            for approver_pk in approver_pks
+        )
+
+    try:
+        with transaction.atomic():
+            ApprovalIndex.objects.bulk_create(
+                indexes,
+                update_conflicts=True,
+                unique_fields=['order'],
+                update_fields=['status', 'any_approver'],
+            )
+            ApprovalIndexApprover.objects.filter(order_id__in=[order.pk for order in orders]).delete()
+            ApprovalIndexApprover.objects.bulk_create(approvers)
+    except Exception:
+        if raise_errors:
+            raise
+
+        # The metadata is the source of truth, and the nightly rebuild repairs the index
+        logger.exception('Failed to update the approval index')
+
+
+def rebuild_index(batch_size=1000):
+    """Rebuild the approval index of every purchase order.
+
+    Returns:
+        Number of orders indexed
+    """
+    from order.models import PurchaseOrder
+
+    from .models import ApprovalIndex
+
+    count = 0
+    batch = []
+
+    for order in PurchaseOrder.objects.only('pk', 'metadata').iterator(chunk_size=batch_size):
+        batch.append(order)
+
+        if len(batch) >= batch_size:
+            sync_orders(batch)
+            count += len(batch)
+            batch = []
+
+    if batch:
+        sync_orders(batch)
+        count += len(batch)
+
+    logger.info('Approval index rebuilt', orders=count, rows=ApprovalIndex.objects.count())
+
+    return count
+
+
+def filter_orders(queryset, request):
+    """Apply the approval filters and annotation to a PurchaseOrder queryset.
+
+    Raises:
+        ValidationError: If a filter value is invalid
+    """
+    from django.db.models import Exists, OuterRef, Value
+    from django.db.models.functions import Coalesce
+    from rest_framework.exceptions import ValidationError
+
+    from .models import ApprovalIndexApprover
+
+    params = request.query_params
+
+    queryset = queryset.annotate(
+        approval_status=Coalesce('approval_index__status', Value('none'))
+    )
+
+    if params.get('approval_status'):
+        statuses = [value for value in params['approval_status'].split(',') if value]
+
+        invalid = set(statuses).difference(APPROVAL_STATUSES)
+        if invalid:
+            raise ValidationError({'approval_status': f'Invalid approval status: {", ".join(sorted(invalid))}'})
+
+        queryset = queryset.filter(approval_status__in=statuses)
+
+    approver = params.get('pending_approver')
+
+    if approver == 'any':
+        queryset = queryset.filter(approval_index__status='pending', approval_index__any_approver=True)
+    elif approver:
+        if approver == 'me':
+            approver = request.user.pk
+
+        try:
+            approver = int(approver)
+        except (TypeError, ValueError):
+            raise ValidationError({'pending_approver': 'Must be a user ID, "me" or "any"'})
+
+        queryset = queryset.filter(approval_index__status='pending').filter(
+            Exists(ApprovalIndexApprover.objects.filter(order=OuterRef('pk'), approver_pk=approver))
+        )
+
+    return queryset
+
+
+def install_core_api_filters():
+    """Extend the core PurchaseOrder list endpoint with the approval filters.
+
+    InvenTree has no plugin hook for adding filters or fields to its own API
+    endpoints, so the filter_queryset() of the core view and the
+    to_representation() of its serializer are wrapped, once per process.
+    The wrappers stay in place until the server restarts, even after the
+    plugin is deactivated, but they only call through to the core methods
+    unless the plugin is active with approvals enabled and the index tables
+    exist: the queryset is then neither filtered nor annotated, and the
+    serializer only adds approval_status to orders which were annotated.
+    """
+    try:
+        from order.api import PurchaseOrderList
+        from order.serializers import PurchaseOrderSerializer
+    except ImportError:
+        logger.warning('Core PurchaseOrder API not found, approval filters not installed')
+        return
+
+    if getattr(PurchaseOrderList, '_po_approvals_filters', False):
+        return
+
+    from plugin import registry
+
+    def enabled():
+        plugin = registry.get_plugin('approvals')
+        return bool(plugin and plugin.is_active() and plugin.get_setting('ENABLE_APPROVALS') and index_available())
+
+    original_filter_queryset = PurchaseOrderList.filter_queryset
+    original_to_representation = PurchaseOrderSerializer.to_representation
+
+    def filter_queryset(self, queryset):
+        queryset = original_filter_queryset(self, queryset)
+
+        if enabled():
+            queryset = filter_orders(queryset, self.request)
+
+        return queryset
+
+    def to_representation(self, instance):
+        data = original_to_representation(self, instance)
+
+        if hasattr(instance, 'approval_status'):
+            data['approval_status'] = instance.approval_status
+
+        return data
+
+    PurchaseOrderList.filter_queryset = filter_queryset
+    PurchaseOrderList._po_approvals_filters = True
+    PurchaseOrderSerializer.to_representation = to_representation
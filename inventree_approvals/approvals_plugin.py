@@ -3,13 +3,21 @@
 This plugin adds an approval workflow to Purchase Orders.
 """
 
+import functools
+import importlib
+import json
+from pathlib import Path
 from typing import TYPE_CHECKING
 
 from django.urls import path
 from django.utils.translation import gettext_lazy as _
 
+import structlog
+
 from plugin import InvenTreePlugin
 from plugin.mixins import (
+    AppMixin,
+    ScheduleMixin,
     SettingsMixin,
     UrlsMixin,
     UserInterfaceMixin,
@@ -19,8 +27,132 @@ from plugin.mixins import (
 if TYPE_CHECKING:
     from rest_framework.request import Request
 
+logger = structlog.get_logger('inventree')
+
+# Vite manifest of the built frontend, mapping each source entry to its output file
+STATIC_MANIFEST = Path(__file__).parent / 'static' / '.vite' / 'manifest.json'
+
+# Bundle containing every render function, used if an entry is missing from the manifest
+STATIC_FALLBACK = 'approvals_panel.js'
+
+
+@functools.lru_cache(maxsize=None)
+def get_static_entry_file(source):
+    """Get the built file of a frontend entry point from the Vite manifest.
+
+    Args:
+        source: Entry point source path, relative to the frontend directory (e.g. 'src/panel.tsx')
+
+    Returns:
+        File name relative to the static directory (the combined bundle for older builds)
+    """
+    try:
+        with open(STATIC_MANIFEST) as f:
+            return json.load(f)[source]['file']
+    except (OSError, ValueError, KeyError):
+        # The combined bundle still works, but it is out of date if the frontend was changed since
+        logger.warning('Frontend entry missing from the build, rebuild the frontend', source=source, fallback=STATIC_FALLBACK)
+        return STATIC_FALLBACK
+
+
+def lazy_view(name, module='api'):
+    """Return a view function which imports the named view on its first call.
+
+    This keeps the views, and the DRF and notification machinery they
+    import, out of the plugin load and URL registration.
+    """
+    view = None
+
+    def wrapper(request, *args, **kwargs):
+        nonlocal view
+
+        if view is None:
+            view = getattr(importlib.import_module(f'.{module}', __package__), name).as_view()
+
+        return view(request, *args, **kwargs)
+
+    # API views handle CSRF through their authentication classes, and
+    # action links are authenticated by their signed token
+    wrapper.csrf_exempt = True
+    wrapper.__name__ = name
+
+    return wrapper
+
+
+def install_core_api_filters(**kwargs):
+    """Signal receiver which extends the core PurchaseOrder API once, on the first request."""
+    from django.core.signals import request_started
+
+    from .approval_index import install_core_api_filters as install
+
+    request_started.disconnect(dispatch_uid='po_approvals_core_api_filters')
+    install()
+
+
+def check_line_item_fingerprint(sender, instance, raw=False, **kwargs):
+    """Signal receiver which checks the approved fingerprint once a line item has been saved.
+
+    This runs after the save rather than in validate_model_instance, so that
+    the approval is not invalidated (and the order not written) for a line
+    item change which fails validation. The receiver is connected for the
+    life of the process, so it checks that the plugin is still active.
+
+    QuerySet.update() and bulk_update() on line items do not send post_save,
+    so changes made that way do not invalidate an approval, until the whole
+    order is re-checked when its supplier, currency or total is changed
+    (code making such updates can call helpers.verify_order_fingerprint).
+    """
+    from plugin import registry
+
+    from . import helpers
+
+    if raw or not instance.order_id:
+        return
+
+    plugin = registry.get_plugin('approvals')
+
+    if plugin and plugin.is_active() and plugin.get_setting('ENABLE_APPROVALS'):
+        helpers.check_line_fingerprint(instance.order, instance)
+
+
+def validate_auto_approval_rules(value):
+    """Validate the AUTO_APPROVAL_RULES setting."""
+    from .rules import validate_rules
+
+    validate_rules(value)
+
+
+def validate_webhook_subscriptions(value):
+    """Validate the WEBHOOK_SUBSCRIPTIONS setting."""
+    from .webhooks import validate_subscriptions
+
+    validate_subscriptions(value)
+
+
+def validate_throttle_rate(value):
+    """Validate the THROTTLE_USER_RATE and THROTTLE_GLOBAL_RATE settings."""
+    from .throttling import validate_rate
+
+    validate_rate(value)
+
+
+def validate_read_replica_database(value):
+    """Validate the READ_REPLICA_DATABASE setting."""
+    from .replicas import validate_alias
+
+    validate_alias(value)
+
+
+def validate_approval_delegations(value):
+    """Validate the APPROVAL_DELEGATIONS setting."""
+    from .delegation import validate_delegations
+
+    validate_delegations(value)
+
 
 class POApprovalsPlugin(
+    AppMixin,
+    ScheduleMixin,
     SettingsMixin,
     UrlsMixin,
     UserInterfaceMixin,
@@ -60,18 +192,128 @@ class POApprovalsPlugin(
             'default': '',
             'validator': str,
         },
+        'REQUIRED_APPROVALS': {
+            'name': _('Required Approvals'),
+            'description': _('Number of approvals required before an order can be placed'),
+            'default': 1,
+            'validator': int,
+        },
+        'HIGH_VALUE_REQUIRED_APPROVALS': {
+            'name': _('High Value Required Approvals'),
+            'description': _('Number of senior approvals required before a high-value order can be placed'),
+            'default': 1,
+            'validator': int,
+        },
+        'APPROVAL_DELEGATIONS': {
+            'name': _('Approval Delegations'),
+            'description': _('JSON list of time-bounded delegations from one approver to another (see README)'),
+            'default': '',
+            'validator': validate_approval_delegations,
+        },
+        'AUTO_APPROVAL_RULES': {
+            'name': _('Auto-Approval Rules'),
+            'description': _('JSON list of rules for orders which are approved automatically (see README)'),
+            'default': '',
+            'validator': validate_auto_approval_rules,
+        },
         'SEND_EMAIL_NOTIFICATIONS': {
             'name': _('Send Email Notifications'),
             'description': _('Send email notifications when approval is requested'),
             'default': True,
             'validator': bool,
         },
+        'EMAIL_ACTION_LINKS': {
+            'name': _('Email Approval Links'),
+            'description': _('Include signed one-click approve and reject links in approval request emails'),
+            'default': False,
+            'validator': bool,
+        },
+        'EMAIL_ACTION_LINK_EXPIRY': {
+            'name': _('Email Approval Link Expiry'),
+            'description': _('Number of hours for which the approve and reject links in an email can be used'),
+            'default': 72,
+            'validator': int,
+        },
         'TEAMS_WEBHOOK_URL': {
             'name': _('Teams Webhook URL'),
             'description': _('Microsoft Teams incoming webhook URL for posting approval requests'),
             'default': '',
             'validator': str,
         },
+        'WEBHOOK_SUBSCRIPTIONS': {
+            'name': _('Webhook Subscriptions'),
+            'description': _('JSON list of webhook endpoints which receive approval events (see README)'),
+            'default': '',
+            'validator': validate_webhook_subscriptions,
+            # Holds the signing secrets
+            'protected': True,
+        },
+        'WEBHOOK_WORKERS': {
+            'name': _('Webhook Workers'),
+            'description': _('Maximum number of webhook deliveries in progress at the same time, per server process'),
+            'default': 4,
+            'validator': int,
+        },
+        'THROTTLE_USER_RATE': {
+            'name': _('Per-User Request Rate'),
+            'description': _('Maximum list and search requests per user, e.g. "60/min" (empty for no limit)'),
+            'default': '',
+            'validator': validate_throttle_rate,
+        },
+        'THROTTLE_GLOBAL_RATE': {
+            'name': _('Global Request Rate'),
+            'description': _('Maximum list and search requests from all users together, e.g. "600/min" (empty for no limit)'),
+            'default': '',
+            'validator': validate_throttle_rate,
+        },
+        'THROTTLE_CONCURRENCY': {
+            'name': _('Concurrent List Requests'),
+            'description': _('Maximum requests in progress at the same time, per list or search endpoint (0 for no limit)'),
+            'default': 0,
+            'validator': int,
+        },
+        'READ_REPLICA_DATABASE': {
+            'name': _('Read Replica Database'),
+            'description': _('Database alias (from the DATABASES configuration) used by the read-only approval endpoints (empty to use the primary)'),
+            'default': '',
+            'validator': validate_read_replica_database,
+        },
+        'READ_REPLICA_STICKY_SECONDS': {
+            'name': _('Read Replica Sticky Time'),
+            'description': _('Seconds for which a user reads from the primary database after requesting, approving or rejecting'),
+            'default': 15,
+            'validator': int,
+        },
+        'ENABLE_INSTRUMENTATION': {
+            'name': _('Enable Instrumentation'),
+            'description': _('Log SQL query counts and per-phase timings for every approvals API request'),
+            'default': False,
+            'validator': bool,
+        },
+        'SERVER_TIMING_HEADER': {
+            'name': _('Server-Timing Header'),
+            'description': _('Return instrumentation timings in a Server-Timing response header'),
+            'default': False,
+            'validator': bool,
+        },
+        'ENABLE_PROFILING': {
+            'name': _('Enable Profiling'),
+            'description': _('Profile sampled or slow approvals API requests, for download by staff users'),
+            'default': False,
+            'validator': bool,
+        },
+        'PROFILING_SAMPLE_RATE': {
+            'name': _('Profiling Sample Rate'),
+            'description': _('Percentage of approvals API requests to profile with cProfile (0 to disable)'),
+            'default': 0,
+            'validator': int,
+        },
+        'PROFILING_SLOW_THRESHOLD': {
+            'name': _('Profiling Slow Threshold'),
+            'description': _('Sample the stack of any approvals API request running longer than this (milliseconds, 0 to disable)'),
+            'default': 5000,
+            'validator': int,
+        },
         'CUSTOM_STATE_PENDING_APPROVAL': {
             'name': _('Pending Approval State Key'),
             'description': _('Custom state key for "Pending Approval" status (from Admin → Custom States)'),
@@ -95,53 +337,212 @@ class POApprovalsPlugin(
     # Metadata key for storing approval data on PurchaseOrders
     METADATA_KEY = 'po_approvals'
 
+    # Periodic sweep of pending orders against the auto-approval rules
+    SCHEDULED_TASKS = {
+        'auto_approval_sweep': {
+            'func': 'auto_approve_pending_orders',
+            'schedule': 'I',
+            'minutes': 15,
+        },
+        'approval_index_rebuild': {
+            'func': 'rebuild_approval_index',
+            'schedule': 'D',
+        },
+        'turnaround_rollup_rebuild': {
+            'func': 'rebuild_turnaround_rollups',
+            'schedule': 'D',
+        },
+        'search_index_rebuild': {
+            'func': 'rebuild_search_index',
+            'schedule': 'D',
+        },
+    }
+
+    def __init__(self):
+        """Initialize the plugin.
+
+        The core PurchaseOrder API is extended with the approval filters on
+        the first request, so that management commands and registry reloads
+        do not import the core API views.
+        """
+        super().__init__()
+
+        # UI feature descriptors per (language, settings), see get_ui_features_cached
+        self._ui_feature_cache = {}
+
+        from django.core.signals import request_started
+        from django.db.models.signals import post_save
+
+        request_started.connect(install_core_api_filters, dispatch_uid='po_approvals_core_api_filters')
+        post_save.connect(
+            check_line_item_fingerprint,
+            sender='order.PurchaseOrderLineItem',
+            dispatch_uid='po_approvals_line_fingerprint',
+        )
+
     def setup_urls(self):
-        """Set up URL patterns for the plugin API."""
-        from . import api
-        
+        """Set up URL patterns for the plugin API.
+
+        The API module is only imported when one of its views is first called.
+        """
         return [
             path(
                 'po/<int:pk>/status/',
-                api.ApprovalStatusView.as_view(),
+                lazy_view('ApprovalStatusView'),
                 name='approval-status',
             ),
             path(
                 'po/<int:pk>/request/',
-                api.RequestApprovalView.as_view(),
+                lazy_view('RequestApprovalView'),
                 name='approval-request',
             ),
             path(
                 'po/<int:pk>/approve/',
-                api.ApproveView.as_view(),
+                lazy_view('ApproveView'),
                 name='approval-approve',
             ),
             path(
                 'po/<int:pk>/reject/',
-                api.RejectView.as_view(),
+                lazy_view('RejectView'),
                 name='approval-reject',
             ),
             path(
                 'pending/',
-                api.PendingApprovalsView.as_view(),
+                lazy_view('PendingApprovalsView'),
                 name='approval-pending-list',
             ),
             path(
                 'pending-any-approver/',
-                api.AnyApproverPendingView.as_view(),
+                lazy_view('AnyApproverPendingView'),
                 name='approval-pending-any-approver',
             ),
             path(
                 'users/',
-                api.ApproverUsersView.as_view(),
+                lazy_view('ApproverUsersView'),
                 name='approval-users',
             ),
             path(
                 'po-list/',
-                api.AllPurchaseOrdersWithApprovalsView.as_view(),
+                lazy_view('AllPurchaseOrdersWithApprovalsView'),
                 name='po-list-with-approvals',
             ),
+            path(
+                'search/',
+                lazy_view('SearchView'),
+                name='approval-search',
+            ),
+            path(
+                'analytics/turnaround/',
+                lazy_view('TurnaroundAnalyticsView'),
+                name='approval-turnaround-analytics',
+            ),
+            path(
+                'profiles/',
+                lazy_view('ProfilesView'),
+                name='approval-profiles',
+            ),
+            path(
+                'metrics/',
+                lazy_view('MetricsView'),
+                name='approval-metrics',
+            ),
+            path(
+                'action/<str:token>/',
+                lazy_view('ActionLinkView', module='action_links'),
+                name='approval-action-link',
+            ),
         ]
 
+    def build_ui_features(self):
+        """Build the UI feature descriptors, without their per-call context.
+
+        Returns:
+            Dict of 'panels', 'dashboard_items' and 'navigation_items' lists
+        """
+        if not self.get_setting('ENABLE_APPROVALS'):
+            return {'panels': [], 'dashboard_items': [], 'navigation_items': []}
+
+        return {
+            'panels': [
+                {
+                    'key': 'po-approvals-panel',
+                    'title': str(_('Approvals')),
+                    'description': str(_('Purchase Order approval workflow')),
+                    'icon': 'ti:checkbox:outline',
+                    'feature_type': 'panel',
+                    'options': {},
+                    'source': self.plugin_static_file(
+                        f"{get_static_entry_file('src/panel.tsx')}:renderPanel"
+                    ),
+                },
+            ],
+            'dashboard_items': [
+                {
+                    'key': 'pending-approvals-widget',
+                    'title': str(_('POs Needing Your Approval')),
+                    'description': str(_('Purchase Orders awaiting your approval')),
+                    'icon': 'ti:checkbox:outline',
+                    'source': self.plugin_static_file(
+                        f"{get_static_entry_file('src/dashboard.tsx')}:renderDashboardWidget"
+                    ),
+                    'options': {
+                        'width': 4,
+                        'height': 2,
+                    },
+                },
+                # Widget showing all non-high-value pending approvals (any approver can approve)
+                {
+                    'key': 'any-approver-widget',
+                    'title': str(_('Pending Approvals Any Approver')),
+                    'description': str(_('Non-high-value POs that any approver can approve')),
+                    'icon': 'ti:users:outline',
+                    'source': self.plugin_static_file(
+                        f"{get_static_entry_file('src/dashboard.tsx')}:renderAnyApproverWidget"
+                    ),
+                    'options': {
+                        'width': 4,
+                        'height': 2,
+                    },
+                },
+            ],
+            'navigation_items': [
+                {
+                    'key': 'po-approvals-nav',
+                    'title': str(_('PO Approvals')),
+                    'description': str(_('Purchase Orders with approval status')),
+                    'icon': 'ti:checkbox:outline',
+                    'feature_type': 'navigation',
+                    'options': {
+                        'navigation_group': 'purchasing',
+                    },
+                    'source': self.plugin_static_file(
+                        f"{get_static_entry_file('src/page.tsx')}:renderPOApprovalsPage"
+                    ),
+                },
+            ],
+        }
+
+    def get_ui_features_cached(self, feature_type):
+        """Get the UI feature descriptors of one type, cached per language and settings.
+
+        The descriptors (translated strings and static file paths) only
+        change with the active language and the plugin settings, so they are
+        built once per combination and kept for the lifetime of the plugin
+        instance, which is replaced when the plugin registry reloads.
+
+        Args:
+            feature_type: One of 'panels', 'dashboard_items', 'navigation_items'
+        """
+        from django.utils.translation import get_language
+
+        key = (get_language(), bool(self.get_setting('ENABLE_APPROVALS')))
+        features = self._ui_feature_cache.get(key)
+
+        if features is None:
+            features = self._ui_feature_cache[key] = self.build_ui_features()
+
+        return features[feature_type]
+
     def get_ui_panels(self, request: 'Request', context: dict, **kwargs) -> list:
         """Return custom UI panels for the Purchase Order detail page.
 
@@ -156,31 +557,23 @@ class POApprovalsPlugin(
         Returns:
             List of UIFeature dicts for panel injection
         """
-        panels = []
         target_model = context.get('target_model', None)
         target_id = context.get('target_id', None)
 
         # Only add panel for Purchase Orders
-        if target_model == 'purchaseorder' and target_id:
-            # Check if approvals are enabled
-            if self.get_setting('ENABLE_APPROVALS'):
-                panels.append({
-                    'key': 'po-approvals-panel',
-                    'title': str(_('Approvals')),
-                    'description': str(_('Purchase Order approval workflow')),
-                    'icon': 'ti:checkbox:outline',
-                    'feature_type': 'panel',
-                    'options': {},
-                    'source': self.plugin_static_file(
-                        'approvals_panel.js:renderPanel'
-                    ),
-                    'context': {
-                        'order_id': target_id,
-                        'plugin_slug': self.slug,
-                    },
-                })
+        if target_model != 'purchaseorder' or not target_id:
+            return []
 
-        return panels
+        return [
+            {
+                **panel,
+                'context': {
+                    'order_id': target_id,
+                    'plugin_slug': self.slug,
+                },
+            }
+            for panel in self.get_ui_features_cached('panels')
+        ]
 
     def get_ui_dashboard_items(self, request: 'Request', context: dict, **kwargs) -> list:
         """Return custom dashboard items for the InvenTree dashboard.
@@ -196,46 +589,10 @@ class POApprovalsPlugin(
         Returns:
             List of UIFeature dicts for dashboard items
         """
-        items = []
-
-        # Only add widget if approvals are enabled
-        if self.get_setting('ENABLE_APPROVALS'):
-            items.append({
-                'key': 'pending-approvals-widget',
-                'title': str(_('POs Needing Your Approval')),
-                'description': str(_('Purchase Orders awaiting your approval')),
-                'icon': 'ti:checkbox:outline',
-                'source': self.plugin_static_file(
-                    'approvals_panel.js:renderDashboardWidget'
-                ),
-                'context': {
-                    'plugin_slug': self.slug,
-                },
-                'options': {
-                    'width': 4,
-                    'height': 2,
-                },
-            })
-            
-            # Widget showing all non-high-value pending approvals (any approver can approve)
-            items.append({
-                'key': 'any-approver-widget',
-                'title': str(_('Pending Approvals Any Approver')),
-                'description': str(_('Non-high-value POs that any approver can approve')),
-                'icon': 'ti:users:outline',
-                'source': self.plugin_static_file(
-                    'approvals_panel.js:renderAnyApproverWidget'
-                ),
-                'context': {
-                    'plugin_slug': self.slug,
-                },
-                'options': {
-                    'width': 4,
-                    'height': 2,
-                },
-            })
-
-        return items
+        return [
+            {**item, 'context': {'plugin_slug': self.slug}}
+            for item in self.get_ui_features_cached('dashboard_items')
+        ]
 
     def get_ui_navigation_items(self, request: 'Request', context: dict, **kwargs) -> list:
         """Return custom navigation items for the sidebar.
@@ -251,39 +608,25 @@ class POApprovalsPlugin(
         Returns:
             List of UIFeature dicts for navigation items
         """
-        items = []
-
-        # Only add navigation if approvals are enabled
-        if self.get_setting('ENABLE_APPROVALS'):
-            items.append({
-                'key': 'po-approvals-nav',
-                'title': str(_('PO Approvals')),
-                'description': str(_('Purchase Orders with approval status')),
-                'icon': 'ti:checkbox:outline',
-                'feature_type': 'navigation',
-                'options': {
-                    'navigation_group': 'purchasing',
-                },
-                'source': self.plugin_static_file(
-                    'approvals_panel.js:renderPOApprovalsPage'
-                ),
-                'context': {
-                    'plugin_slug': self.slug,
-                },
-            })
-
-        return items
+        return [
+            {**item, 'context': {'plugin_slug': self.slug}}
+            for item in self.get_ui_features_cached('navigation_items')
+        ]
 
     def validate_model_instance(self, instance, deltas=None):
         """Validate Purchase Order instances to enforce approval workflow.
         
-        This prevents placing an order without the required approvals.
+        This prevents placing an order without the required approvals, and
+        invalidates an approval when the order content changes afterwards.
         """
         from django.core.exceptions import ValidationError
         from order.models import PurchaseOrder
         from order.status_codes import PurchaseOrderStatus
 
-        # Only validate PurchaseOrder instances
+        from . import helpers
+
+        # Only validate PurchaseOrder instances (line item changes are
+        # checked once saved, see check_line_item_fingerprint)
         if not isinstance(instance, PurchaseOrder):
             return
 
@@ -291,8 +634,15 @@ class POApprovalsPlugin(
         if not self.get_setting('ENABLE_APPROVALS'):
             return
 
+        if not deltas:
+            return
+
+        # Changes which cannot be attributed to a single line (e.g. a deleted line)
+        if {'supplier', 'order_currency', 'total_price'}.intersection(deltas):
+            helpers.verify_order_fingerprint(instance, commit=False)
+
         # Check if status is being changed to PLACED
-        if deltas and 'status' in deltas:
+        if 'status' in deltas:
             new_status = deltas['status'].get('new')
             if new_status == PurchaseOrderStatus.PLACED.value:
                 # Check if order has required approvals
@@ -302,16 +652,85 @@ class POApprovalsPlugin(
                     })
 
     def _has_required_approvals(self, order):
-        """Check if the order has the required number of approvals."""
-        approval_data = order.get_metadata(self.METADATA_KEY, {})
-        approvals = approval_data.get('approvals', [])
-        
-        approved_count = sum(
-            1 for a in approvals 
-            if a.get('status') == 'approved'
-        )
-        
-        return approved_count >= 1
+        """Check if the order has the required number of approvals.
+
+        This only reads the compact approval state and compares the stored
+        content fingerprint, so it does not need to walk the approval history
+        or recompute the order total.
+        """
+        from . import helpers
+
+        return helpers.is_fully_approved(order) and not helpers.has_content_drifted(order)
+
+    def get_required_approvals(self, order, is_high_value=None):
+        """Get the number of approvals required for the order.
+
+        High-value orders use the HIGH_VALUE_REQUIRED_APPROVALS setting,
+        all other orders use REQUIRED_APPROVALS.
+
+        Args:
+            order: The PurchaseOrder instance
+            is_high_value: Optional precomputed result of is_high_value_order
+        """
+        if is_high_value is None:
+            is_high_value = self.is_high_value_order(order)
+
+        key = 'HIGH_VALUE_REQUIRED_APPROVALS' if is_high_value else 'REQUIRED_APPROVALS'
+
+        try:
+            return max(1, int(self.get_setting(key)))
+        except (ValueError, TypeError):
+            return 1
+
+    def get_auto_approval_rules(self):
+        """Get the parsed auto-approval rules.
+
+        Returns:
+            List of rule dicts, or an empty list if the rules are invalid
+        """
+        from django.core.exceptions import ValidationError
+        from .rules import parse_rules
+
+        try:
+            return parse_rules(self.get_setting('AUTO_APPROVAL_RULES', ''))
+        except ValidationError:
+            return []
+
+    def auto_approve_pending_orders(self):
+        """Scheduled task which auto-approves matching pending orders."""
+        from .rules import sweep_pending_orders
+
+        if not self.get_setting('ENABLE_APPROVALS'):
+            return 0
+
+        return sweep_pending_orders(self)
+
+    def rebuild_approval_index(self):
+        """Scheduled task which rebuilds the approval index from the order metadata."""
+        from .approval_index import index_available, rebuild_index
+
+        if not index_available():
+            return 0
+
+        return rebuild_index()
+
+    def rebuild_turnaround_rollups(self):
+        """Scheduled task which rebuilds the turnaround analytics rollups from the order metadata."""
+        from .analytics import rebuild_rollups, rollups_available
+
+        if not rollups_available():
+            return 0
+
+        return rebuild_rollups()
+
+    def rebuild_search_index(self):
+        """Scheduled task which rebuilds the search documents from the orders and their metadata."""
+        from .search import rebuild_search_index, search_available
+
+        if not search_available():
+            return 0
+
+        return rebuild_search_index()
 
     def get_high_value_threshold(self):
         """Get the high value threshold as a decimal."""
@@ -340,11 +759,14 @@ class POApprovalsPlugin(
 
     def is_high_value_order(self, order):
         """Check if the order is considered high value."""
-        if not order.total_price:
-            return False
-        
-        threshold = self.get_high_value_threshold()
-        return order.total_price.amount >= threshold
+        from .instrumentation import phase
+
+        with phase('total_price'):
+            if not order.total_price:
+                return False
+            
+            threshold = self.get_high_value_threshold()
+            return order.total_price.amount >= threshold
 
     def get_custom_state_key(self, state_name):
         """Get the custom state key from settings.
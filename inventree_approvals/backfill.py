@@ -0,0 +1,195 @@
+"""Backfill, rebuild and verify the derived approval state.
+
+The approval data in the PurchaseOrder metadata is the source of truth.
+Everything else is derived from it:
+
+- state: the compact approval state stored alongside the approvals list
+- index: the ApprovalIndex / ApprovalIndexApprover rows (approval_index.py)
+- search: the ApprovalSearchDocument rows (search.py)
+- rollups: the ApprovalTurnaroundRollup rows (analytics.py)
+
+The rebuild_approval_state management command walks the orders in
+primary-key chunks and rebuilds the first three per chunk (in parallel,
+with --workers), then recomputes the rollups, which aggregate over every
+order, in one pass. In verify mode, each chunk is compared with what the
+metadata says it should be, and only the orders which have drifted are
+rewritten (or just reported, in a dry run).
+"""
+
+import copy
+import json
+import os
+
+STEPS = ('state', 'index', 'search', 'rollups')
+
+# Steps which are processed per chunk of orders
+CHUNK_STEPS = ('state', 'index', 'search')
+
+# Rows fetched per database round trip within a chunk
+ITERATOR_CHUNK_SIZE = 500
+
+
+def plan_chunks(chunk_size):
+    """Split the purchase orders into primary-key ranges.
+
+    Returns:
+        List of [first pk, end pk] ranges; the end is exclusive, and None
+        for the last range, so it includes orders created meanwhile
+    """
+    from order.models import PurchaseOrder
+
+    starts = []
+
+    pks = PurchaseOrder.objects.order_by('pk').values_list('pk', flat=True)
+
+    for index, pk in enumerate(pks.iterator(chunk_size=10000)):
+        if index % chunk_size == 0:
+            starts.append(pk)
+
+    return [[start, end] for start, end in zip(starts, starts[1:] + [None])]
+
+
+def process_chunk(chunk, steps, verify=False, repair=True):
+    """Rebuild or verify the derived state of one chunk of orders.
+
+    Args:
+        chunk: The [first pk, end pk] range of the chunk
+        steps: The CHUNK_STEPS to run
+        verify: Only rewrite the orders whose derived state differs from their metadata
+        repair: Write the changes (False for a dry run)
+
+    Returns:
+        Dict with the number of 'orders' in the chunk, and per step the
+        number of orders written (or, when verifying, found to have drifted)
+    """
+    from django.db import transaction
+
+    from order.models import PurchaseOrder
+
+    from . import approval_index, helpers, search
+
+    start, end = chunk
+
+    orders = PurchaseOrder.objects.filter(pk__gte=start).order_by('pk').only('pk', 'metadata')
+
+    if end is not None:
+        orders = orders.filter(pk__lt=end)
+
+    result = {step: 0 for step in steps}
+
+    with transaction.atomic():
+        if repair:
+            # Approvals recorded meanwhile lock the order too (see helpers.lock_approval_data),
+            # so they wait for the chunk, rather than being overwritten
+            orders = orders.select_for_update()
+
+        orders = list(orders.iterator(chunk_size=ITERATOR_CHUNK_SIZE))
+        result['orders'] = len(orders)
+
+        if 'state' in steps:
+            changed = []
+
+            for order in orders:
+                data = helpers.get_approval_data(order)
+
+                if not data:
+                    continue
+
+                expected = helpers.update_approval_state(copy.deepcopy(data))
+
+                if data.get('state') != expected:
+                    data['state'] = expected
+                    helpers.set_approval_data(order, data, commit=False)
+                    changed.append(order)
+
+            # The stored state is always compared, as rewriting unchanged metadata gains nothing
+            result['state'] = len(changed)
+
+            if changed and repair:
+                PurchaseOrder.objects.bulk_update(changed, ['metadata'], batch_size=ITERATOR_CHUNK_SIZE)
+
+        if 'index' in steps:
+            if verify:
+                current = approval_index.read_index_entries([order.pk for order in orders])
+                changed = [order for order in orders if current.get(order.pk) != approval_index.get_index_entry(order)]
+            else:
+                changed = orders
+
+            result['index'] = len(changed)
+
+            if changed and repair:
+                # A failed chunk must not be recorded as done in the checkpoint
+                approval_index.sync_orders(changed, raise_errors=True)
+
+        if 'search' in steps:
+            documents = search.build_documents(orders)
+
+            if verify:
+                current = search.read_documents([order.pk for order in orders])
+                documents = [
+                    document for document in documents
+                    if current.get(document.order_id) != tuple(getattr(document, field) for field in search.DOCUMENT_FIELDS)
+                ]
+
+            result['search'] = len(documents)
+
+            if documents and repair:
+                search.write_documents(documents)
+
+    return result
+
+
+def rollups_differ(expected, current):
+    """Check whether two rollup totals differ (allowing for float rounding of the sums)."""
+    if expected is None or current is None:
+        return True
+
+    return (
+        expected['count'] != current['count']
+        or list(expected['buckets']) != list(current['buckets'])
+        or abs(expected['total_seconds'] - current['total_seconds']) > 1e-6 * max(1.0, abs(expected['total_seconds']))
+    )
+
+
+def process_rollups(verify=False, repair=True):
+    """Rebuild or verify the turnaround rollups.
+
+    Returns:
+        Number of rollup rows written (or, when verifying, which differ)
+    """
+    from . import analytics
+
+    expected = analytics.compute_rollups()
+
+    if verify:
+        current = analytics.read_rollups()
+        changed = sum(
+            1 for key in set(expected) | set(current)
+            if rollups_differ(expected.get(key), current.get(key))
+        )
+    else:
+        changed = len(expected)
+
+    if changed and repair:
+        analytics.write_rollups(expected)
+
+    return changed
+
+
+def load_checkpoint(path):
+    """Load a checkpoint file, or None if there is none."""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def save_checkpoint(path, checkpoint):
+    """Write a checkpoint file atomically, so an interrupted write cannot corrupt it."""
+    temp_path = f'{path}.tmp'
+
+    with open(temp_path, 'w') as f:
+        json.dump(checkpoint, f)
+
+    os.replace(temp_path, path)
@@ -0,0 +1,159 @@
+"""Approval delegation for the PO Approvals plugin.
+
+Delegations are configured as a JSON list in the APPROVAL_DELEGATIONS setting:
+
+    [
+        {"from": "alice", "to": "bob", "start": "2026-07-01", "end": "2026-07-14"}
+    ]
+
+While a delegation is active, the delegate can act on any approval request
+addressed to the delegating user, and is notified alongside them.
+
+The delegations are compiled into an in-memory routing table which is only
+rebuilt when the setting changes, so resolving delegates does not add any
+queries per order.
+"""
+
+import json
+from datetime import date
+
+from django.core.exceptions import ValidationError
+
+
+class RoutingTable:
+    """Lookup table of delegations, keyed by user ID in both directions."""
+
+    def __init__(self, delegations):
+        """Build the table from a list of (from_id, to_id, start, end) tuples."""
+        self.delegates = {}
+        self.delegators = {}
+
+        for from_id, to_id, start, end in delegations:
+            self.delegates.setdefault(from_id, []).append((to_id, start, end))
+            self.delegators.setdefault(to_id, []).append((from_id, start, end))
+
+    @staticmethod
+    def _active(entries, on):
+        """Return the user IDs from the entries which are active on the given date."""
+        on = on or date.today()
+
+        return [
+            user_id for user_id, start, end in entries
+            if (start is None or start <= on) and (end is None or on <= end)
+        ]
+
+    def get_delegates(self, user_id, on=None):
+        """Get the users currently acting on behalf of the given user."""
+        return self._active(self.delegates.get(user_id, []), on)
+
+    def get_delegators(self, user_id, on=None):
+        """Get the users the given user is currently acting on behalf of."""
+        return self._active(self.delegators.get(user_id, []), on)
+
+
+# Compiled routing table, along with the setting value it was built from
+_routing_cache = {
+    'source': None,
+    'table': RoutingTable([]),
+}
+
+
+def _parse_date(value, field, index):
+    """Parse an optional ISO date from a delegation entry."""
+    if value in (None, ''):
+        return None
+
+    try:
+        return date.fromisoformat(str(value))
+    except ValueError:
+        raise ValidationError(f'Delegation {index + 1}: {field} must be a date (YYYY-MM-DD)')
+
+
+def parse_delegations(value):
+    """Parse and validate the delegations.
+
+    Args:
+        value: JSON string from the APPROVAL_DELEGATIONS setting
+
+    Returns:
+        List of (from_username, to_username, start, end) tuples
+
+    Raises:
+        ValidationError: If the delegations are malformed
+    """
+    if not value:
+        return []
+
+    try:
+        entries = json.loads(value)
+    except ValueError as e:
+        raise ValidationError(f'Invalid JSON: {e}')
+
+    if not isinstance(entries, list):
+        raise ValidationError('Delegations must be a JSON list')
+
+    delegations = []
+
+    for index, entry in enumerate(entries):
+        if not isinstance(entry, dict) or not entry.get('from') or not entry.get('to'):
+            raise ValidationError(f"Delegation {index + 1} must have 'from' and 'to' usernames")
+
+        if entry['from'] == entry['to']:
+            raise ValidationError(f'Delegation {index + 1}: a user cannot delegate to themselves')
+
+        start = _parse_date(entry.get('start'), 'start', index)
+        end = _parse_date(entry.get('end'), 'end', index)
+
+        if start and end and end < start:
+            raise ValidationError(f'Delegation {index + 1}: end must not be before start')
+
+        delegations.append((entry['from'], entry['to'], start, end))
+
+    return delegations
+
+
+def validate_delegations(value):
+    """Validator for the APPROVAL_DELEGATIONS setting."""
+    parse_delegations(value)
+
+
+def compile_routing_table(value):
+    """Compile the delegations setting into a routing table.
+
+    Usernames are resolved to user IDs with a single query. Delegations
+    referring to unknown or inactive users are ignored.
+    """
+    from django.contrib.auth import get_user_model
+
+    try:
+        delegations = parse_delegations(value)
+    except ValidationError:
+        return RoutingTable([])
+
+    usernames = {d[0] for d in delegations} | {d[1] for d in delegations}
+    user_ids = dict(
+        get_user_model().objects.filter(
+            username__in=usernames, is_active=True
+        ).values_list('username', 'pk')
+    )
+
+    return RoutingTable([
+        (user_ids[from_name], user_ids[to_name], start, end)
+        for from_name, to_name, start, end in delegations
+        if from_name in user_ids and to_name in user_ids
+    ])
+
+
+def get_routing_table(plugin):
+    """Get the routing table for the current delegations setting.
+
+    The table is rebuilt only when the setting value changes.
+    """
+    source = plugin.get_setting('APPROVAL_DELEGATIONS', '') or ''
+
+    if source != _routing_cache['source']:
+        _routing_cache['table'] = compile_routing_table(source)
+        _routing_cache['source'] = source
+
+    return _routing_cache['table']
+
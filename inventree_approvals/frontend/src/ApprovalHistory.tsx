@@ -16,6 +16,8 @@ function getStatusBadge(status: ApprovalStatus): { color: string; label: string
       return { color: 'red', label: '✗ Rejected' };
     case 'pending':
       return { color: 'yellow', label: '⏳ Pending' };
+    case 'invalidated':
+      return { color: 'orange', label: '↺ Invalidated' };
     default:
       return { color: 'gray', label: status };
   }
@@ -61,6 +63,9 @@ export function ApprovalHistory({ approvals }: ApprovalHistoryProps) {
           {approval.status === 'pending'
             ? approval.requested_approver_name || 'Any'
             : approval.actual_approver_name || '-'}
+          {approval.on_behalf_of_name && (
+            <Text size="xs" c="dimmed">for {approval.on_behalf_of_name}</Text>
+          )}
         </Table.Td>
         <Table.Td>
           <Text size="xs" c="dimmed">
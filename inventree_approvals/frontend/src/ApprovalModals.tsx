@@ -1,99 +1,189 @@
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useMemo } from 'react';
 import {
   Modal,
   Button,
   Select,
+  MultiSelect,
   Textarea,
   Stack,
   Group,
-  LoadingOverlay,
   Alert,
 } from '@mantine/core';
+import { notifications } from '@mantine/notifications';
 import { IconAlertCircle } from '@tabler/icons-react';
 import type { InvenTreePluginContext } from '@inventreedb/ui';
 import type {
-  ApproverUser,
+  ApprovalStatusResponse,
   ApproverUsersResponse,
   RequestApprovalResponse,
   ApprovalDecisionResponse,
 } from './types';
+import { approvalListKeys, mutateQuery, queryKeys, useQuery } from './queryCache';
+
+/**
+ * Generate a new idempotency key.
+ *
+ * The key is sent with each POST so that a retried request
+ * (e.g. by a proxy or a double click) is only processed once.
+ */
+function newIdempotencyKey(): string {
+  return crypto.randomUUID();
+}
+
+/**
+ * Show a failed approval action.
+ *
+ * The modals close as soon as an action is submitted, so errors from the
+ * server are shown as a notification (after the status is rolled back).
+ */
+function notifyError(title: string, err: unknown) {
+  notifications.show({
+    title,
+    message: err instanceof Error ? err.message : 'An error occurred',
+    color: 'red',
+  });
+}
+
+/**
+ * The expected status of an order once an approval has been requested
+ */
+function requestedStatus(status: ApprovalStatusResponse): ApprovalStatusResponse {
+  return {
+    ...status,
+    approval_status: 'pending',
+    has_pending: true,
+    is_fully_approved: false,
+    approved_count: 0,
+    can_request_approval: false,
+    can_request_reason: null,
+  };
+}
+
+/**
+ * The expected status of an order once the current user has approved or rejected it
+ */
+function decidedStatus(status: ApprovalStatusResponse, approved: boolean): ApprovalStatusResponse {
+  if (!approved) {
+    return {
+      ...status,
+      approval_status: 'rejected',
+      has_pending: false,
+      pending_approver_ids: [],
+      user_can_approve: false,
+      can_request_approval: true,
+    };
+  }
+
+  const approvedCount = status.approved_count + 1;
+  const fullyApproved = approvedCount >= status.total_required;
+
+  return {
+    ...status,
+    approved_count: approvedCount,
+    approval_status: fullyApproved ? 'approved' : 'pending',
+    is_fully_approved: fullyApproved,
+    has_pending: !fullyApproved,
+    user_can_approve: false,
+  };
+}
 
 interface RequestModalProps {
   opened: boolean;
   onClose: () => void;
-  onSuccess: () => void;
   orderId: number;
   pluginSlug: string;
   isHighValue: boolean;
+  requiredApprovals: number;
   context: InvenTreePluginContext;
 }
 
 /**
  * Modal for requesting an approval
+ *
+ * When more than one approval is required, several approvers can be
+ * selected and they are all notified at once.
  */
 export function RequestApprovalModal({
   opened,
   onClose,
-  onSuccess,
   orderId,
   pluginSlug,
   isHighValue,
+  requiredApprovals,
   context,
 }: RequestModalProps) {
-  const [loading, setLoading] = useState(false);
   const [error, setError] = useState<string | null>(null);
-  const [approvers, setApprovers] = useState<ApproverUser[]>([]);
   const [selectedApprover, setSelectedApprover] = useState<string | null>(null);
+  const [selectedApprovers, setSelectedApprovers] = useState<string[]>([]);
   const [notes, setNotes] = useState('');
 
-  // Fetch available approvers when modal opens
-  useEffect(() => {
-    if (opened) {
-      setError(null);
-      loadApprovers();
-    }
-  }, [opened]);
+  const isQuorum = requiredApprovals > 1;
 
-  async function loadApprovers() {
-    try {
+  // One key per time the modal is opened
+  const idempotencyKey = useMemo(() => newIdempotencyKey(), [opened]);
+
+  // Fetch available approvers when modal opens (cached between openings)
+  const { data: approversData } = useQuery(
+    queryKeys.approvers(isHighValue),
+    async () => {
       const params = isHighValue ? '?is_high_value=true' : '';
       const response = await context.api?.get(
         `plugin/${pluginSlug}/users/${params}`
       );
-      const data = response?.data as ApproverUsersResponse;
-      setApprovers(data?.results || []);
-    } catch (err) {
-      console.error('Failed to load approvers:', err);
-      setApprovers([]);
+      return response?.data as ApproverUsersResponse;
+    },
+    { enabled: opened }
+  );
+
+  const approvers = approversData?.results || [];
+
+  useEffect(() => {
+    if (opened) {
+      setError(null);
     }
-  }
+  }, [opened]);
 
   async function handleSubmit() {
-    setLoading(true);
-    setError(null);
+    if (isQuorum && selectedApprovers.length > 0 && selectedApprovers.length < requiredApprovals) {
+      setError(`At least ${requiredApprovals} approvers must be selected for this order`);
+      return;
+    }
+
+    const body = {
+      approver_id: isQuorum ? null : selectedApprover,
+      approver_ids: isQuorum ? selectedApprovers : [],
+      notes: notes,
+    };
+
+    // The panel shows the expected status straight away
+    onClose();
 
     try {
-      const response = await context.api?.post(
-        `plugin/${pluginSlug}/po/${orderId}/request/`,
-        {
-          approver_id: selectedApprover,
-          notes: notes,
-        }
-      );
-      const data = response?.data as RequestApprovalResponse;
-
-      if (data?.success) {
-        setNotes('');
-        setSelectedApprover(null);
-        onSuccess();
-        onClose();
-      } else {
-        setError(data?.error || 'Failed to request approval');
-      }
+      await mutateQuery<ApprovalStatusResponse, RequestApprovalResponse>(queryKeys.status(orderId), {
+        request: async () => {
+          const response = await context.api?.post(
+            `plugin/${pluginSlug}/po/${orderId}/request/`,
+            body,
+            { headers: { 'Idempotency-Key': idempotencyKey } }
+          );
+          const data = response?.data as RequestApprovalResponse;
+
+          if (!data?.success) {
+            throw new Error(data?.error || 'Failed to request approval');
+          }
+
+          return data;
+        },
+        optimistic: requestedStatus,
+        result: (data) => data.summary,
+        invalidate: approvalListKeys,
+      });
+
+      setNotes('');
+      setSelectedApprover(null);
+      setSelectedApprovers([]);
     } catch (err) {
-      setError(err instanceof Error ? err.message : 'An error occurred');
-    } finally {
-      setLoading(false);
+      notifyError('Approval request failed', err);
     }
   }
 
@@ -110,8 +200,6 @@ export function RequestApprovalModal({
 
   return (
     <Modal opened={opened} onClose={onClose} title="Request Approval" size="md">
-      <LoadingOverlay visible={loading} />
-      
       <Stack gap="md">
         {error && (
           <Alert color="red" icon={<IconAlertCircle size={16} />}>
@@ -119,14 +207,26 @@ export function RequestApprovalModal({
           </Alert>
         )}
 
-        <Select
-          label="Select Approver (optional)"
-          placeholder="Select an approver"
-          data={approverOptions}
-          value={selectedApprover}
-          onChange={setSelectedApprover}
-          clearable
-        />
+        {isQuorum ? (
+          <MultiSelect
+            label={`Select Approvers (at least ${requiredApprovals}, optional)`}
+            placeholder="Leave empty for any available approvers"
+            data={approverOptions.filter((option) => option.value && option.value !== 'teams_channel')}
+            value={selectedApprovers}
+            onChange={setSelectedApprovers}
+            clearable
+            searchable
+          />
+        ) : (
+          <Select
+            label="Select Approver (optional)"
+            placeholder="Select an approver"
+            data={approverOptions}
+            value={selectedApprover}
+            onChange={setSelectedApprover}
+            clearable
+          />
+        )}
 
         <Textarea
           label="Notes (optional)"
@@ -140,7 +240,7 @@ export function RequestApprovalModal({
           <Button variant="default" onClick={onClose}>
             Cancel
           </Button>
-          <Button onClick={handleSubmit} loading={loading}>
+          <Button onClick={handleSubmit}>
             Submit Request
           </Button>
         </Group>
@@ -152,7 +252,6 @@ export function RequestApprovalModal({
 interface DecisionModalProps {
   opened: boolean;
   onClose: () => void;
-  onSuccess: () => void;
   orderId: number;
   pluginSlug: string;
   isApprove: boolean;
@@ -165,46 +264,52 @@ interface DecisionModalProps {
 export function ApprovalDecisionModal({
   opened,
   onClose,
-  onSuccess,
   orderId,
   pluginSlug,
   isApprove,
   context,
 }: DecisionModalProps) {
-  const [loading, setLoading] = useState(false);
-  const [error, setError] = useState<string | null>(null);
   const [notes, setNotes] = useState('');
 
+  // One key per time the modal is opened
+  const idempotencyKey = useMemo(() => newIdempotencyKey(), [opened]);
+
   useEffect(() => {
     if (opened) {
-      setError(null);
       setNotes('');
     }
   }, [opened]);
 
   async function handleSubmit() {
-    setLoading(true);
-    setError(null);
+    const endpoint = isApprove ? 'approve' : 'reject';
+
+    // The panel shows the expected status straight away
+    onClose();
 
     try {
-      const endpoint = isApprove ? 'approve' : 'reject';
-      const response = await context.api?.post(
-        `plugin/${pluginSlug}/po/${orderId}/${endpoint}/`,
-        { notes }
-      );
-      const data = response?.data as ApprovalDecisionResponse;
-
-      if (data?.success) {
-        setNotes('');
-        onSuccess();
-        onClose();
-      } else {
-        setError(data?.error || `Failed to ${isApprove ? 'approve' : 'reject'}`);
-      }
+      await mutateQuery<ApprovalStatusResponse, ApprovalDecisionResponse>(queryKeys.status(orderId), {
+        request: async () => {
+          const response = await context.api?.post(
+            `plugin/${pluginSlug}/po/${orderId}/${endpoint}/`,
+            { notes },
+            { headers: { 'Idempotency-Key': idempotencyKey } }
+          );
+          const data = response?.data as ApprovalDecisionResponse;
+
+          if (!data?.success) {
+            throw new Error(data?.error || `Failed to ${endpoint}`);
+          }
+
+          return data;
+        },
+        optimistic: (status) => decidedStatus(status, isApprove),
+        result: (data) => data.summary,
+        invalidate: approvalListKeys,
+      });
+
+      setNotes('');
     } catch (err) {
-      setError(err instanceof Error ? err.message : 'An error occurred');
-    } finally {
-      setLoading(false);
+      notifyError(isApprove ? 'Approval failed' : 'Rejection failed', err);
     }
   }
 
@@ -214,15 +319,7 @@ export function ApprovalDecisionModal({
 
   return (
     <Modal opened={opened} onClose={onClose} title={title} size="md">
-      <LoadingOverlay visible={loading} />
-      
       <Stack gap="md">
-        {error && (
-          <Alert color="red" icon={<IconAlertCircle size={16} />}>
-            {error}
-          </Alert>
-        )}
-
         <Textarea
           label="Notes (optional)"
           placeholder={`Add any notes for ${isApprove ? 'approving' : 'rejecting'} this request`}
@@ -235,7 +332,7 @@ export function ApprovalDecisionModal({
           <Button variant="default" onClick={onClose}>
             Cancel
           </Button>
-          <Button color={buttonColor} onClick={handleSubmit} loading={loading}>
+          <Button color={buttonColor} onClick={handleSubmit}>
             {buttonText}
           </Button>
         </Group>
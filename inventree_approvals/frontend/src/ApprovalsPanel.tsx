@@ -1,4 +1,4 @@
-import { useState, useEffect, useCallback } from 'react';
+import { useState, lazy, Suspense } from 'react';
 import {
   Stack,
   Group,
@@ -17,8 +17,16 @@ import {
 } from '@tabler/icons-react';
 import type { InvenTreePluginContext } from '@inventreedb/ui';
 import { ApprovalHistory } from './ApprovalHistory';
-import { RequestApprovalModal, ApprovalDecisionModal } from './ApprovalModals';
 import type { ApprovalStatusResponse, ApprovalsPluginCustomContext } from './types';
+import { queryKeys, useQuery } from './queryCache';
+
+// The modals are split into their own chunk, loaded when a modal is first opened
+const RequestApprovalModal = lazy(() =>
+  import('./ApprovalModals').then((module) => ({ default: module.RequestApprovalModal }))
+);
+const ApprovalDecisionModal = lazy(() =>
+  import('./ApprovalModals').then((module) => ({ default: module.ApprovalDecisionModal }))
+);
 
 interface ApprovalsPanelProps {
   context: InvenTreePluginContext;
@@ -33,50 +41,36 @@ export function ApprovalsPanel({ context }: ApprovalsPanelProps) {
   const orderId = customContext?.order_id || (context.id as number);
   const pluginSlug = customContext?.plugin_slug || 'approvals';
 
-  const [loading, setLoading] = useState(true);
-  const [error, setError] = useState<string | null>(null);
-  const [status, setStatus] = useState<ApprovalStatusResponse | null>(null);
+  const { data: status, error, loading } = useQuery(
+    queryKeys.status(orderId),
+    async () => {
+      const response = await context.api?.get(`plugin/${pluginSlug}/po/${orderId}/status/`);
+      return response?.data as ApprovalStatusResponse;
+    },
+    { enabled: !!orderId }
+  );
 
   // Modal states
   const [requestModalOpen, setRequestModalOpen] = useState(false);
   const [approveModalOpen, setApproveModalOpen] = useState(false);
   const [rejectModalOpen, setRejectModalOpen] = useState(false);
+  const [modalsLoaded, setModalsLoaded] = useState(false);
 
   /**
-   * Fetch approval status from the API using context.api
+   * Open a modal, loading the modal code on first use
    */
-  const fetchStatus = useCallback(async () => {
-    if (!orderId) {
-      setError('No order ID provided');
-      setLoading(false);
-      return;
-    }
-
-    try {
-      setLoading(true);
-      setError(null);
-      
-      // Use context.api for authenticated API calls
-      const response = await context.api?.get(`plugin/${pluginSlug}/po/${orderId}/status/`);
-      setStatus(response?.data as ApprovalStatusResponse);
-    } catch (err) {
-      setError(err instanceof Error ? err.message : 'Failed to load approval status');
-    } finally {
-      setLoading(false);
-    }
-  }, [orderId, pluginSlug, context.api]);
-
-  // Fetch status on mount and when orderId changes
-  useEffect(() => {
-    fetchStatus();
-  }, [fetchStatus]);
+  const openModal = (setOpen: (open: boolean) => void) => {
+    setModalsLoaded(true);
+    setOpen(true);
+  };
 
-  /**
-   * Handle successful approval action
-   */
-  const handleSuccess = useCallback(() => {
-    fetchStatus();
-  }, [fetchStatus]);
+  if (!orderId) {
+    return (
+      <Alert color="red" title="Error" icon={<IconAlertTriangle size={16} />}>
+        No order ID provided
+      </Alert>
+    );
+  }
 
   // Loading state
   if (loading && !status) {
@@ -149,7 +143,7 @@ export function ApprovalsPanel({ context }: ApprovalsPanelProps) {
         {status.can_request_approval && (
           <Button
             leftSection={<IconFileDescription size={16} />}
-            onClick={() => setRequestModalOpen(true)}
+            onClick={() => openModal(setRequestModalOpen)}
           >
             Request Approval
           </Button>
@@ -160,14 +154,14 @@ export function ApprovalsPanel({ context }: ApprovalsPanelProps) {
             <Button
               color="green"
               leftSection={<IconCheck size={16} />}
-              onClick={() => setApproveModalOpen(true)}
+              onClick={() => openModal(setApproveModalOpen)}
             >
               Approve
             </Button>
             <Button
               color="red"
               leftSection={<IconX size={16} />}
-              onClick={() => setRejectModalOpen(true)}
+              onClick={() => openModal(setRejectModalOpen)}
             >
               Reject
             </Button>
@@ -193,36 +187,38 @@ export function ApprovalsPanel({ context }: ApprovalsPanelProps) {
         </Text>
       )}
 
-      {/* Modals */}
-      <RequestApprovalModal
-        opened={requestModalOpen}
-        onClose={() => setRequestModalOpen(false)}
-        onSuccess={handleSuccess}
-        orderId={orderId}
-        pluginSlug={pluginSlug}
-        isHighValue={status.is_high_value}
-        context={context}
-      />
-
-      <ApprovalDecisionModal
-        opened={approveModalOpen}
-        onClose={() => setApproveModalOpen(false)}
-        onSuccess={handleSuccess}
-        orderId={orderId}
-        pluginSlug={pluginSlug}
-        isApprove={true}
-        context={context}
-      />
-
-      <ApprovalDecisionModal
-        opened={rejectModalOpen}
-        onClose={() => setRejectModalOpen(false)}
-        onSuccess={handleSuccess}
-        orderId={orderId}
-        pluginSlug={pluginSlug}
-        isApprove={false}
-        context={context}
-      />
+      {/* Modals (each action updates the status in the shared cache, see ApprovalModals) */}
+      {modalsLoaded && (
+        <Suspense fallback={null}>
+          <RequestApprovalModal
+            opened={requestModalOpen}
+            onClose={() => setRequestModalOpen(false)}
+            orderId={orderId}
+            pluginSlug={pluginSlug}
+            isHighValue={status.is_high_value}
+            requiredApprovals={status.required_approvals || 1}
+            context={context}
+          />
+
+          <ApprovalDecisionModal
+            opened={approveModalOpen}
+            onClose={() => setApproveModalOpen(false)}
+            orderId={orderId}
+            pluginSlug={pluginSlug}
+            isApprove={true}
+            context={context}
+          />
+
+          <ApprovalDecisionModal
+            opened={rejectModalOpen}
+            onClose={() => setRejectModalOpen(false)}
+            orderId={orderId}
+            pluginSlug={pluginSlug}
+            isApprove={false}
+            context={context}
+          />
+        </Suspense>
+      )}
     </Stack>
   );
 }
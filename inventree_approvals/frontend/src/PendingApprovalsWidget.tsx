@@ -1,4 +1,3 @@
-import { useState, useEffect, useCallback } from 'react';
 import {
   Stack,
   Group,
@@ -15,7 +14,8 @@ import {
   IconCheckbox,
 } from '@tabler/icons-react';
 import type { InvenTreePluginContext } from '@inventreedb/ui';
-import type { PendingApproval, PendingApprovalsResponse } from './types';
+import type { PendingApprovalsResponse } from './types';
+import { queryKeys, useQuery } from './queryCache';
 
 interface PendingApprovalsWidgetProps {
   context: InvenTreePluginContext;
@@ -27,31 +27,16 @@ interface PendingApprovalsWidgetProps {
 export function PendingApprovalsWidget({ context }: PendingApprovalsWidgetProps) {
   const pluginSlug = (context.context as { plugin_slug?: string })?.plugin_slug || 'approvals';
 
-  const [loading, setLoading] = useState(true);
-  const [error, setError] = useState<string | null>(null);
-  const [pendingApprovals, setPendingApprovals] = useState<PendingApproval[]>([]);
-
-  /**
-   * Fetch pending approvals from the API
-   */
-  const fetchPendingApprovals = useCallback(async () => {
-    try {
-      setLoading(true);
-      setError(null);
-      
+  // Shared with any other widget or page showing the same list
+  const { data, error, loading } = useQuery(
+    queryKeys.pending,
+    async () => {
       const response = await context.api?.get(`plugin/${pluginSlug}/pending/`);
-      const data = response?.data as PendingApprovalsResponse;
-      setPendingApprovals(data?.results || []);
-    } catch (err) {
-      setError(err instanceof Error ? err.message : 'Failed to load pending approvals');
-    } finally {
-      setLoading(false);
+      return response?.data as PendingApprovalsResponse;
     }
-  }, [pluginSlug, context.api]);
+  );
 
-  useEffect(() => {
-    fetchPendingApprovals();
-  }, [fetchPendingApprovals]);
+  const pendingApprovals = data?.results || [];
 
   // Loading state
   if (loading) {
@@ -62,8 +47,8 @@ export function PendingApprovalsWidget({ context }: PendingApprovalsWidgetProps)
     );
   }
 
-  // Error state
-  if (error) {
+  // Error state (cached data is still shown if a revalidation fails)
+  if (error && !data) {
     return (
       <Center p="md" h="100%">
         <Stack align="center" gap="xs">
@@ -3,9 +3,15 @@
  *
  * A custom navigation page that displays all Purchase Orders with their
  * approval status in an additional column.
+ *
+ * The table is server-driven and virtualized: sorting, searching and
+ * filtering are done by the po-list endpoint, only the pages of rows
+ * around the visible window are fetched, and only the visible rows are
+ * rendered. Memory use and render time do not grow with the number of
+ * orders.
  */
 
-import { useEffect, useState, useMemo, useCallback } from 'react';
+import { useEffect, useMemo, useRef, useState, type ReactNode } from 'react';
 import {
   Badge,
   Center,
@@ -16,9 +22,21 @@ import {
   Title,
   Paper,
   Anchor,
+  ScrollArea,
+  Select,
+  Table,
+  TextInput,
+  UnstyledButton,
 } from '@mantine/core';
-import { DataTable, type DataTableSortStatus } from 'mantine-datatable';
+import { useDebouncedValue } from '@mantine/hooks';
+import {
+  IconChevronDown,
+  IconChevronUp,
+  IconSearch,
+  IconSelector,
+} from '@tabler/icons-react';
 import type { InvenTreePluginContext } from '@inventreedb/ui';
+import { queryKeys, useQuery } from './queryCache';
 
 // Type definitions
 interface SupplierDetail {
@@ -115,6 +133,174 @@ function formatDate(dateString: string | null): string {
   }
 }
 
+// Rows per request to the po-list endpoint
+const PAGE_SIZE = 100;
+
+// Fixed row height, so the visible rows can be computed from the scroll position (px)
+const ROW_HEIGHT = 36;
+
+// Height of the scrolling table body (px)
+const TABLE_HEIGHT = 600;
+
+// Rows rendered above and below the visible window
+const OVERSCAN = 10;
+
+// Only the fields the table displays
+const FIELDS = [
+  'pk',
+  'reference',
+  'description',
+  'status',
+  'status_custom_key',
+  'supplier_detail',
+  'supplier_reference',
+  'line_items',
+  'completed_lines',
+  'total_price',
+  'order_currency',
+  'target_date',
+  'responsible_detail',
+  'approval_status',
+].join(',');
+
+interface SortStatus {
+  column: string;
+  direction: 'asc' | 'desc';
+}
+
+interface PurchaseOrderPage {
+  count: number;
+  results: PurchaseOrderRecord[];
+}
+
+interface Column {
+  title: string;
+  // Ordering key of the po-list endpoint (not sortable if missing)
+  ordering?: string;
+  width?: number | string;
+  render: (record: PurchaseOrderRecord) => ReactNode;
+}
+
+const COLUMNS: Column[] = [
+  {
+    title: 'Reference',
+    ordering: 'reference',
+    width: 120,
+    render: (record) => (
+      <Anchor href={`/web/purchasing/purchase-order/${record.pk}/`} size="sm">
+        {record.reference}
+      </Anchor>
+    ),
+  },
+  {
+    title: 'Description',
+    ordering: 'description',
+    render: (record) => (
+      <Text size="sm" lineClamp={1}>
+        {record.description || '-'}
+      </Text>
+    ),
+  },
+  {
+    title: 'Supplier',
+    ordering: 'supplier',
+    render: (record) => (
+      <Text size="sm" lineClamp={1} c={record.supplier_detail ? undefined : 'dimmed'}>
+        {record.supplier_detail?.name || '-'}
+      </Text>
+    ),
+  },
+  {
+    title: 'Supplier Ref',
+    ordering: 'supplier_reference',
+    render: (record) => <Text size="sm">{record.supplier_reference || '-'}</Text>,
+  },
+  {
+    title: 'Line Items',
+    ordering: 'line_items',
+    width: 100,
+    render: (record) => (
+      <Text size="sm">
+        {record.completed_lines}/{record.line_items}
+      </Text>
+    ),
+  },
+  {
+    title: 'Status',
+    ordering: 'status',
+    width: 110,
+    render: (record) => (
+      <Center>
+        <POStatusBadge status={record.status_custom_key || record.status} />
+      </Center>
+    ),
+  },
+  {
+    title: 'Approval Status',
+    ordering: 'approval_status',
+    width: 130,
+    render: (record) => (
+      <Center>
+        <ApprovalStatusBadge status={record.approval_status} />
+      </Center>
+    ),
+  },
+  {
+    title: 'Target Date',
+    ordering: 'target_date',
+    width: 110,
+    render: (record) => <Text size="sm">{formatDate(record.target_date)}</Text>,
+  },
+  {
+    title: 'Total Price',
+    ordering: 'total_price',
+    width: 130,
+    render: (record) => (
+      <Text size="sm">
+        {record.total_price ? `${record.total_price} ${record.order_currency || ''}` : '-'}
+      </Text>
+    ),
+  },
+  {
+    title: 'Responsible',
+    render: (record) => <Text size="sm">{record.responsible_detail?.name || '-'}</Text>,
+  },
+];
+
+const APPROVAL_FILTER_OPTIONS = Object.entries(APPROVAL_STATUS_CONFIG).map(([value, config]) => ({
+  value,
+  label: config.label,
+}));
+
+/**
+ * Sortable column header
+ */
+function SortHeader({
+  column,
+  sortStatus,
+  onSort,
+}: {
+  column: Column;
+  sortStatus: SortStatus;
+  onSort: (column: string) => void;
+}) {
+  if (!column.ordering) {
+    return <Text size="sm" fw={700}>{column.title}</Text>;
+  }
+
+  const active = sortStatus.column === column.ordering;
+  const Icon = !active ? IconSelector : sortStatus.direction === 'asc' ? IconChevronUp : IconChevronDown;
+
+  return (
+    <UnstyledButton onClick={() => onSort(column.ordering!)}>
+      <Group gap={4} wrap="nowrap">
+        <Text size="sm" fw={700}>{column.title}</Text>
+        <Icon size={14} />
+      </Group>
+    </UnstyledButton>
+  );
+}
+
 /**
  * Main Purchase Orders with Approval Status page component
  */
@@ -123,198 +309,91 @@ export function PurchaseOrderApprovalsPage({
 }: {
   context: InvenTreePluginContext;
 }) {
-  const [loading, setLoading] = useState(true);
-  const [records, setRecords] = useState<PurchaseOrderRecord[]>([]);
-  const [error, setError] = useState<string | null>(null);
-  const [sortStatus, setSortStatus] = useState<DataTableSortStatus<PurchaseOrderRecord>>({
-    columnAccessor: 'reference',
+  const [sortStatus, setSortStatus] = useState<SortStatus>({
+    column: 'reference',
     direction: 'asc',
   });
+  const [search, setSearch] = useState('');
+  const [approvalStatus, setApprovalStatus] = useState<string | null>(null);
+  const [scroll, setScroll] = useState({ params: '', top: 0 });
+  const viewportRef = useRef<HTMLDivElement>(null);
+
+  const [debouncedSearch] = useDebouncedValue(search, 300);
+
+  // Query parameters shared by every page of the current view
+  const params = useMemo(() => {
+    const query = new URLSearchParams({
+      fields: FIELDS,
+      ordering: `${sortStatus.direction === 'desc' ? '-' : ''}${sortStatus.column}`,
+    });
 
-  // Fetch data from API
-  const fetchData = useCallback(async () => {
-    setLoading(true);
-    setError(null);
-    try {
-      const response = await context.api.get('/plugin/approvals/po-list/');
-      setRecords(response.data.results || []);
-    } catch (err: any) {
-      console.error('Failed to fetch PO data:', err);
-      setError(err?.message || 'Failed to load purchase orders');
-    } finally {
-      setLoading(false);
+    if (debouncedSearch.trim()) {
+      query.set('search', debouncedSearch.trim());
     }
-  }, [context.api]);
+
+    if (approvalStatus) {
+      query.set('approval_status', approvalStatus);
+    }
+
+    return query.toString();
+  }, [sortStatus, debouncedSearch, approvalStatus]);
+
+  // A new sort order, search or filter starts from the top
+  const scrollTop = scroll.params === params ? scroll.top : 0;
 
   useEffect(() => {
-    fetchData();
-  }, [fetchData]);
-
-  // Sort records
-  const sortedRecords = useMemo(() => {
-    const sorted = [...records].sort((a, b) => {
-      const accessor = sortStatus.columnAccessor as keyof PurchaseOrderRecord;
-      let aVal = a[accessor];
-      let bVal = b[accessor];
-
-      // Handle nested accessors
-      if (sortStatus.columnAccessor === 'supplier_detail.name') {
-        aVal = a.supplier_detail?.name || '';
-        bVal = b.supplier_detail?.name || '';
-      }
-
-      // Handle nulls
-      if (aVal == null) return 1;
-      if (bVal == null) return -1;
-
-      // Compare
-      if (typeof aVal === 'string' && typeof bVal === 'string') {
-        return sortStatus.direction === 'asc'
-          ? aVal.localeCompare(bVal)
-          : bVal.localeCompare(aVal);
-      }
-
-      if (typeof aVal === 'number' && typeof bVal === 'number') {
-        return sortStatus.direction === 'asc' ? aVal - bVal : bVal - aVal;
-      }
-
-      return 0;
-    });
-    return sorted;
-  }, [records, sortStatus]);
-
-  // Define table columns
-  const columns = useMemo(
-    () => [
-      {
-        accessor: 'reference',
-        title: 'Reference',
-        sortable: true,
-        render: (record: PurchaseOrderRecord) => (
-          <Anchor
-            href={`/web/purchasing/purchase-order/${record.pk}/`}
-            size="sm"
-          >
-            {record.reference}
-          </Anchor>
-        ),
-      },
-      {
-        accessor: 'description',
-        title: 'Description',
-        sortable: true,
-        render: (record: PurchaseOrderRecord) => (
-          <Text size="sm" lineClamp={1}>
-            {record.description || '-'}
-          </Text>
-        ),
-      },
-      {
-        accessor: 'supplier_detail.name',
-        title: 'Supplier',
-        sortable: true,
-        render: (record: PurchaseOrderRecord) =>
-          record.supplier_detail ? (
-            <Group gap="xs" wrap="nowrap">
-              <Text size="sm">{record.supplier_detail.name}</Text>
-            </Group>
-          ) : (
-            <Text size="sm" c="dimmed">
-              -
-            </Text>
-          ),
-      },
-      {
-        accessor: 'supplier_reference',
-        title: 'Supplier Ref',
-        sortable: true,
-        render: (record: PurchaseOrderRecord) => (
-          <Text size="sm">{record.supplier_reference || '-'}</Text>
-        ),
-      },
-      {
-        accessor: 'line_items',
-        title: 'Line Items',
-        sortable: true,
-        render: (record: PurchaseOrderRecord) => (
-          <Text size="sm">
-            {record.completed_lines}/{record.line_items}
-          </Text>
-        ),
-      },
-      {
-        accessor: 'status',
-        title: 'Status',
-        sortable: true,
-        render: (record: PurchaseOrderRecord) => (
-          <Center>
-            <POStatusBadge status={record.status_custom_key || record.status} />
-          </Center>
-        ),
-      },
-      {
-        accessor: 'approval_status',
-        title: 'Approval Status',
-        sortable: true,
-        render: (record: PurchaseOrderRecord) => (
-          <Center>
-            <ApprovalStatusBadge status={record.approval_status} />
-          </Center>
-        ),
-      },
-      {
-        accessor: 'target_date',
-        title: 'Target Date',
-        sortable: true,
-        render: (record: PurchaseOrderRecord) => (
-          <Text size="sm">{formatDate(record.target_date)}</Text>
-        ),
-      },
-      {
-        accessor: 'total_price',
-        title: 'Total Price',
-        sortable: true,
-        render: (record: PurchaseOrderRecord) => (
-          <Text size="sm">
-            {record.total_price
-              ? `${record.total_price} ${record.order_currency || ''}`
-              : '-'}
-          </Text>
-        ),
-      },
-      {
-        accessor: 'responsible_detail.name',
-        title: 'Responsible',
-        sortable: false,
-        render: (record: PurchaseOrderRecord) => (
-          <Text size="sm">{record.responsible_detail?.name || '-'}</Text>
-        ),
-      },
-    ],
-    []
-  );
+    viewportRef.current?.scrollTo({ top: 0 });
+  }, [params]);
 
-  // Error state
-  if (error) {
-    return (
-      <Paper p="md">
-        <Stack>
-          <Title order={3}>Purchase Orders with Approval Status</Title>
-          <Text c="red">Error: {error}</Text>
-        </Stack>
-      </Paper>
+  // The visible window, with some rows either side
+  const firstRow = Math.max(0, Math.floor(scrollTop / ROW_HEIGHT) - OVERSCAN);
+  const lastRow = Math.floor((scrollTop + TABLE_HEIGHT) / ROW_HEIGHT) + OVERSCAN;
+
+  // The window is smaller than a page, so it spans at most two pages
+  const firstPage = Math.floor(firstRow / PAGE_SIZE);
+  const lastPage = Math.floor(lastRow / PAGE_SIZE);
+
+  const fetchPage = (page: number) => async () => {
+    const response = await context.api.get(
+      `/plugin/approvals/po-list/?${params}&limit=${PAGE_SIZE}&offset=${page * PAGE_SIZE}`
     );
-  }
+    return response.data as PurchaseOrderPage;
+  };
+
+  // Cached per page, under the po-list key, so approval actions refresh them
+  const first = useQuery(`${queryKeys.poList}:${params}:${firstPage}`, fetchPage(firstPage));
+  const last = useQuery(`${queryKeys.poList}:${params}:${lastPage}`, fetchPage(lastPage));
+
+  const count = first.data?.count ?? last.data?.count ?? 0;
+  const endRow = Math.min(lastRow, count - 1);
+
+  const rowAt = (index: number): PurchaseOrderRecord | undefined => {
+    const page = Math.floor(index / PAGE_SIZE) === firstPage ? first.data : last.data;
+    return page?.results[index % PAGE_SIZE];
+  };
+
+  const handleSort = (column: string) => {
+    setSortStatus((current) => ({
+      column,
+      direction: current.column === column && current.direction === 'asc' ? 'desc' : 'asc',
+    }));
+  };
+
+  const error = first.error && !first.data ? first.error : null;
+
+  const visibleRows = [];
 
-  // Loading state
-  if (loading) {
-    return (
-      <Paper p="md">
-        <Stack>
-          <Title order={3}>Purchase Orders with Approval Status</Title>
-          <Skeleton height={400} />
-        </Stack>
-      </Paper>
+  for (let index = firstRow; index <= endRow; index++) {
+    const record = rowAt(index);
+
+    visibleRows.push(
+      <Table.Tr key={record?.pk ?? `row-${index}`} h={ROW_HEIGHT}>
+        {COLUMNS.map((column) => (
+          <Table.Td key={column.title}>
+            {record ? column.render(record) : <Skeleton height={12} />}
+          </Table.Td>
+        ))}
+      </Table.Tr>
     );
   }
 
@@ -322,19 +401,61 @@ export function PurchaseOrderApprovalsPage({
     <Paper p="md">
       <Stack>
         <Title order={3}>Purchase Orders with Approval Status</Title>
-        <DataTable
-          records={sortedRecords}
-          columns={columns}
-          withTableBorder
-          borderRadius="sm"
-          striped
-          highlightOnHover
-          minHeight={200}
-          idAccessor="pk"
-          sortStatus={sortStatus}
-          onSortStatusChange={setSortStatus}
-          noRecordsText="No purchase orders found"
-        />
+
+        <Group>
+          <TextInput
+            placeholder="Search"
+            leftSection={<IconSearch size={16} />}
+            value={search}
+            onChange={(event) => setSearch(event.currentTarget.value)}
+          />
+          <Select
+            placeholder="Approval status"
+            data={APPROVAL_FILTER_OPTIONS}
+            value={approvalStatus}
+            onChange={setApprovalStatus}
+            clearable
+          />
+          <Text size="sm" c="dimmed">
+            {first.loading ? '' : `${count} purchase orders`}
+          </Text>
+        </Group>
+
+        {error ? (
+          <Text c="red">Error: {error}</Text>
+        ) : first.loading ? (
+          <Skeleton height={TABLE_HEIGHT} />
+        ) : count === 0 ? (
+          <Center h={200}>
+            <Text c="dimmed">No purchase orders found</Text>
+          </Center>
+        ) : (
+          <ScrollArea
+            h={TABLE_HEIGHT}
+            viewportRef={viewportRef}
+            onScrollPositionChange={({ y }) => setScroll({ params, top: y })}
+          >
+            <Table highlightOnHover withTableBorder layout="fixed">
+              <Table.Thead
+                style={{ position: 'sticky', top: 0, zIndex: 1, background: 'var(--mantine-color-body)' }}
+              >
+                <Table.Tr>
+                  {COLUMNS.map((column) => (
+                    <Table.Th key={column.title} w={column.width}>
+                      <SortHeader column={column} sortStatus={sortStatus} onSort={handleSort} />
+                    </Table.Th>
+                  ))}
+                </Table.Tr>
+              </Table.Thead>
+              <Table.Tbody>
+                {/* Spacers stand in for the rows outside the window */}
+                {firstRow > 0 && <Table.Tr h={firstRow * ROW_HEIGHT} />}
+                {visibleRows}
+                {endRow < count - 1 && <Table.Tr h={(count - 1 - endRow) * ROW_HEIGHT} />}
+              </Table.Tbody>
+            </Table>
+          </ScrollArea>
+        )}
       </Stack>
     </Paper>
   );
@@ -0,0 +1,36 @@
+/**
+ * InvenTree Approvals Plugin - Dashboard widgets entry point
+ *
+ * Loaded on the dashboard only, so it does not include the panel, the
+ * modals or the Purchase Order approvals page.
+ */
+
+import { checkPluginVersion, type InvenTreePluginContext } from '@inventreedb/ui';
+import { PendingApprovalsWidget } from './PendingApprovalsWidget';
+import { AnyApproverWidget } from './AnyApproverWidget';
+
+/**
+ * Render the pending approvals dashboard widget.
+ *
+ * This function is called by the InvenTree UI plugin system for dashboard items.
+ * It returns a React component showing POs awaiting the user's approval.
+ *
+ * @param context - Plugin context from InvenTree (includes api, user, theme, etc.)
+ */
+export function renderDashboardWidget(context: InvenTreePluginContext) {
+  checkPluginVersion(context);
+  return <PendingApprovalsWidget context={context} />;
+}
+
+/**
+ * Render the any-approver pending approvals dashboard widget.
+ *
+ * This function is called by the InvenTree UI plugin system for dashboard items.
+ * It returns a React component showing all non-high-value POs with pending approvals.
+ *
+ * @param context - Plugin context from InvenTree (includes api, user, theme, etc.)
+ */
+export function renderAnyApproverWidget(context: InvenTreePluginContext) {
+  checkPluginVersion(context);
+  return <AnyApproverWidget context={context} />;
+}
@@ -1,79 +1,17 @@
 /**
- * InvenTree Approvals Plugin - Frontend Entry Point
+ * InvenTree Approvals Plugin - Combined entry point
  *
- * This file exports the render functions that InvenTree's plugin system
- * uses to render the approvals panel and dashboard widget.
+ * Each UI surface has its own entry point (panel.tsx, dashboard.tsx and
+ * page.tsx), which the plugin references through the Vite manifest so that
+ * every surface only loads its own code. This entry re-exports all render
+ * functions from a single file, for references to approvals_panel.js which
+ * predate the split.
  *
  * Following the modern InvenTree plugin pattern:
  * - Single argument function that returns a React component
  * - InvenTree wraps the component in MantineProvider and other contexts
  */
 
-import { checkPluginVersion, type InvenTreePluginContext } from '@inventreedb/ui';
-import { ApprovalsPanel } from './ApprovalsPanel';
-import { PendingApprovalsWidget } from './PendingApprovalsWidget';
-import { AnyApproverWidget } from './AnyApproverWidget';
-import { PurchaseOrderApprovalsPage } from './PurchaseOrderApprovalsPage';
-
-/**
- * Render the approvals panel.
- *
- * This function is called by the InvenTree UI plugin system.
- * It returns a React component that InvenTree will render with proper context.
- *
- * @param context - Plugin context from InvenTree (includes api, user, theme, etc.)
- */
-export function renderPanel(context: InvenTreePluginContext) {
-  checkPluginVersion(context);
-  return <ApprovalsPanel context={context} />;
-}
-
-/**
- * Render the pending approvals dashboard widget.
- *
- * This function is called by the InvenTree UI plugin system for dashboard items.
- * It returns a React component showing POs awaiting the user's approval.
- *
- * @param context - Plugin context from InvenTree (includes api, user, theme, etc.)
- */
-export function renderDashboardWidget(context: InvenTreePluginContext) {
-  checkPluginVersion(context);
-  return <PendingApprovalsWidget context={context} />;
-}
-
-/**
- * Render the any-approver pending approvals dashboard widget.
- *
- * This function is called by the InvenTree UI plugin system for dashboard items.
- * It returns a React component showing all non-high-value POs with pending approvals.
- *
- * @param context - Plugin context from InvenTree (includes api, user, theme, etc.)
- */
-export function renderAnyApproverWidget(context: InvenTreePluginContext) {
-  checkPluginVersion(context);
-  return <AnyApproverWidget context={context} />;
-}
-
-/**
- * Render the Purchase Orders with Approval Status page.
- *
- * This function is called by the InvenTree UI plugin system for navigation items.
- * It returns a React component showing all POs with their approval status.
- *
- * @param context - Plugin context from InvenTree (includes api, user, theme, etc.)
- */
-export function renderPOApprovalsPage(context: InvenTreePluginContext) {
-  checkPluginVersion(context);
-  return <PurchaseOrderApprovalsPage context={context} />;
-}
-
-/**
- * Check if the panel should be hidden for the given context.
- *
- * @param context - The context data from InvenTree
- * @returns true if the panel should be hidden
- */
-export function isPanelHidden(context: InvenTreePluginContext): boolean {
-  // Only show for purchase orders
-  return context.model !== 'purchaseorder';
-}
+export { renderPanel, isPanelHidden } from './panel';
+export { renderDashboardWidget, renderAnyApproverWidget } from './dashboard';
+export { renderPOApprovalsPage } from './page';
@@ -0,0 +1,37 @@
+/**
+ * InvenTree Approvals Plugin - Purchase Order approvals page entry point
+ *
+ * The page is loaded as a separate chunk, so this entry stays small
+ * until the page is actually shown.
+ */
+
+import { lazy, Suspense } from 'react';
+import { Center, Loader } from '@mantine/core';
+import { checkPluginVersion, type InvenTreePluginContext } from '@inventreedb/ui';
+
+const PurchaseOrderApprovalsPage = lazy(() =>
+  import('./PurchaseOrderApprovalsPage').then((module) => ({ default: module.PurchaseOrderApprovalsPage }))
+);
+
+/**
+ * Render the Purchase Orders with Approval Status page.
+ *
+ * This function is called by the InvenTree UI plugin system for navigation items.
+ * It returns a React component showing all POs with their approval status.
+ *
+ * @param context - Plugin context from InvenTree (includes api, user, theme, etc.)
+ */
+export function renderPOApprovalsPage(context: InvenTreePluginContext) {
+  checkPluginVersion(context);
+  return (
+    <Suspense
+      fallback={
+        <Center p="xl">
+          <Loader />
+        </Center>
+      }
+    >
+      <PurchaseOrderApprovalsPage context={context} />
+    </Suspense>
+  );
+}
@@ -0,0 +1,33 @@
+/**
+ * InvenTree Approvals Plugin - Purchase Order panel entry point
+ *
+ * Loaded on Purchase Order detail pages only. The request/decision modals
+ * are loaded separately, when a modal is first opened.
+ */
+
+import { checkPluginVersion, type InvenTreePluginContext } from '@inventreedb/ui';
+import { ApprovalsPanel } from './ApprovalsPanel';
+
+/**
+ * Render the approvals panel.
+ *
+ * This function is called by the InvenTree UI plugin system.
+ * It returns a React component that InvenTree will render with proper context.
+ *
+ * @param context - Plugin context from InvenTree (includes api, user, theme, etc.)
+ */
+export function renderPanel(context: InvenTreePluginContext) {
+  checkPluginVersion(context);
+  return <ApprovalsPanel context={context} />;
+}
+
+/**
+ * Check if the panel should be hidden for the given context.
+ *
+ * @param context - The context data from InvenTree
+ * @returns true if the panel should be hidden
+ */
+export function isPanelHidden(context: InvenTreePluginContext): boolean {
+  // Only show for purchase orders
+  return context.model !== 'purchaseorder';
+}
@@ -0,0 +1,302 @@
+/**
+ * Shared client-side cache for the plugin's API requests.
+ *
+ * Every component reads its data through useQuery(), keyed by a string
+ * from queryKeys. The cache:
+ *
+ * - de-duplicates requests: components asking for the same key while a
+ *   request is in flight share that request
+ * - serves cached data immediately, and revalidates it in the background
+ *   once it is older than the stale time (stale-while-revalidate)
+ * - refetches only the invalidated keys after a mutation, updating every
+ *   mounted component which uses them
+ * - applies mutations optimistically, rolling back if the request fails
+ *
+ * The store lives on globalThis, so the panel, dashboard and page bundles
+ * (which may be loaded as separate entry points) share one cache.
+ */
+
+import { useCallback, useEffect, useState } from 'react';
+
+/**
+ * Cache keys of the plugin endpoints.
+ *
+ * Keys are hierarchical, separated by ':', so invalidating a key also
+ * invalidates every key below it (e.g. 'status' invalidates 'status:12').
+ */
+export const queryKeys = {
+  status: (orderId: number) => `status:${orderId}`,
+  pending: 'pending',
+  pendingAnyApprover: 'pending-any-approver',
+  poList: 'po-list',
+  approvers: (isHighValue: boolean) => `users:${isHighValue ? 'high-value' : 'all'}`,
+};
+
+/**
+ * The lists which include the approval state of orders.
+ */
+export const approvalListKeys = [
+  queryKeys.pending,
+  queryKeys.pendingAnyApprover,
+  queryKeys.poList,
+];
+
+// Cached data is served without revalidating for this long (ms)
+const DEFAULT_STALE_TIME = 30 * 1000;
+
+// Entries without subscribers are dropped after this long (ms)
+const GC_TIME = 5 * 60 * 1000;
+
+interface CacheEntry {
+  data?: unknown;
+  error?: string | null;
+  updatedAt: number;
+  // Incremented whenever the data is set directly (see setQueryData)
+  version: number;
+  promise?: Promise<unknown>;
+  fetcher?: () => Promise<unknown>;
+  listeners: Set<() => void>;
+  gcTimer?: ReturnType<typeof setTimeout>;
+}
+
+interface QueryStore {
+  entries: Map<string, CacheEntry>;
+}
+
+const STORE_KEY = '__inventreeApprovalsQueryCache';
+
+function getStore(): QueryStore {
+  const global = globalThis as typeof globalThis & { [STORE_KEY]?: QueryStore };
+
+  if (!global[STORE_KEY]) {
+    global[STORE_KEY] = { entries: new Map() };
+  }
+
+  return global[STORE_KEY]!;
+}
+
+function getEntry(key: string): CacheEntry {
+  const entries = getStore().entries;
+  let entry = entries.get(key);
+
+  if (!entry) {
+    entry = { updatedAt: 0, version: 0, listeners: new Set() };
+    entries.set(key, entry);
+  }
+
+  return entry;
+}
+
+function notify(entry: CacheEntry) {
+  entry.listeners.forEach((listener) => listener());
+}
+
+function errorMessage(err: unknown): string {
+  return err instanceof Error ? err.message : 'Request failed';
+}
+
+/**
+ * Fetch the data of a key, sharing any request already in flight.
+ */
+export function fetchQuery<T>(key: string, fetcher: () => Promise<T>): Promise<T> {
+  const entry = getEntry(key);
+  entry.fetcher = fetcher;
+
+  if (entry.promise) {
+    return entry.promise as Promise<T>;
+  }
+
+  const version = entry.version;
+
+  const promise = fetcher()
+    .then((data) => {
+      // Data set while the request was in flight (e.g. by a mutation) is newer
+      if (entry.version === version) {
+        entry.data = data;
+        entry.error = null;
+        entry.updatedAt = Date.now();
+      }
+      return data;
+    })
+    .catch((err) => {
+      entry.error = errorMessage(err);
+      throw err;
+    })
+    .finally(() => {
+      entry.promise = undefined;
+      notify(entry);
+    });
+
+  entry.promise = promise;
+  notify(entry);
+
+  return promise;
+}
+
+/**
+ * Get the cached data of a key, if any.
+ */
+export function getQueryData<T>(key: string): T | undefined {
+  return getStore().entries.get(key)?.data as T | undefined;
+}
+
+/**
+ * Replace the cached data of a key, updating every component which uses it.
+ */
+export function setQueryData<T>(key: string, data: T) {
+  const entry = getEntry(key);
+  entry.data = data;
+  entry.error = null;
+  entry.updatedAt = Date.now();
+  entry.version += 1;
+  notify(entry);
+}
+
+/**
+ * Mark keys (and the keys below them) as stale.
+ *
+ * Keys which are in use are refetched straight away; the others are
+ * refetched when they are next used.
+ */
+export function invalidateQueries(keys: string[]) {
+  getStore().entries.forEach((entry, key) => {
+    const matches = keys.some((prefix) => key === prefix || key.startsWith(`${prefix}:`));
+
+    if (!matches) {
+      return;
+    }
+
+    entry.updatedAt = 0;
+
+    if (entry.listeners.size > 0 && entry.fetcher) {
+      fetchQuery(key, entry.fetcher).catch(() => undefined);
+    }
+  });
+}
+
+interface MutationOptions<T, R> {
+  // The request which makes the change
+  request: () => Promise<R>;
+  // The expected data of the key, applied before the request completes
+  optimistic?: (current: T) => T;
+  // The data of the key once the request has completed (if the response includes it)
+  result?: (response: R) => T | undefined;
+  // Other keys affected by the change
+  invalidate?: string[];
+}
+
+/**
+ * Make a change which affects the data of a key.
+ *
+ * The optimistic data is shown straight away. When the request completes,
+ * the key is replaced with the result (or refetched if there is none) and
+ * the other affected keys are invalidated; if it fails, the previous data
+ * is restored and the error is rethrown.
+ */
+export async function mutateQuery<T, R>(
+  key: string,
+  { request, optimistic, result, invalidate = [] }: MutationOptions<T, R>
+): Promise<R> {
+  const previous = getQueryData<T>(key);
+
+  if (optimistic && previous !== undefined) {
+    setQueryData(key, optimistic(previous));
+  }
+
+  let response: R;
+
+  try {
+    response = await request();
+  } catch (err) {
+    if (previous !== undefined) {
+      setQueryData(key, previous);
+    }
+    throw err;
+  }
+
+  const data = result?.(response);
+
+  if (data !== undefined) {
+    setQueryData(key, data);
+    invalidateQueries(invalidate);
+  } else {
+    invalidateQueries([key, ...invalidate]);
+  }
+
+  return response;
+}
+
+interface QueryOptions {
+  // Skip the request (e.g. until the required parameters are known)
+  enabled?: boolean;
+  // Cached data younger than this is not revalidated (ms)
+  staleTime?: number;
+}
+
+export interface QueryResult<T> {
+  data: T | undefined;
+  error: string | null;
+  // No data yet, and a request is in flight
+  loading: boolean;
+  // A request is in flight (including background revalidation)
+  fetching: boolean;
+  refetch: () => Promise<T | undefined>;
+}
+
+/**
+ * Read a key from the shared cache, fetching it if it is missing or stale.
+ */
+export function useQuery<T>(
+  key: string,
+  fetcher: () => Promise<T>,
+  { enabled = true, staleTime = DEFAULT_STALE_TIME }: QueryOptions = {}
+): QueryResult<T> {
+  const [, setVersion] = useState(0);
+
+  useEffect(() => {
+    if (!enabled) {
+      return;
+    }
+
+    const entry = getEntry(key);
+    const listener = () => setVersion((version) => version + 1);
+
+    entry.fetcher = fetcher;
+    entry.listeners.add(listener);
+    clearTimeout(entry.gcTimer);
+
+    if (!entry.promise && Date.now() - entry.updatedAt > staleTime) {
+      fetchQuery(key, fetcher).catch(() => undefined);
+    }
+
+    return () => {
+      entry.listeners.delete(listener);
+
+      if (entry.listeners.size === 0) {
+        entry.gcTimer = setTimeout(() => {
+          if (entry.listeners.size === 0 && !entry.promise) {
+            getStore().entries.delete(key);
+          }
+        }, GC_TIME);
+      }
+    };
+    // The fetcher is identified by the key, so a new fetcher instance does not refetch
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [key, enabled, staleTime]);
+
+  const refetch = useCallback(
+    () => fetchQuery(key, fetcher).catch(() => undefined),
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+    [key]
+  );
+
+  const entry = enabled ? getStore().entries.get(key) : undefined;
+
+  return {
+    data: entry?.data as T | undefined,
+    error: entry?.error ?? null,
+    loading: enabled && entry?.data === undefined && !entry?.error,
+    fetching: !!entry?.promise,
+    refetch,
+  };
+}
@@ -8,13 +8,14 @@ export type { InvenTreePluginContext } from '@inventreedb/ui';
 /**
  * Approval status enum
  */
-export type ApprovalStatus = 'pending' | 'approved' | 'rejected';
+export type ApprovalStatus = 'pending' | 'approved' | 'rejected' | 'invalidated';
 
 /**
  * Individual approval record
  */
 export interface Approval {
   level: number;
+  round?: number;
   status: ApprovalStatus;
   requested_by_id: number | null;
   requested_by_name: string | null;
@@ -25,6 +26,9 @@ export interface Approval {
   requested_at: string | null;
   decided_at: string | null;
   notes: string | null;
+  auto_rule?: string | null;
+  on_behalf_of_id?: number | null;
+  on_behalf_of_name?: string | null;
 }
 
 /**
@@ -37,8 +41,11 @@ export interface ApprovalStatusResponse {
   order_total: string | null;
   approved_count: number;
   total_required: number;
+  required_approvals: number;
+  approval_status: 'pending' | 'approved' | 'rejected' | 'none';
   is_fully_approved: boolean;
   has_pending: boolean;
+  pending_approver_ids: number[];
   is_high_value: boolean;
   user_can_approve: boolean;
   user_can_approve_reason: string | null;
@@ -71,11 +78,17 @@ export interface ApproverUsersResponse {
 export interface RequestApprovalResponse {
   success: boolean;
   approval_level?: number;
+  approval_round?: number;
+  required_approvals?: number;
+  auto_approved?: boolean;
+  auto_rule?: string | null;
   requested_approver?: string | null;
   email_sent?: boolean;
   teams_sent?: boolean;
   message?: string;
   error?: string;
+  // Approval status after the request
+  summary?: ApprovalStatusResponse;
 }
 
 /**
@@ -86,11 +99,14 @@ export interface ApprovalDecisionResponse {
   approval_level?: number;
   rejection_level?: number;
   approval_count?: number;
+  required_approvals?: number;
   fully_approved?: boolean;
   can_place_order?: boolean;
   can_re_request?: boolean;
   message?: string;
   error?: string;
+  // Approval status after the decision
+  summary?: ApprovalStatusResponse;
 }
 
 /**
@@ -6,6 +6,12 @@
  * Other libraries (like @tabler/icons-react, @mantine/hooks) must be bundled.
  */
 export declare const externalLibs: Record<string, string>;
+/**
+ * One entry point per UI surface, so that each surface only loads its own code.
+ * The plugin resolves these through the Vite manifest (by their source path).
+ * The 'index' entry re-exports everything as approvals_panel.js, for older references.
+ */
+export declare const entryPoints: Record<string, string>;
 /**
  * Vite config to build the frontend plugin as an exported module.
  * This will be distributed in the 'static' directory of the plugin.
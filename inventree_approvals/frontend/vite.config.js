@@ -20,6 +20,26 @@ export var externalLibs = {
 };
 // Just the keys of the externalLibs object
 var externalKeys = Object.keys(externalLibs);
+/**
+ * One entry point per UI surface, so that each surface only loads its own code.
+ * The plugin resolves these through the Vite manifest (by their source path).
+ * The 'index' entry re-exports everything as approvals_panel.js, for older references.
+ */
+export var entryPoints = {
+    index: './src/index.tsx',
+    po_panel: './src/panel.tsx',
+    dashboard: './src/dashboard.tsx',
+    page: './src/page.tsx',
+};
+/**
+ * Bundled third-party code shared by the entries goes into a single vendor chunk.
+ */
+function manualChunks(id) {
+    if (id.includes('node_modules')) {
+        return 'vendor';
+    }
+    return undefined;
+}
 /**
  * Vite config to build the frontend plugin as an exported module.
  * This will be distributed in the 'static' directory of the plugin.
@@ -44,12 +64,16 @@ export default defineConfig({
         sourcemap: true,
         rollupOptions: {
             preserveEntrySignatures: 'exports-only',
-            input: ['./src/index.tsx'],
+            input: entryPoints,
             output: {
                 dir: '../static',
-                entryFileNames: 'approvals_panel.js',
+                entryFileNames: function (chunk) {
+                    return chunk.name === 'index' ? 'approvals_panel.js' : "approvals_".concat(chunk.name, ".js");
+                },
+                chunkFileNames: 'chunks/[name]-[hash].js',
                 assetFileNames: 'assets/[name].[ext]',
                 globals: externalLibs,
+                manualChunks: manualChunks,
             },
             external: externalKeys,
         },
@@ -1,15 +1,24 @@
 """Helper functions for the PO Approvals plugin."""
 
+import hashlib
 from datetime import datetime
+from decimal import Decimal
 from typing import Optional
 
 from django.contrib.auth import get_user_model
+from django.db import transaction
 
-User = get_user_model()
+from .instrumentation import timed
 
 # Metadata key used by the plugin
 METADATA_KEY = 'po_approvals'
 
+# State keys describing the order content at approval time
+FINGERPRINT_KEYS = ('fingerprint', 'header_hash', 'line_hashes')
+
+# State key holding the content fingerprint at request time (kept for the round)
+REQUEST_FINGERPRINT_KEY = 'request_fingerprint'
+
 
 def get_approval_data(order):
     """Get the approval data from a PurchaseOrder's metadata."""
@@ -17,9 +26,38 @@ def get_approval_data(order):
 
 
 def set_approval_data(order, data, commit=True):
-    """Set the approval data on a PurchaseOrder's metadata."""
+    """Set the approval data on a PurchaseOrder's metadata.
+
+    When the order is saved, its approval index row and search document
+    are updated as well.
+    """
     order.set_metadata(METADATA_KEY, data, commit=commit)
 
+    if commit:
+        from .approval_index import sync_orders
+        from .search import index_orders
+
+        sync_orders([order])
+        index_orders([order])
+
+
+def lock_approval_data(order):
+    """Lock the row of an order and re-read its approval data.
+
+    Must be called inside a transaction. The metadata of the given instance
+    is replaced with that of the locked row, so that concurrent approvals
+    (and the auto-approval sweep) are applied one after the other, rather
+    than overwriting each other.
+
+    Returns:
+        The approval data of the order
+    """
+    from order.models import PurchaseOrder
+
+    order.metadata = PurchaseOrder.objects.select_for_update().only('metadata').get(pk=order.pk).metadata
+
+    return get_approval_data(order)
+
 
 def get_approvals_list(order):
     """Get the list of approvals from a PurchaseOrder."""
@@ -27,10 +65,327 @@ def get_approvals_list(order):
     return data.get('approvals', [])
 
 
+def build_approval_state(approvals, required=1):
+    """Build the compact approval state from a list of approvals.
+
+    Only the approvals belonging to the most recent request round are
+    considered. Approvals recorded before rounds were introduced are all
+    treated as round 1, which keeps the original single-approval semantics.
+
+    Args:
+        approvals: The list of approval dicts
+        required: Number of approvals needed to clear the current round
+
+    Returns:
+        Dict with the compact state information
+    """
+    current_round = max((a.get('round', 1) for a in approvals), default=0)
+    round_approvals = [a for a in approvals if a.get('round', 1) == current_round]
+
+    approved = [a for a in round_approvals if a.get('status') == 'approved']
+    pending = [a for a in round_approvals if a.get('status') == 'pending']
+    rejected = any(a.get('status') == 'rejected' for a in round_approvals)
+    invalidated = any(a.get('status') == 'invalidated' for a in round_approvals)
+
+    # An auto-approval rule clears the whole round
+    auto_approved = any(a.get('auto_rule') for a in approved)
+
+    if invalidated:
+        state_status = 'none'
+    elif len(approved) >= required or auto_approved:
+        state_status = 'approved'
+    elif pending:
+        state_status = 'pending'
+    elif rejected:
+        state_status = 'rejected'
+    else:
+        state_status = 'none'
+
+    return {
+        'status': state_status,
+        'round': current_round,
+        'required': required,
+        'approved_count': len(approved),
+        'approved_by_ids': [
+            a.get('actual_approver_id') for a in approved
+            if a.get('actual_approver_id')
+        ],
+        'pending_approver_ids': [
+            a.get('requested_approver_id') for a in pending
+            if a.get('requested_approver_id')
+        ],
+        'any_approver': any(not a.get('requested_approver_id') for a in pending),
+        'requested_by_id': round_approvals[0].get('requested_by_id') if round_approvals else None,
+    }
+
+
+def update_approval_state(data, required=None):
+    """Recompute the compact state stored alongside the approvals list.
+
+    Args:
+        data: The approval data dict (modified in place)
+        required: Number of approvals required, defaults to the stored value
+
+    Returns:
+        The updated state dict
+    """
+    previous = data.get('state', {})
+
+    if required is None:
+        required = previous.get('required', 1)
+
+    state = build_approval_state(data.get('approvals', []), required=required)
+
+    # The content fingerprint only applies while the order stays approved
+    if state['status'] == 'approved' and previous.get('status') == 'approved':
+        state.update({key: previous[key] for key in FINGERPRINT_KEYS if key in previous})
+
+    if state['round'] == previous.get('round') and REQUEST_FINGERPRINT_KEY in previous:
+        state[REQUEST_FINGERPRINT_KEY] = previous[REQUEST_FINGERPRINT_KEY]
+
+    data['state'] = state
+    return state
+
+
+def get_approval_state(order):
+    """Get the compact approval state for a PurchaseOrder.
+
+    The state is stored in the order metadata whenever approvals change, so
+    reading it does not require walking the approval history. Orders which
+    predate the stored state fall back to a single required approval.
+    """
+    data = get_approval_data(order)
+    state = data.get('state')
+
+    if state is None:
+        state = build_approval_state(data.get('approvals', []))
+
+    return state
+
+
+def _hash_values(*values):
+    """Hash the given values into a 64-bit hex digest."""
+    return hashlib.sha256(repr(values).encode()).hexdigest()[:16]
+
+
+def _combine_hashes(*hashes):
+    """Combine hashes with XOR, which does not depend on their order."""
+    result = 0
+    for value in hashes:
+        result ^= int(value, 16)
+    return f'{result:016x}'
+
+
+def _normalize_decimal(value):
+    """Normalize a numeric value so that equal amounts hash equally."""
+    if value is None:
+        return None
+    return str(Decimal(str(value)).normalize())
+
+
+def get_header_hash(order):
+    """Get the fingerprint contribution of the order supplier and currency."""
+    return _hash_values(order.supplier_id, str(order.order_currency or ''))
+
+
+def get_line_hash(part_id, quantity, price, currency):
+    """Get the fingerprint contribution of a single line item.
+
+    The currency column keeps its value when the price is cleared, so the
+    currency is only hashed along with a price.
+    """
+    if price is None:
+        currency = None
+
+    return _hash_values(
+        part_id,
+        _normalize_decimal(quantity),
+        _normalize_decimal(price),
+        str(getattr(currency, 'code', currency) or ''),
+    )
+
+
+def get_line_item_hash(line):
+    """Get the fingerprint contribution of a PurchaseOrderLineItem instance."""
+    price = line.purchase_price
+
+    # Read the currency from its column, as compute_order_fingerprints does
+    return get_line_hash(
+        line.part_id,
+        line.quantity,
+        getattr(price, 'amount', None),
+        line.purchase_price_currency,
+    )
+
+
+@timed('fingerprint')
+def compute_order_fingerprints(orders):
+    """Compute the content fingerprints for several orders at once.
+
+    The fingerprint covers the supplier, order currency and the part,
+    quantity and price of every line item. The individual line hashes are
+    stored as well, so that a single changed line can be checked without
+    reading the others. All line items are read with a single query.
+
+    Args:
+        orders: List of PurchaseOrder instances
+
+    Returns:
+        Dict mapping order pk to the fingerprint state keys
+    """
+    from order.models import PurchaseOrderLineItem
+
+    line_hashes = {order.pk: {} for order in orders}
+
+    lines = PurchaseOrderLineItem.objects.filter(order_id__in=list(line_hashes)).values_list(
+        'pk', 'order_id', 'part_id', 'quantity', 'purchase_price', 'purchase_price_currency'
+    )
+
+    for pk, order_id, part_id, quantity, price, currency in lines:
+        line_hashes[order_id][str(pk)] = get_line_hash(part_id, quantity, price, currency)
+
+    fingerprints = {}
+
+    for order in orders:
+        header_hash = get_header_hash(order)
+        fingerprint = _combine_hashes(header_hash, *line_hashes[order.pk].values())
+
+        fingerprints[order.pk] = {
+            'fingerprint': fingerprint,
+            'header_hash': header_hash,
+            'line_hashes': line_hashes[order.pk],
+        }
+
+    return fingerprints
+
+
+def compute_order_fingerprint(order):
+    """Compute the content fingerprint for a single order."""
+    return compute_order_fingerprints([order])[order.pk]
+
+
+def has_content_drifted(order):
+    """Check if the order header has changed since it was approved.
+
+    Line item changes invalidate the approval as soon as they are saved, so
+    only the supplier and currency of the order itself are compared here.
+    This is a comparison of two hashes and does not touch the database.
+    Approvals recorded before fingerprints were introduced never drift.
+    """
+    header_hash = get_approval_state(order).get('header_hash')
+    return header_hash is not None and header_hash != get_header_hash(order)
+
+
+def invalidate_approval(data, reason):
+    """Invalidate the approval of the current request round.
+
+    An 'invalidated' entry is added to the history, after which a new
+    approval has to be requested. The data is modified in place but not saved.
+
+    Args:
+        data: The approval data dict
+        reason: Reason for the invalidation, stored in the notes
+    """
+    state = data.get('state') or build_approval_state(data.get('approvals', []))
+
+    data.setdefault('approvals', []).append({
+        'level': state.get('approved_count', 0),
+        'round': state.get('round') or 1,
+        'status': 'invalidated',
+        'requested_by_id': state.get('requested_by_id'),
+        'requested_by_name': None,
+        'requested_approver_id': None,
+        'requested_approver_name': None,
+        'actual_approver_id': None,
+        'actual_approver_name': None,
+        'requested_at': None,
+        'decided_at': datetime.now().isoformat(),
+        'notes': reason,
+    })
+
+    update_approval_state(data)
+
+
+def check_line_fingerprint(order, line):
+    """Check the content fingerprint of an approved order after a line item change.
+
+    Only the hash of the changed line is recomputed and compared against the
+    hash stored at approval time, so no other line items are read. If the
+    line has changed, the approval is invalidated.
+
+    Args:
+        order: The PurchaseOrder instance
+        line: The PurchaseOrderLineItem which has been saved
+
+    Returns:
+        True if the approval was invalidated, False otherwise
+    """
+    data = get_approval_data(order)
+    state = data.get('state') or {}
+
+    if state.get('status') != 'approved' or not state.get('fingerprint'):
+        return False
+
+    # New line items have no stored hash
+    old_hash = state.get('line_hashes', {}).get(str(line.pk))
+
+    if old_hash == get_line_item_hash(line):
+        return False
+
+    invalidate_approval(data, 'Order content changed after approval')
+    set_approval_data(order, data)
+
+    return True
+
+
+def verify_order_fingerprint(order, commit=True):
+    """Recompute the full content fingerprint of an approved order.
+
+    This is used for changes which cannot be tracked per line, such as a
+    change of supplier or currency, or a line item being deleted.
+
+    Args:
+        order: The PurchaseOrder instance
+        commit: Save the order if the approval is invalidated
+
+    Returns:
+        True if the approval was invalidated, False otherwise
+    """
+    data = get_approval_data(order)
+    state = data.get('state') or {}
+
+    if state.get('status') != 'approved' or not state.get('fingerprint'):
+        return False
+
+    if compute_order_fingerprint(order)['fingerprint'] == state['fingerprint']:
+        return False
+
+    invalidate_approval(data, 'Order content changed after approval')
+    set_approval_data(order, data, commit=commit)
+
+    if not commit:
+        from .approval_index import sync_orders
+        from .search import index_orders
+
+        sync_orders([order])
+        index_orders([order])
+
+    return True
+
+
 def get_approval_count(order):
-    """Get the count of approved approvals."""
-    approvals = get_approvals_list(order)
-    return sum(1 for a in approvals if a.get('status') == 'approved')
+    """Get the count of approved approvals in the current request round."""
+    return get_approval_state(order).get('approved_count', 0)
+
+
+def is_fully_approved(order):
+    """Check if the current request round has reached its approval quorum."""
+    return get_approval_state(order).get('status') == 'approved'
+
+
+def get_pending_approvals(order):
+    """Get all pending approvals for the current request round."""
+    return [a for a in get_approvals_list(order) if a.get('status') == 'pending']
 
 
 def get_pending_approval(order):
@@ -42,16 +397,53 @@ def get_pending_approval(order):
     return None
 
 
+def find_user_pending_index(approvals, user, acting_for=()):
+    """Find the pending approval which the given user would act on.
+
+    A pending approval addressed to the user takes precedence over one
+    addressed to a user they are delegated for, which in turn takes
+    precedence over an "any approver" slot.
+
+    Args:
+        approvals: The list of approval dicts
+        user: The user acting on the approval
+        acting_for: IDs of users the user is currently delegated for
+
+    Returns:
+        The index into the approvals list, or None if there is no match
+    """
+    delegated_index = None
+    open_index = None
+
+    for i, approval in enumerate(approvals):
+        if approval.get('status') != 'pending':
+            continue
+
+        requested_approver_id = approval.get('requested_approver_id')
+
+        if requested_approver_id == user.id:
+            return i
+
+        if requested_approver_id in acting_for and delegated_index is None:
+            delegated_index = i
+
+        if not requested_approver_id and open_index is None:
+            open_index = i
+
+    return delegated_index if delegated_index is not None else open_index
+
+
 def get_next_approval_level(order):
     """Determine the next approval level needed."""
-    approved_count = get_approval_count(order)
-    
-    if approved_count >= 1:
+    state = get_approval_state(order)
+
+    if state.get('status') == 'approved':
         return None  # Fully approved
-    
-    return 1
+
+    return state.get('approved_count', 0) + 1
 
 
+@timed('permissions')
 def can_request_approval(order):
     """Check if an approval can be requested for this order."""
     from order.status_codes import PurchaseOrderStatus
@@ -60,17 +452,20 @@ def can_request_approval(order):
     if order.status != PurchaseOrderStatus.PENDING.value:
         return False, "Order must be in PENDING status to request approval"
     
+    state = get_approval_state(order)
+
     # Check if there's already a pending approval
-    if get_pending_approval(order):
+    if state.get('status') == 'pending':
         return False, "There is already a pending approval request"
     
     # Check if already fully approved
-    if get_approval_count(order) >= 1:
+    if state.get('status') == 'approved':
         return False, "Order is already fully approved"
     
     return True, "OK"
 
 
+@timed('permissions')
 def can_user_approve(user, order, plugin):
     """Check if a user can approve the current pending request.
     
@@ -82,124 +477,257 @@ def can_user_approve(user, order, plugin):
     Returns:
         Tuple of (can_approve: bool, reason: str)
     """
-    pending = get_pending_approval(order)
-    
-    if not pending:
+    from .delegation import get_routing_table
+
+    state = get_approval_state(order)
+
+    if state.get('status') != 'pending':
         return False, "No pending approval request"
+
+    # Users the approver is currently standing in for
+    acting_for = get_routing_table(plugin).get_delegators(user.id)
+    approver_ids = {user.id, *acting_for}
     
     # Check 1: Cannot approve your own request
-    requested_by_id = pending.get('requested_by_id')
-    if requested_by_id == user.id:
+    if state.get('requested_by_id') == user.id:
         return False, "You cannot approve your own request"
+
+    # Check 2: Each approver only counts once towards the quorum
+    if user.id in state.get('approved_by_ids', []):
+        return False, "You have already approved this request"
     
-    # Check 2: If specific approver requested, must be that user
-    requested_approver_id = pending.get('requested_approver_id')
-    if requested_approver_id and requested_approver_id != user.id:
+    # Check 3: If specific approvers requested, must be one of them (or their delegate)
+    if not approver_ids.intersection(state.get('pending_approver_ids', [])) and not state.get('any_approver'):
         return False, "You are not the requested approver for this request"
     
-    # Check 3: High-value order requires senior approver
+    # Check 4: High-value order requires senior approver (or their delegate)
     if plugin.is_high_value_order(order):
         senior_approvers = plugin.get_senior_approvers()
-        if senior_approvers and user.id not in senior_approvers:
+
+        # A delegate only stands in for the delegator on the delegator's own request
+        approvals = get_approvals_list(order)
+        pending_index = find_user_pending_index(approvals, user, acting_for)
+        slot_approver_id = approvals[pending_index].get('requested_approver_id') if pending_index is not None else None
+        senior_ids = {user.id, slot_approver_id} if slot_approver_id in acting_for else {user.id}
+
+        if senior_approvers and not senior_ids.intersection(senior_approvers):
             return False, "Only senior approvers can approve high-value orders"
     
     return True, "OK"
 
 
-def request_approval(order, requesting_user, requested_approver_id=None, notes=''):
+@timed('request_approval')
+def request_approval(order, requesting_user, requested_approver_ids=None, notes='', required=1):
     """Create a new approval request.
+
+    One pending approval is created for each requested approver so that they
+    can all decide in parallel. If fewer approvers are specified than are
+    required (or none at all), a pending approval which any eligible approver
+    can act on is added for the remaining approvals.
     
     Args:
         order: The PurchaseOrder instance
         requesting_user: The user requesting approval
-        requested_approver_id: Optional specific approver's user ID
+        requested_approver_ids: Optional list of specific approver user IDs
         notes: Optional notes for the request
+        required: Number of approvals needed before the order can be placed
     
     Returns:
-        The new approval dict
+        List of the new approval dicts
     """
-    data = get_approval_data(order)
-    approvals = data.get('approvals', [])
-    
-    # Determine the next level
-    approved_count = sum(1 for a in approvals if a.get('status') == 'approved')
-    next_level = approved_count + 1
-    
-    # Get approver name if specified
-    requested_approver_name = None
-    if requested_approver_id:
-        try:
-            approver = User.objects.get(pk=requested_approver_id)
-            requested_approver_name = approver.get_full_name() or approver.username
-        except User.DoesNotExist:
-            pass
-    
-    # Create the approval request
-    new_approval = {
-        'level': next_level,
-        'status': 'pending',
-        'requested_by_id': requesting_user.id,
-        'requested_by_name': requesting_user.get_full_name() or requesting_user.username,
-        'requested_approver_id': requested_approver_id,
-        'requested_approver_name': requested_approver_name,
-        'actual_approver_id': None,
-        'actual_approver_name': None,
-        'requested_at': datetime.now().isoformat(),
-        'decided_at': None,
-        'notes': notes,
-    }
-    
-    approvals.append(new_approval)
-    data['approvals'] = approvals
-    
-    set_approval_data(order, data)
-    
-    return new_approval
+    # Get approver names if specified
+    approver_names = {}
+    if requested_approver_ids:
+        for approver in get_user_model().objects.filter(pk__in=requested_approver_ids):
+            approver_names[approver.pk] = approver.get_full_name() or approver.username
+
+    with transaction.atomic():
+        data = lock_approval_data(order)
+        approvals = data.get('approvals', [])
+
+        # Each request starts a new round
+        next_round = max((a.get('round', 1) for a in approvals), default=0) + 1
+
+        requested_at = datetime.now().isoformat()
+        requested_by_name = requesting_user.get_full_name() or requesting_user.username
+
+        new_approvals = []
+
+        slots = list(requested_approver_ids or [])
+
+        if len(slots) < required:
+            slots.append(None)
+
+        for requested_approver_id in slots:
+            new_approvals.append({
+                'level': 1,
+                'round': next_round,
+                'status': 'pending',
+                'requested_by_id': requesting_user.id,
+                'requested_by_name': requested_by_name,
+                'requested_approver_id': requested_approver_id,
+                'requested_approver_name': approver_names.get(requested_approver_id),
+                'actual_approver_id': None,
+                'actual_approver_name': None,
+                'requested_at': requested_at,
+                'decided_at': None,
+                'notes': notes,
+            })
+
+        approvals.extend(new_approvals)
+        data['approvals'] = approvals
+        state = update_approval_state(data, required=required)
+
+        # Matched against approved orders by the repeat_of_approved rule condition
+        state[REQUEST_FINGERPRINT_KEY] = compute_order_fingerprint(order)['fingerprint']
+
+        set_approval_data(order, data)
+
+    return new_approvals
 
 
-def record_approval(order, approving_user, approved=True, notes=''):
+@timed('record_approval')
+def record_approval(order, approving_user, approved=True, notes='', plugin=None):
     """Record an approval or rejection.
+
+    When the quorum for the current round is reached, any remaining pending
+    approvals are withdrawn. An "any approver" request stays open until the
+    quorum is reached.
     
     Args:
         order: The PurchaseOrder instance
         approving_user: The user approving/rejecting
         approved: True if approved, False if rejected
         notes: Optional notes
+        plugin: Optional plugin instance, used to resolve delegations
     
     Returns:
         The updated approval dict, or None if no pending approval
     """
-    data = get_approval_data(order)
+    from .delegation import get_routing_table
+
+    with transaction.atomic():
+        data = lock_approval_data(order)
+        approvals = data.get('approvals', [])
+        state = data.get('state') or build_approval_state(approvals)
+
+        # Each approver only counts once, also when two of their requests race
+        if approved and approving_user.id in state.get('approved_by_ids', []):
+            return None
+
+        acting_for = get_routing_table(plugin).get_delegators(approving_user.id) if plugin else []
+
+        # Find the pending approval
+        pending_index = find_user_pending_index(approvals, approving_user, acting_for)
+
+        if pending_index is None:
+            return None
+
+        approved_count = state.get('approved_count', 0)
+        approval = approvals[pending_index]
+
+        # An open request needs to stay available for the remaining approvers
+        if approved and not approval.get('requested_approver_id') and approved_count + 1 < state.get('required', 1):
+            approval = dict(approval)
+            approvals.insert(pending_index, approval)
+
+        # Update the approval
+        approval['status'] = 'approved' if approved else 'rejected'
+        approval['level'] = approved_count + 1 if approved else approval.get('level', 1)
+        approval['actual_approver_id'] = approving_user.id
+        approval['actual_approver_name'] = (
+            approving_user.get_full_name() or approving_user.username
+        )
+        approval['decided_at'] = datetime.now().isoformat()
+
+        # Record who the approver was standing in for
+        if approval.get('requested_approver_id') not in (None, approving_user.id):
+            approval['on_behalf_of_id'] = approval.get('requested_approver_id')
+            approval['on_behalf_of_name'] = approval.get('requested_approver_name')
+
+        if notes:
+            existing_notes = approval.get('notes', '')
+            if existing_notes:
+                approval['notes'] = f"{existing_notes}\n{notes}"
+            else:
+                approval['notes'] = notes
+
+        data['approvals'] = approvals
+        state = update_approval_state(data)
+
+        # Quorum reached, the remaining approvers no longer need to act
+        if state['status'] == 'approved':
+            data['approvals'] = [a for a in approvals if a.get('status') != 'pending']
+            update_approval_state(data)
+
+            # Remember what the order looked like when it was approved
+            data['state'].update(compute_order_fingerprint(order))
+
+        set_approval_data(order, data)
+
+    return approval
+
+
+def apply_auto_approval(data, rule_name, fingerprint=None):
+    """Approve the current request round on behalf of an auto-approval rule.
+
+    The approval data is modified in place but not saved, which allows
+    callers to write many orders at once.
+
+    Args:
+        data: The approval data dict
+        rule_name: Name of the rule which matched the order
+        fingerprint: Optional content fingerprint state keys for the order
+
+    Returns:
+        The new approval dict
+    """
     approvals = data.get('approvals', [])
-    
-    # Find the pending approval
-    pending_index = None
-    for i, approval in enumerate(approvals):
-        if approval.get('status') == 'pending':
-            pending_index = i
-            break
-    
-    if pending_index is None:
-        return None
-    
-    # Update the approval
-    approvals[pending_index]['status'] = 'approved' if approved else 'rejected'
-    approvals[pending_index]['actual_approver_id'] = approving_user.id
-    approvals[pending_index]['actual_approver_name'] = (
-        approving_user.get_full_name() or approving_user.username
-    )
-    approvals[pending_index]['decided_at'] = datetime.now().isoformat()
-    if notes:
-        existing_notes = approvals[pending_index].get('notes', '')
-        if existing_notes:
-            approvals[pending_index]['notes'] = f"{existing_notes}\n{notes}"
-        else:
-            approvals[pending_index]['notes'] = notes
-    
-    data['approvals'] = approvals
-    set_approval_data(order, data)
-    
-    return approvals[pending_index]
+    state = data.get('state') or build_approval_state(approvals)
+    pending = [a for a in approvals if a.get('status') == 'pending']
+    request = pending[0] if pending else {}
+
+    approval = {
+        'level': state.get('approved_count', 0) + 1,
+        'round': state.get('round') or 1,
+        'status': 'approved',
+        'requested_by_id': request.get('requested_by_id'),
+        'requested_by_name': request.get('requested_by_name'),
+        'requested_approver_id': None,
+        'requested_approver_name': None,
+        'actual_approver_id': None,
+        'actual_approver_name': f'Auto-approval rule: {rule_name}',
+        'requested_at': request.get('requested_at'),
+        'decided_at': datetime.now().isoformat(),
+        'notes': request.get('notes', ''),
+        'auto_rule': rule_name,
+    }
+
+    data['approvals'] = [a for a in approvals if a.get('status') != 'pending'] + [approval]
+    update_approval_state(data)
+
+    if fingerprint:
+        data['state'].update(fingerprint)
+
+    return approval
+
+
+def record_auto_approval(order, rule_name):
+    """Record an approval made by an auto-approval rule.
+
+    Args:
+        order: The PurchaseOrder instance
+        rule_name: Name of the rule which matched the order
+
+    Returns:
+        The new approval dict
+    """
+    with transaction.atomic():
+        data = lock_approval_data(order)
+        approval = apply_auto_approval(data, rule_name, compute_order_fingerprint(order))
+        set_approval_data(order, data)
+
+    return approval
 
 
 def remove_pending_approval(order):
@@ -211,20 +739,23 @@ def remove_pending_approval(order):
     Returns:
         True if a pending approval was removed, False otherwise
     """
-    data = get_approval_data(order)
-    approvals = data.get('approvals', [])
-    
-    # Find and remove pending approval
-    new_approvals = [a for a in approvals if a.get('status') != 'pending']
-    
-    if len(new_approvals) < len(approvals):
-        data['approvals'] = new_approvals
-        set_approval_data(order, data)
-        return True
-    
+    with transaction.atomic():
+        data = lock_approval_data(order)
+        approvals = data.get('approvals', [])
+
+        # Find and remove pending approval
+        new_approvals = [a for a in approvals if a.get('status') != 'pending']
+
+        if len(new_approvals) < len(approvals):
+            data['approvals'] = new_approvals
+            update_approval_state(data)
+            set_approval_data(order, data)
+            return True
+
     return False
 
 
+@timed('summary')
 def get_approval_summary(order):
     """Get a summary of the approval status.
     
@@ -234,73 +765,91 @@ def get_approval_summary(order):
     Returns:
         Dict with summary information
     """
-    approvals = get_approvals_list(order)
-    approved_count = sum(1 for a in approvals if a.get('status') == 'approved')
+    data = get_approval_data(order)
+    approvals = data.get('approvals', [])
+    state = data.get('state') or build_approval_state(approvals)
     pending = get_pending_approval(order)
+    approved_count = state.get('approved_count', 0)
     
     return {
-        'total_required': 1,
+        'total_required': state.get('required', 1),
         'approved_count': approved_count,
-        'is_fully_approved': approved_count >= 1,
+        'approval_status': state.get('status', 'none'),
+        'is_fully_approved': state.get('status') == 'approved',
         'has_pending': pending is not None,
         'pending_level': pending.get('level') if pending else None,
         'pending_approver_id': pending.get('requested_approver_id') if pending else None,
         'pending_approver_name': pending.get('requested_approver_name') if pending else None,
-        'can_request_more': approved_count < 1 and pending is None,
+        'pending_approver_ids': state.get('pending_approver_ids', []),
+        'can_request_more': state.get('status') in ('none', 'rejected'),
         'approvals': approvals,
     }
 
 
-def get_user_pending_approvals(user, plugin):
+@timed('pending_lookup')
+def get_user_pending_approvals(user, plugin, queryset=None):
     """Get all PurchaseOrders where this user was specifically requested as approver.
     
-    Only returns orders where the user was explicitly requested as the approver,
-    not orders where any approver can approve.
+    Only returns orders where the user was explicitly requested as the approver
+    (or as the approver they are currently delegated for), not orders where any
+    approver can approve.
     
     Args:
         user: The user to check
-        plugin: The plugin instance (unused but kept for API compatibility)
+        plugin: The plugin instance (used to resolve delegations)
+        queryset: Optional PurchaseOrder queryset to search (e.g. with deferred columns)
     
     Returns:
         List of PurchaseOrder instances
     """
     from order.models import PurchaseOrder
     from order.status_codes import PurchaseOrderStatusGroups
+
+    from .delegation import get_routing_table
+
+    approver_ids = {user.id, *get_routing_table(plugin).get_delegators(user.id)}
+
+    if queryset is None:
+        queryset = PurchaseOrder.objects.all()
     
     # Only check open orders for efficiency
-    open_orders = PurchaseOrder.objects.filter(
+    open_orders = queryset.filter(
         status__in=PurchaseOrderStatusGroups.OPEN
     )
     
     pending_orders = []
     
     for order in open_orders:
-        pending = get_pending_approval(order)
-        if pending:
-            # Only include if THIS user was specifically requested as approver
-            requested_approver_id = pending.get('requested_approver_id')
-            if requested_approver_id == user.id:
+        state = get_approval_state(order)
+        if state.get('status') == 'pending':
+            # Only include if THIS user (or a user they stand in for) was requested
+            if approver_ids.intersection(state.get('pending_approver_ids', [])):
                 pending_orders.append(order)
     
     return pending_orders
 
 
-def get_any_approver_pending_orders(plugin):
+@timed('pending_lookup')
+def get_any_approver_pending_orders(plugin, queryset=None):
     """Get all PurchaseOrders with pending approvals that are NOT high-value.
     
     These are orders that any approver can approve (not restricted to senior approvers).
     
     Args:
         plugin: The plugin instance
+        queryset: Optional PurchaseOrder queryset to search (e.g. with deferred columns)
     
     Returns:
         List of PurchaseOrder instances
     """
     from order.models import PurchaseOrder
     from order.status_codes import PurchaseOrderStatusGroups
+
+    if queryset is None:
+        queryset = PurchaseOrder.objects.all()
     
     # Only check open orders for efficiency
-    open_orders = PurchaseOrder.objects.filter(
+    open_orders = queryset.filter(
         status__in=PurchaseOrderStatusGroups.OPEN
     )
     
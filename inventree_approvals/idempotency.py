@@ -0,0 +1,115 @@
+"""Idempotency key support for the PO Approvals plugin API.
+
+Clients (and proxies retrying on their behalf) can send an Idempotency-Key
+header with a POST request. The first response for a key is stored for a
+short time, and any replay of the same request returns the stored response
+without running the view again - so the order, its metadata and the
+notifications are not touched twice.
+
+Responses are kept in the Django cache, which is the local-memory cache
+unless InvenTree has been configured with a shared cache.
+"""
+
+import functools
+import hashlib
+import json
+
+from django.core.cache import cache
+
+from rest_framework import status
+from rest_framework.response import Response
+
+# Request header carrying the idempotency key
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+
+# How long a stored response can be replayed (seconds)
+IDEMPOTENCY_TTL = 300
+
+# How long a request may hold a key while it is being processed (seconds)
+IDEMPOTENCY_LOCK_TTL = 30
+
+# Maximum accepted key length
+MAX_KEY_LENGTH = 255
+
+
+def get_cache_key(request, key):
+    """Build the cache key for a request and idempotency key.
+
+    Keys are scoped to the user and the request path, so different users
+    or endpoints can never replay each other's responses.
+    """
+    digest = hashlib.sha256(f'{request.path}:{key}'.encode()).hexdigest()
+    return f'po_approvals:idempotency:{request.user.pk}:{digest}'
+
+
+def get_payload_hash(request):
+    """Hash the request payload, to detect a key being reused for a different request."""
+    payload = json.dumps(request.data, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def idempotent(view_method):
+    """Decorator which makes an APIView method honour the Idempotency-Key header.
+
+    Requests without the header are processed as normal.
+    """
+
+    @functools.wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+
+        if not key:
+            return view_method(self, request, *args, **kwargs)
+
+        if len(key) > MAX_KEY_LENGTH:
+            return Response(
+                {'error': 'Idempotency key is too long'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        cache_key = get_cache_key(request, key)
+        payload_hash = get_payload_hash(request)
+
+        stored = cache.get(cache_key)
+
+        if stored is None:
+            # Only one request may process a key at a time
+            if not cache.add(f'{cache_key}:lock', True, IDEMPOTENCY_LOCK_TTL):
+                return Response(
+                    {'error': 'A request with this idempotency key is already in progress'},
+                    status=status.HTTP_409_CONFLICT,
+                )
+
+            try:
+                # Another request may have stored its response and released
+                # the lock between the first read and claiming the lock
+                stored = cache.get(cache_key)
+
+                if stored is None:
+                    response = view_method(self, request, *args, **kwargs)
+
+                    # Server errors may be transient, so they can be retried
+                    if response.status_code < 500:
+                        cache.set(cache_key, {
+                            'payload_hash': payload_hash,
+                            'status': response.status_code,
+                            'data': response.data,
+                        }, IDEMPOTENCY_TTL)
+
+                    return response
+            finally:
+                cache.delete(f'{cache_key}:lock')
+
+        if stored['payload_hash'] != payload_hash:
+            return Response(
+                {'error': 'Idempotency key has already been used for a different request'},
+                status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            )
+
+        return Response(
+            stored['data'],
+            status=stored['status'],
+            headers={'Idempotent-Replayed': 'true'},
+        )
+
+    return wrapper
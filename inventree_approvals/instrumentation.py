@@ -0,0 +1,172 @@
+"""Opt-in request instrumentation for the PO Approvals plugin.
+
+When the ENABLE_INSTRUMENTATION setting is on, every plugin API request
+records its SQL query count and time, the wall time of each named phase
+(permission checks, total price calculation, notifications, ...) and the
+total time. The results are logged as structured fields, and optionally
+returned in a Server-Timing response header.
+
+When instrumentation is off, phases cost a single context variable lookup.
+"""
+
+import contextvars
+import functools
+import time
+from contextlib import ExitStack, contextmanager
+
+import structlog
+
+logger = structlog.get_logger('inventree')
+
+# Metrics for the request currently being processed (if instrumented)
+_current_metrics = contextvars.ContextVar('po_approvals_metrics', default=None)
+
+# URL arguments which are credentials, and must not be logged
+SECRET_URL_KWARGS = ('token',)
+
+
+def get_log_path(request):
+    """Get the request path for logging, with credentials (the action link token) redacted."""
+    path = request.path
+    match = getattr(request, 'resolver_match', None)
+
+    for name in SECRET_URL_KWARGS:
+        value = match.kwargs.get(name) if match else None
+
+        if value:
+            path = path.replace(str(value), f'<{name}>')
+
+    return path
+
+
+class RequestMetrics:
+    """Timing and query metrics collected for a single request."""
+
+    def __init__(self):
+        """Start with no recorded queries or phases."""
+        self.sql_queries = 0
+        self.sql_time = 0.0
+        self.phases = {}
+
+    def add_phase(self, name, seconds):
+        """Add wall time to a named phase."""
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def execute_wrapper(self, execute, sql, params, many, context):
+        """Database execute wrapper which counts and times every query."""
+        start = time.perf_counter()
+
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_queries += 1
+            self.sql_time += time.perf_counter() - start
+
+    def server_timing(self, total):
+        """Format the metrics as a Server-Timing header value."""
+        entries = [
+            f'app;dur={total * 1000:.1f}',
+            f'sql;dur={self.sql_time * 1000:.1f};desc="{self.sql_queries} queries"',
+        ]
+
+        entries.extend(f'{name};dur={seconds * 1000:.1f}' for name, seconds in self.phases.items())
+
+        return ', '.join(entries)
+
+
+@contextmanager
+def phase(name):
+    """Record the wall time of a block as a named phase of the current request."""
+    metrics = _current_metrics.get()
+
+    if metrics is None:
+        yield
+        return
+
+    start = time.perf_counter()
+
+    try:
+        yield
+    finally:
+        metrics.add_phase(name, time.perf_counter() - start)
+
+
+def timed(name):
+    """Decorator which records each call of a function as a named phase."""
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _current_metrics.get() is None:
+                return func(*args, **kwargs)
+
+            with phase(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def instrumented(view_method):
+    """Decorator which instruments an APIView method.
+
+    Request counts and durations are always recorded in the plugin metrics.
+    The detailed SQL and phase timings, and profiles, are only collected if
+    enabled in the plugin settings.
+    """
+
+    @functools.wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        from django.db import connections
+        from plugin import registry
+
+        from . import metrics, profiling
+
+        start = time.perf_counter()
+        plugin = registry.get_plugin('approvals')
+
+        if not plugin or not plugin.get_setting('ENABLE_INSTRUMENTATION'):
+            response = profiling.profile_view(
+                plugin, self, request, lambda: view_method(self, request, *args, **kwargs)
+            )
+            metrics.record_request(
+                type(self).__name__, request.method, response.status_code, time.perf_counter() - start
+            )
+            return response
+
+        request_metrics = RequestMetrics()
+        token = _current_metrics.set(request_metrics)
+
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(request_metrics.execute_wrapper))
+
+                response = profiling.profile_view(
+                    plugin, self, request, lambda: view_method(self, request, *args, **kwargs)
+                )
+        finally:
+            _current_metrics.reset(token)
+
+        total = time.perf_counter() - start
+        metrics.record_request(type(self).__name__, request.method, response.status_code, total)
+
+        logger.info(
+            'Approvals API request',
+            view=type(self).__name__,
+            method=request.method,
+            path=get_log_path(request),
+            status_code=response.status_code,
+            duration_ms=round(total * 1000, 2),
+            sql_queries=request_metrics.sql_queries,
+            sql_ms=round(request_metrics.sql_time * 1000, 2),
+            phases_ms={name: round(seconds * 1000, 2) for name, seconds in request_metrics.phases.items()},
+        )
+
+        if plugin.get_setting('SERVER_TIMING_HEADER'):
+            response['Server-Timing'] = request_metrics.server_timing(total)
+
+        return response
+
+    return wrapper
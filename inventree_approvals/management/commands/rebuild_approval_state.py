@@ -0,0 +1,181 @@
+"""Management command to backfill, rebuild or verify the derived approval state.
+
+    invoke manage "rebuild_approval_state --workers 4"
+    invoke manage "rebuild_approval_state --verify --dry-run"
+
+Progress is saved to a checkpoint file after every chunk; an interrupted
+run continues where it stopped with --resume. See backfill.py.
+"""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+
+from inventree_approvals import backfill
+
+
+def run_chunk(chunk, steps, verify, repair):
+    """Process a chunk on a worker thread, closing the thread's database connection afterwards."""
+    try:
+        return backfill.process_chunk(chunk, steps, verify=verify, repair=repair)
+    finally:
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    """Backfill, rebuild or verify the derived approval state of every purchase order."""
+
+    help = 'Rebuild (or verify and repair) the approval state, index, search documents and rollups from the order metadata'
+
+    def add_arguments(self, parser):
+        """Add the command arguments."""
+        parser.add_argument(
+            '--steps',
+            default=','.join(backfill.STEPS),
+            help=f'Comma-separated steps to run (default: {",".join(backfill.STEPS)})',
+        )
+        parser.add_argument(
+            '--verify',
+            action='store_true',
+            help='Compare the derived state with the metadata, and only rewrite what has drifted',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report the drift without repairing it (implies --verify)',
+        )
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Orders per chunk (default: 1000)')
+        parser.add_argument('--workers', type=int, default=1, help='Chunks processed in parallel (default: 1)')
+        parser.add_argument(
+            '--checkpoint',
+            default='po_approvals_backfill.json',
+            help='Checkpoint file recording the completed chunks (default: po_approvals_backfill.json)',
+        )
+        parser.add_argument(
+            '--resume',
+            action='store_true',
+            help='Continue an interrupted run from the checkpoint file',
+        )
+
+    def handle(self, *args, **options):
+        """Run the backfill."""
+        steps = [step for step in options['steps'].split(',') if step]
+
+        unknown = set(steps) - set(backfill.STEPS)
+        if unknown or not steps:
+            raise CommandError(f'Invalid steps: {", ".join(sorted(unknown)) or "(none)"}')
+
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be at least 1')
+
+        verify = options['verify'] or options['dry_run']
+        repair = not options['dry_run']
+        workers = max(options['workers'], 1)
+
+        if workers > 1 and connection.vendor == 'sqlite':
+            self.stderr.write(self.style.WARNING('SQLite does not support concurrent writers, using one worker'))
+            workers = 1
+
+        run = {
+            'steps': steps,
+            'verify': verify,
+            'repair': repair,
+            'chunk_size': options['chunk_size'],
+        }
+
+        path = options['checkpoint']
+        chunk_steps = [step for step in steps if step in backfill.CHUNK_STEPS]
+
+        if options['resume']:
+            checkpoint = backfill.load_checkpoint(path)
+
+            if checkpoint is None:
+                raise CommandError(f'No checkpoint found at {path}')
+
+            if checkpoint['run'] != run:
+                raise CommandError(f'The checkpoint at {path} was written by a run with different options: {checkpoint["run"]}')
+        else:
+            checkpoint = {
+                'run': run,
+                'chunks': backfill.plan_chunks(options['chunk_size']) if chunk_steps else [],
+                'done': [],
+                'totals': {},
+            }
+            backfill.save_checkpoint(path, checkpoint)
+
+        done = set(checkpoint['done'])
+        pending = [chunk for chunk in checkpoint['chunks'] if chunk[0] not in done]
+        totals = checkpoint['totals']
+
+        action = 'Drift' if verify else 'Written'
+
+        self.stdout.write(
+            f'{"Verifying" if verify else "Rebuilding"} {", ".join(steps)}: '
+            f'{len(pending)} of {len(checkpoint["chunks"])} chunks to process, {workers} worker(s)'
+            + ('' if repair else ' (dry run)')
+        )
+
+        started = time.monotonic()
+        processed = 0
+        completed = 0
+
+        if pending:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = {
+                    executor.submit(run_chunk, chunk, chunk_steps, verify, repair): chunk
+                    for chunk in pending
+                }
+
+                for future in as_completed(futures):
+                    chunk = futures[future]
+
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        for other in futures:
+                            other.cancel()
+
+                        raise CommandError(
+                            f'Chunk starting at order {chunk[0]} failed: {e}\n'
+                            f'Completed chunks are recorded in {path}; rerun with --resume to continue'
+                        )
+
+                    for key, count in result.items():
+                        totals[key] = totals.get(key, 0) + count
+
+                    checkpoint['done'].append(chunk[0])
+                    backfill.save_checkpoint(path, checkpoint)
+
+                    processed += result['orders']
+                    completed += 1
+                    elapsed = time.monotonic() - started
+                    remaining = len(checkpoint['chunks']) - len(checkpoint['done'])
+                    rate = processed / elapsed if elapsed else 0
+
+                    self.stdout.write(
+                        f'[{len(checkpoint["done"])}/{len(checkpoint["chunks"])}] '
+                        f'{processed} orders, {rate:.0f} orders/s, ~{remaining * elapsed / completed:.0f}s left | '
+                        + ', '.join(f'{step} {result[step]}' for step in chunk_steps)
+                    )
+
+        if 'rollups' in steps:
+            self.stdout.write('Recomputing the turnaround rollups...')
+            totals['rollups'] = backfill.process_rollups(verify=verify, repair=repair)
+
+        elapsed = time.monotonic() - started
+
+        summary = ', '.join(f'{step} {totals.get(step, 0)}' for step in steps)
+        self.stdout.write(self.style.SUCCESS(
+            f'Done in {elapsed:.1f}s: {totals.get("orders", 0)} orders. {action}: {summary}'
+        ))
+
+        if verify and not repair and any(totals.get(step) for step in steps):
+            self.stdout.write(self.style.WARNING('Drift found; run without --dry-run to repair it'))
+
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,355 @@
+"""Operational metrics for the PO Approvals plugin.
+
+Counters and histograms are kept in memory in each worker process, which
+keeps the overhead on the request path to a dictionary update. Every few
+seconds a worker writes a snapshot of its totals to the shared cache, and
+the metrics endpoint sums the snapshots of all workers and renders them in
+the Prometheus text format.
+
+Each worker registers itself by claiming one of MAX_WORKERS slot keys with
+cache.add(), so that workers starting at the same time cannot overwrite
+each other's registration. The slot and the snapshot expire after
+WORKER_TTL unless a flush refreshes them, so a worker which has stopped
+(or has been idle for that long) drops out of the totals.
+
+Pending queue depth is a gauge, so it is computed when the metrics are
+scraped rather than tracked per request.
+"""
+
+import functools
+import os
+import socket
+import threading
+import time
+from datetime import datetime
+
+# Histogram bucket upper bounds (seconds) per metric
+HISTOGRAM_BUCKETS = {
+    'po_approvals_request_duration_seconds': (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+    'po_approvals_time_to_decision_seconds': (60, 300, 900, 3600, 14400, 28800, 86400, 259200, 604800),
+    'po_approvals_notification_duration_seconds': (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+}
+
+# Help text for each metric
+METRIC_HELP = {
+    'po_approvals_requests_total': 'Approvals API requests by view, method and status code',
+    'po_approvals_request_duration_seconds': 'Approvals API request duration by view',
+    'po_approvals_decisions_total': 'Approval decisions by outcome',
+    'po_approvals_time_to_decision_seconds': 'Time from approval request to decision',
+    'po_approvals_notifications_total': 'Notifications sent by channel and result',
+    'po_approvals_notification_duration_seconds': 'Notification send duration by channel',
+    'po_approvals_pending_approvals': 'Pending approval requests by requested approver',
+    'po_approvals_throttled_total': 'Approvals API requests rejected by a rate or concurrency limit, by view and throttle',
+}
+
+# How often a worker writes its snapshot to the shared cache (seconds)
+FLUSH_INTERVAL = 10
+
+# How long a worker's slot and snapshot are kept after its last flush (seconds)
+WORKER_TTL = 300
+
+# Number of worker slots (workers beyond this are not included in the totals)
+MAX_WORKERS = 256
+
+CACHE_PREFIX = 'po_approvals:metrics'
+
+SLOT_KEY = CACHE_PREFIX + ':worker:{slot}'
+
+
+class MetricsRegistry:
+    """In-process counters and histograms for one worker."""
+
+    def __init__(self):
+        """Create an empty registry for this process."""
+        self.worker_id = f'{socket.gethostname()}:{os.getpid()}'
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+        self.last_flush = 0.0
+        self.slot = None
+
+    def inc(self, name, labels, value=1):
+        """Increment a counter."""
+        key = (name, tuple(sorted(labels.items())))
+
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+        self.maybe_flush()
+
+    def observe(self, name, labels, value):
+        """Record a value in a histogram."""
+        key = (name, tuple(sorted(labels.items())))
+        buckets = HISTOGRAM_BUCKETS[name]
+
+        with self.lock:
+            histogram = self.histograms.get(key)
+
+            if histogram is None:
+                histogram = self.histograms[key] = {'buckets': [0] * len(buckets), 'sum': 0.0, 'count': 0}
+
+            for i, bound in enumerate(buckets):
+                if value <= bound:
+                    histogram['buckets'][i] += 1
+                    break
+
+            histogram['sum'] += value
+            histogram['count'] += 1
+
+        self.maybe_flush()
+
+    def snapshot(self):
+        """Return a serialisable copy of the current totals."""
+        with self.lock:
+            return {
+                'counters': [[name, list(labels), value] for (name, labels), value in self.counters.items()],
+                'histograms': [
+                    [name, list(labels), list(h['buckets']), h['sum'], h['count']]
+                    for (name, labels), h in self.histograms.items()
+                ],
+            }
+
+    def maybe_flush(self):
+        """Write the snapshot to the shared cache if the flush interval has passed."""
+        if time.monotonic() - self.last_flush >= FLUSH_INTERVAL:
+            self.flush()
+
+    def flush(self):
+        """Write the snapshot of this worker to the shared cache."""
+        from django.core.cache import cache
+
+        self.last_flush = time.monotonic()
+
+        try:
+            cache.set(f'{CACHE_PREFIX}:{self.worker_id}', self.snapshot(), WORKER_TTL)
+
+            # The slot may have expired, and been claimed by another worker
+            if self.slot is None or not cache.touch(SLOT_KEY.format(slot=self.slot), WORKER_TTL) \
+                    or cache.get(SLOT_KEY.format(slot=self.slot)) != self.worker_id:
+                self.slot = self.claim_slot()
+        except Exception:
+            # Metrics must never break the request path
+            pass
+
+    def claim_slot(self):
+        """Claim a free worker slot, so that the metrics endpoint finds this worker.
+
+        Returns:
+            The slot number, or None if every slot is taken
+        """
+        from django.core.cache import cache
+
+        for slot in range(MAX_WORKERS):
+            key = SLOT_KEY.format(slot=slot)
+
+            if cache.add(key, self.worker_id, WORKER_TTL) or cache.get(key) == self.worker_id:
+                return slot
+
+        return None
+
+
+registry = MetricsRegistry()
+
+
+def _elapsed(start, end):
+    """Seconds between two ISO timestamps, or None if either is missing."""
+    try:
+        return (datetime.fromisoformat(end) - datetime.fromisoformat(start)).total_seconds()
+    except (TypeError, ValueError):
+        return None
+
+
+def record_request(view, method, status_code, duration):
+    """Record a completed API request."""
+    registry.inc('po_approvals_requests_total', {'view': view, 'method': method, 'status': str(status_code)})
+    registry.observe('po_approvals_request_duration_seconds', {'view': view}, duration)
+
+
+def record_decision(decision, approval):
+    """Record an approval decision.
+
+    Args:
+        decision: One of 'approved', 'rejected', 'auto_approved'
+        approval: The approval dict, used for the time to decision
+    """
+    registry.inc('po_approvals_decisions_total', {'decision': decision})
+
+    elapsed = _elapsed(approval.get('requested_at'), approval.get('decided_at'))
+    if elapsed is not None:
+        registry.observe('po_approvals_time_to_decision_seconds', {'decision': decision}, elapsed)
+
+
+def track_notification(channel):
+    """Decorator which records the result and duration of a notification function.
+
+    The wrapped function must return True when the notification was sent.
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            sent = func(*args, **kwargs)
+
+            registry.inc('po_approvals_notifications_total', {
+                'channel': channel,
+                'result': 'success' if sent else 'failure',
+            })
+            registry.observe(
+                'po_approvals_notification_duration_seconds', {'channel': channel}, time.perf_counter() - start
+            )
+
+            return sent
+
+        return wrapper
+
+    return decorator
+
+
+def collect():
+    """Sum the snapshots of all workers.
+
+    Returns:
+        Tuple of (counters, histograms) dicts keyed by (name, labels)
+    """
+    from django.core.cache import cache
+
+    registry.flush()
+
+    workers = set(cache.get_many([SLOT_KEY.format(slot=slot) for slot in range(MAX_WORKERS)]).values())
+    snapshots = cache.get_many([f'{CACHE_PREFIX}:{worker}' for worker in workers]).values()
+
+    counters = {}
+    histograms = {}
+
+    for snapshot in snapshots:
+        for name, labels, value in snapshot['counters']:
+            key = (name, tuple(tuple(label) for label in labels))
+            counters[key] = counters.get(key, 0) + value
+
+        for name, labels, buckets, total, count in snapshot['histograms']:
+            key = (name, tuple(tuple(label) for label in labels))
+            histogram = histograms.setdefault(key, {'buckets': [0] * len(buckets), 'sum': 0.0, 'count': 0})
+            histogram['buckets'] = [a + b for a, b in zip(histogram['buckets'], buckets)]
+            histogram['sum'] += total
+            histogram['count'] += count
+
+    return counters, histograms
+
+
+def get_pending_depth():
+    """Count the pending approval requests per requested approver.
+
+    Requests which any approver can act on are counted as 'any'. With app
+    integration enabled, the counts are aggregated from the approval index
+    in two queries; otherwise the metadata of every open order is read.
+    """
+    from django.db.models import Count
+    from order.models import PurchaseOrder
+    from order.status_codes import PurchaseOrderStatusGroups
+
+    from . import approval_index, helpers
+
+    depth = {}
+
+    if approval_index.index_available():
+        from .models import ApprovalIndex, ApprovalIndexApprover
+
+        open_pending = {
+            'order__status__in': PurchaseOrderStatusGroups.OPEN,
+            'order__approval_index__status': 'pending',
+        }
+
+        depth.update(
+            ApprovalIndexApprover.objects.filter(**open_pending).values('approver_pk').annotate(
+                count=Count('pk')
+            ).values_list('approver_pk', 'count')
+        )
+
+        any_count = ApprovalIndex.objects.filter(
+            status='pending', any_approver=True, order__status__in=PurchaseOrderStatusGroups.OPEN
+        ).count()
+
+        if any_count:
+            depth['any'] = any_count
+
+        return resolve_usernames(depth)
+
+    orders = PurchaseOrder.objects.filter(status__in=PurchaseOrderStatusGroups.OPEN).only('pk', 'metadata')
+
+    for order in orders.iterator():
+        state = helpers.get_approval_state(order)
+
+        if state.get('status') != 'pending':
+            continue
+
+        for approver_id in state.get('pending_approver_ids', []):
+            depth[approver_id] = depth.get(approver_id, 0) + 1
+
+        if state.get('any_approver'):
+            depth['any'] = depth.get('any', 0) + 1
+
+    return resolve_usernames(depth)
+
+
+def resolve_usernames(depth):
+    """Key the pending depth counts by username rather than user pk."""
+    from django.contrib.auth import get_user_model
+
+    usernames = dict(
+        get_user_model().objects.filter(pk__in=[pk for pk in depth if pk != 'any']).values_list('pk', 'username')
+    )
+
+    return {usernames.get(key, str(key)) if key != 'any' else 'any': count for key, count in depth.items()}
+
+
+def _format_labels(labels):
+    """Format a label tuple for the Prometheus text format."""
+    if not labels:
+        return ''
+
+    def escape(value):
+        return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+    return '{' + ','.join(f'{key}="{escape(value)}"' for key, value in labels) + '}'
+
+
+def render_prometheus():
+    """Render all metrics in the Prometheus text exposition format."""
+    counters, histograms = collect()
+
+    gauges = {
+        ('po_approvals_pending_approvals', (('approver', approver),)): count
+        for approver, count in get_pending_depth().items()
+    }
+
+    lines = []
+    described = set()
+
+    def describe(name, metric_type):
+        if name not in described:
+            described.add(name)
+            lines.append(f'# HELP {name} {METRIC_HELP.get(name, name)}')
+            lines.append(f'# TYPE {name} {metric_type}')
+
+    for (name, labels), value in sorted(counters.items()):
+        describe(name, 'counter')
+        lines.append(f'{name}{_format_labels(labels)} {value}')
+
+    for (name, labels), value in sorted(gauges.items()):
+        describe(name, 'gauge')
+        lines.append(f'{name}{_format_labels(labels)} {value}')
+
+    for (name, labels), histogram in sorted(histograms.items()):
+        describe(name, 'histogram')
+
+        cumulative = 0
+        for bound, count in zip(HISTOGRAM_BUCKETS[name], histogram['buckets']):
+            cumulative += count
+            lines.append(f'{name}_bucket{_format_labels((*labels, ("le", bound)))} {cumulative}')
+
+        lines.append(f'{name}_bucket{_format_labels((*labels, ("le", "+Inf")))} {histogram["count"]}')
+        lines.append(f'{name}_sum{_format_labels(labels)} {histogram["sum"]}')
+        lines.append(f'{name}_count{_format_labels(labels)} {histogram["count"]}')
+
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,31 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name='ApprovalTurnaroundRollup',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(db_index=True, help_text='First day of the month in which the decisions were made', verbose_name='Month')),
+                ('approver_pk', models.PositiveIntegerField(default=0, help_text='Primary key of the approving user (0 for automatic approvals)', verbose_name='Approver')),
+                ('supplier_pk', models.PositiveIntegerField(default=0, help_text='Primary key of the order supplier', verbose_name='Supplier')),
+                ('decision', models.CharField(max_length=20, verbose_name='Decision')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='Count')),
+                ('total_seconds', models.FloatField(default=0, help_text='Sum of the turnaround times', verbose_name='Total Seconds')),
+                ('buckets', models.JSONField(default=list, help_text='Number of decisions per turnaround histogram bucket', verbose_name='Buckets')),
+            ],
+            options={
+                'verbose_name': 'Approval Turnaround Rollup',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='approvalturnaroundrollup',
+            constraint=models.UniqueConstraint(fields=('month', 'approver_pk', 'supplier_pk', 'decision'), name='unique_approval_turnaround_rollup'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('order', '__first__'),
+        ('inventree_approvals', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ApprovalIndex',
+            fields=[
+                ('order', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='approval_index', serialize=False, to='order.purchaseorder', verbose_name='Purchase Order')),
+                ('status', models.CharField(db_index=True, max_length=20, verbose_name='Approval Status')),
+                ('any_approver', models.BooleanField(db_index=True, default=False, help_text='The pending request can be approved by any approver', verbose_name='Any Approver')),
+            ],
+            options={
+                'verbose_name': 'Approval Index',
+            },
+        ),
+        migrations.CreateModel(
+            name='ApprovalIndexApprover',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('approver_pk', models.PositiveIntegerField(db_index=True, help_text='Primary key of the requested approver', verbose_name='Approver')),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='approval_index_approvers', to='order.purchaseorder', verbose_name='Purchase Order')),
+            ],
+            options={
+                'verbose_name': 'Approval Index Approver',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='approvalindexapprover',
+            constraint=models.UniqueConstraint(fields=('order', 'approver_pk'), name='unique_approval_index_approver'),
+        ),
+    ]
@@ -0,0 +1,98 @@
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.utils import OperationalError
+
+DOCUMENT_TABLE = 'inventree_approvals_approvalsearchdocument'
+FTS_TABLE = 'inventree_approvals_search_fts'
+FTS_COLUMNS = 'reference, supplier, description, people, notes'
+
+# Weighted document vector (the configuration must match search.PG_CONFIG)
+POSTGRESQL_OPERATIONS = [
+    f"""
+    ALTER TABLE {DOCUMENT_TABLE} ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('english'::regconfig, reference), 'A') ||
+        setweight(to_tsvector('english'::regconfig, supplier), 'B') ||
+        setweight(to_tsvector('english'::regconfig, description), 'C') ||
+        setweight(to_tsvector('english'::regconfig, people), 'D') ||
+        setweight(to_tsvector('english'::regconfig, notes), 'D')
+    ) STORED
+    """,
+    f'CREATE INDEX inventree_approvals_search_vector ON {DOCUMENT_TABLE} USING gin (search_vector)',
+]
+
+# External content FTS5 table, kept in sync with the document table by triggers
+SQLITE_OPERATIONS = [
+    f"""
+    CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+        {FTS_COLUMNS}, content='{DOCUMENT_TABLE}', content_rowid='order_id', tokenize='porter unicode61'
+    )
+    """,
+    f"""
+    CREATE TRIGGER {FTS_TABLE}_insert AFTER INSERT ON {DOCUMENT_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE} (rowid, {FTS_COLUMNS})
+        VALUES (new.order_id, new.reference, new.supplier, new.description, new.people, new.notes);
+    END
+    """,
+    f"""
+    CREATE TRIGGER {FTS_TABLE}_delete AFTER DELETE ON {DOCUMENT_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, {FTS_COLUMNS})
+        VALUES ('delete', old.order_id, old.reference, old.supplier, old.description, old.people, old.notes);
+    END
+    """,
+    f"""
+    CREATE TRIGGER {FTS_TABLE}_update AFTER UPDATE ON {DOCUMENT_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, {FTS_COLUMNS})
+        VALUES ('delete', old.order_id, old.reference, old.supplier, old.description, old.people, old.notes);
+        INSERT INTO {FTS_TABLE} (rowid, {FTS_COLUMNS})
+        VALUES (new.order_id, new.reference, new.supplier, new.description, new.people, new.notes);
+    END
+    """,
+]
+
+
+def create_search_index(apps, schema_editor):
+    """Create the full-text index of the database backend, if it has one."""
+    vendor = schema_editor.connection.vendor
+
+    if vendor == 'postgresql':
+        for sql in POSTGRESQL_OPERATIONS:
+            schema_editor.execute(sql)
+    elif vendor == 'sqlite':
+        try:
+            for sql in SQLITE_OPERATIONS:
+                schema_editor.execute(sql)
+        except OperationalError:
+            # SQLite built without FTS5: search falls back to unindexed matching
+            pass
+
+
+def drop_search_index(apps, schema_editor):
+    """Drop the SQLite FTS5 table (the PostgreSQL column goes with its table)."""
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('order', '__first__'),
+        ('inventree_approvals', '0002_approvalindex'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ApprovalSearchDocument',
+            fields=[
+                ('order', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='approval_search_document', serialize=False, to='order.purchaseorder', verbose_name='Purchase Order')),
+                ('reference', models.TextField(blank=True, default='', verbose_name='Reference')),
+                ('supplier', models.TextField(blank=True, default='', help_text='Supplier name', verbose_name='Supplier')),
+                ('description', models.TextField(blank=True, default='', verbose_name='Description')),
+                ('people', models.TextField(blank=True, default='', help_text='Names of the requesters and approvers', verbose_name='People')),
+                ('notes', models.TextField(blank=True, default='', help_text='Approval request and decision notes', verbose_name='Notes')),
+            ],
+            options={
+                'verbose_name': 'Approval Search Document',
+            },
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
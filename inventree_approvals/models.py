@@ -0,0 +1,200 @@
+"""Database models for the PO Approvals plugin.
+
+The approval workflow itself keeps its state in the purchase order
+metadata. These models only hold derived data which is too expensive to
+compute from the metadata on every request.
+"""
+
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+class ApprovalTurnaroundRollup(models.Model):
+    """Pre-aggregated approval turnaround times.
+
+    Each row holds the decisions made by one approver, for one supplier,
+    in one calendar month, with the same outcome. Turnaround is the time
+    from the approval request to the decision; its distribution is kept as
+    counts per histogram bucket (see analytics.TURNAROUND_BUCKETS), so
+    percentiles over any combination of rows can be estimated without
+    reading the order metadata.
+    """
+
+    class Meta:
+        """Metaclass options."""
+
+        app_label = 'inventree_approvals'
+        verbose_name = _('Approval Turnaround Rollup')
+        constraints = [
+            models.UniqueConstraint(
+                fields=['month', 'approver_pk', 'supplier_pk', 'decision'],
+                name='unique_approval_turnaround_rollup',
+            ),
+        ]
+
+    month = models.DateField(
+        verbose_name=_('Month'),
+        help_text=_('First day of the month in which the decisions were made'),
+        db_index=True,
+    )
+
+    # Plain integers rather than foreign keys, so that deleting a user or
+    # company does not remove their history (0 means no approver / supplier)
+    approver_pk = models.PositiveIntegerField(
+        verbose_name=_('Approver'),
+        help_text=_('Primary key of the approving user (0 for automatic approvals)'),
+        default=0,
+    )
+
+    supplier_pk = models.PositiveIntegerField(
+        verbose_name=_('Supplier'),
+        help_text=_('Primary key of the order supplier'),
+        default=0,
+    )
+
+    decision = models.CharField(
+        verbose_name=_('Decision'),
+        max_length=20,
+    )
+
+    count = models.PositiveIntegerField(
+        verbose_name=_('Count'),
+        default=0,
+    )
+
+    total_seconds = models.FloatField(
+        verbose_name=_('Total Seconds'),
+        help_text=_('Sum of the turnaround times'),
+        default=0,
+    )
+
+    buckets = models.JSONField(
+        verbose_name=_('Buckets'),
+        help_text=_('Number of decisions per turnaround histogram bucket'),
+        default=list,
+    )
+
+
+class ApprovalIndex(models.Model):
+    """Indexed copy of the approval status of a purchase order.
+
+    The approval state lives in the order metadata, which cannot be
+    indexed on every database backend. This table mirrors the fields used
+    for filtering, and is kept in sync whenever the approval data is saved
+    (see approval_index.py).
+    """
+
+    class Meta:
+        """Metaclass options."""
+
+        app_label = 'inventree_approvals'
+        verbose_name = _('Approval Index')
+
+    order = models.OneToOneField(
+        'order.PurchaseOrder',
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='approval_index',
+        verbose_name=_('Purchase Order'),
+    )
+
+    status = models.CharField(
+        verbose_name=_('Approval Status'),
+        max_length=20,
+        db_index=True,
+    )
+
+    any_approver = models.BooleanField(
+        verbose_name=_('Any Approver'),
+        help_text=_('The pending request can be approved by any approver'),
+        default=False,
+        db_index=True,
+    )
+
+
+class ApprovalIndexApprover(models.Model):
+    """A user whose approval is pending on a purchase order."""
+
+    class Meta:
+        """Metaclass options."""
+
+        app_label = 'inventree_approvals'
+        verbose_name = _('Approval Index Approver')
+        constraints = [
+            models.UniqueConstraint(
+                fields=['order', 'approver_pk'],
+                name='unique_approval_index_approver',
+            ),
+        ]
+
+    order = models.ForeignKey(
+        'order.PurchaseOrder',
+        on_delete=models.CASCADE,
+        related_name='approval_index_approvers',
+        verbose_name=_('Purchase Order'),
+    )
+
+    approver_pk = models.PositiveIntegerField(
+        verbose_name=_('Approver'),
+        help_text=_('Primary key of the requested approver'),
+        db_index=True,
+    )
+
+
+class ApprovalSearchDocument(models.Model):
+    """Searchable text of a purchase order and its approvals.
+
+    The approval notes and the names of the people involved live in the
+    order metadata, which cannot be searched efficiently. This table holds
+    them as plain text, alongside the order fields, and is kept in sync
+    whenever the approval data is saved (see search.py). The full-text
+    index over it depends on the database backend, and is created by the
+    migration.
+    """
+
+    class Meta:
+        """Metaclass options."""
+
+        app_label = 'inventree_approvals'
+        verbose_name = _('Approval Search Document')
+
+    order = models.OneToOneField(
+        'order.PurchaseOrder',
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='approval_search_document',
+        verbose_name=_('Purchase Order'),
+    )
+
+    reference = models.TextField(
+        verbose_name=_('Reference'),
+        blank=True,
+        default='',
+    )
+
+    supplier = models.TextField(
+        verbose_name=_('Supplier'),
+        help_text=_('Supplier name'),
+        blank=True,
+        default='',
+    )
+
+    description = models.TextField(
+        verbose_name=_('Description'),
+        blank=True,
+        default='',
+    )
+
+    people = models.TextField(
+        verbose_name=_('People'),
+        help_text=_('Names of the requesters and approvers'),
+        blank=True,
+        default='',
+    )
+
+    notes = models.TextField(
+        verbose_name=_('Notes'),
+        help_text=_('Approval request and decision notes'),
+        blank=True,
+        default='',
+    )
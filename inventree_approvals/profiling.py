@@ -0,0 +1,298 @@
+"""Opt-in request profiling for the PO Approvals plugin.
+
+With the ENABLE_PROFILING setting on, plugin API requests are profiled in
+two ways:
+
+- A random sample of requests (PROFILING_SAMPLE_RATE percent) runs under
+  cProfile, which records every function call.
+- Any request still running after PROFILING_SLOW_THRESHOLD milliseconds is
+  sampled by a background thread, which periodically records the stack of
+  the request thread. Requests which finish in time cost a dictionary
+  insert and delete, so slow outliers can be caught in production.
+
+The top functions by cumulative time are stored, together with the
+endpoint and its parameters, in a bounded ring buffer in the Django cache,
+which staff users can download from the profiles endpoint. Each profile has
+its own cache key, picked by a shared counter, so that workers storing
+profiles at the same time do not overwrite each other. Query parameters
+other than the known filter and paging parameters (e.g. search text) are
+redacted.
+
+When profiling is disabled, a request costs a single setting lookup.
+"""
+
+import cProfile
+import pstats
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime
+
+import structlog
+
+logger = structlog.get_logger('inventree')
+
+# Number of functions stored per profile
+PROFILE_TOP_N = 30
+
+# Number of profiles kept in the ring buffer
+PROFILE_BUFFER_SIZE = 50
+
+# How long a profile is kept after it is added (seconds)
+PROFILE_TTL = 7 * 86400
+
+# Query parameters stored as given, all others are redacted
+PROFILE_PARAMS = (
+    'approver',
+    'decision',
+    'from',
+    'group_by',
+    'is_high_value',
+    'limit',
+    'offset',
+    'ordering',
+    'status',
+    'supplier',
+    'to',
+)
+
+REDACTED = '<redacted>'
+
+# Interval between stack samples of a slow request (seconds)
+SAMPLE_INTERVAL = 0.01
+
+# Maximum stack depth recorded per sample
+MAX_STACK_DEPTH = 100
+
+CACHE_PREFIX = 'po_approvals:profiles'
+
+COUNTER_KEY = CACHE_PREFIX + ':counter'
+
+PROFILE_KEY = CACHE_PREFIX + ':{slot}'
+
+# cProfile can only be active in one thread at a time
+_cprofile_lock = threading.Lock()
+
+
+def _function_label(code):
+    """Format a code object as file:line(function)."""
+    return f'{code.co_filename}:{code.co_firstlineno}({code.co_name})'
+
+
+class SlowRequestSampler:
+    """Background thread which samples the stacks of requests exceeding their deadline."""
+
+    def __init__(self):
+        """Create the sampler; the thread is started on first use."""
+        self.lock = threading.Lock()
+        self.active = {}
+        self.wakeup = threading.Event()
+        self.thread = None
+
+    def watch(self, threshold):
+        """Start watching the current thread, sampling it once the threshold (seconds) has passed."""
+        entry = {
+            'deadline': time.monotonic() + threshold,
+            'samples': 0,
+            'self': Counter(),
+            'cumulative': Counter(),
+        }
+
+        with self.lock:
+            self.active[threading.get_ident()] = entry
+
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self.run, name='po-approvals-sampler', daemon=True)
+                self.thread.start()
+
+        self.wakeup.set()
+
+        return entry
+
+    def unwatch(self):
+        """Stop watching the current thread, and return its samples."""
+        with self.lock:
+            return self.active.pop(threading.get_ident(), None)
+
+    def run(self):
+        """Sample the watched threads until the process exits."""
+        sampler_id = threading.get_ident()
+
+        while True:
+            with self.lock:
+                idle = not self.active
+
+            if idle:
+                self.wakeup.wait()
+                self.wakeup.clear()
+                continue
+
+            time.sleep(SAMPLE_INTERVAL)
+            now = time.monotonic()
+
+            with self.lock:
+                due = [(ident, entry) for ident, entry in self.active.items() if now >= entry['deadline']]
+
+            if not due:
+                continue
+
+            frames = sys._current_frames()
+
+            for ident, entry in due:
+                frame = frames.get(ident)
+
+                if frame is None or ident == sampler_id:
+                    continue
+
+                labels = []
+                while frame is not None and len(labels) < MAX_STACK_DEPTH:
+                    labels.append(_function_label(frame.f_code))
+                    frame = frame.f_back
+
+                with self.lock:
+                    # The request may have finished while its stack was being walked
+                    if self.active.get(ident) is not entry:
+                        continue
+
+                    entry['samples'] += 1
+                    entry['self'][labels[0]] += 1
+                    entry['cumulative'].update(set(labels))
+
+
+sampler = SlowRequestSampler()
+
+
+def get_cprofile_stats(profiler):
+    """Get the top functions by cumulative time from a cProfile run."""
+    stats = pstats.Stats(profiler).stats
+
+    top = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)[:PROFILE_TOP_N]
+
+    return [
+        {
+            'function': f'{filename}:{line}({name})',
+            'calls': calls,
+            'self_ms': round(total * 1000, 3),
+            'cumulative_ms': round(cumulative * 1000, 3),
+        }
+        for (filename, line, name), (_, calls, total, cumulative, _) in top
+    ]
+
+
+def get_sampler_stats(entry):
+    """Get the top functions by cumulative time from the stack samples of a request."""
+    return [
+        {
+            'function': label,
+            'calls': None,
+            'self_ms': round(entry['self'][label] * SAMPLE_INTERVAL * 1000, 3),
+            'cumulative_ms': round(count * SAMPLE_INTERVAL * 1000, 3),
+        }
+        for label, count in entry['cumulative'].most_common(PROFILE_TOP_N)
+    ]
+
+
+def store_profile(view, request, response, duration, trigger, profiler, stats):
+    """Add a profile to the ring buffer in the shared cache."""
+    from django.core.cache import cache
+
+    from .instrumentation import get_log_path
+
+    profile = {
+        'id': uuid.uuid4().hex,
+        'timestamp': datetime.now().isoformat(),
+        'view': type(view).__name__,
+        'method': request.method,
+        'path': get_log_path(request),
+        'params': {key: value if key in PROFILE_PARAMS else REDACTED for key, value in request.GET.items()},
+        'user': request.user.username,
+        'status_code': response.status_code,
+        'duration_ms': round(duration * 1000, 2),
+        'trigger': trigger,
+        'profiler': profiler,
+        'stats': stats,
+    }
+
+    logger.info(
+        'Approvals API request profiled',
+        view=profile['view'],
+        path=profile['path'],
+        duration_ms=profile['duration_ms'],
+        trigger=trigger,
+    )
+
+    try:
+        cache.add(COUNTER_KEY, 0, None)
+        slot = cache.incr(COUNTER_KEY) % PROFILE_BUFFER_SIZE
+        cache.set(PROFILE_KEY.format(slot=slot), profile, PROFILE_TTL)
+    except Exception:
+        # Profiling must never break the request path
+        logger.exception('Failed to store approvals API profile')
+
+
+def get_profiles():
+    """Get the stored profiles, oldest first."""
+    from django.core.cache import cache
+
+    profiles = cache.get_many([PROFILE_KEY.format(slot=slot) for slot in range(PROFILE_BUFFER_SIZE)]).values()
+
+    return sorted(profiles, key=lambda profile: profile['timestamp'])
+
+
+def clear_profiles():
+    """Remove all stored profiles."""
+    from django.core.cache import cache
+
+    cache.delete_many([COUNTER_KEY, *(PROFILE_KEY.format(slot=slot) for slot in range(PROFILE_BUFFER_SIZE))])
+
+
+def profile_view(plugin, view, request, call):
+    """Run a view method, profiling it if selected by the plugin settings.
+
+    Args:
+        plugin: The approvals plugin instance (or None)
+        view: The APIView instance
+        request: The request being processed
+        call: Callable which runs the view method and returns the response
+    """
+    if not plugin or not plugin.get_setting('ENABLE_PROFILING'):
+        return call()
+
+    try:
+        sample_rate = float(plugin.get_setting('PROFILING_SAMPLE_RATE') or 0)
+        threshold = float(plugin.get_setting('PROFILING_SLOW_THRESHOLD') or 0) / 1000
+    except (TypeError, ValueError):
+        sample_rate, threshold = 0, 0
+
+    if sample_rate > 0 and random.random() * 100 < sample_rate and _cprofile_lock.acquire(blocking=False):
+        try:
+            profiler = cProfile.Profile()
+            start = time.perf_counter()
+            response = profiler.runcall(call)
+            duration = time.perf_counter() - start
+        finally:
+            _cprofile_lock.release()
+
+        store_profile(view, request, response, duration, 'sampled', 'cprofile', get_cprofile_stats(profiler))
+        return response
+
+    if threshold <= 0:
+        return call()
+
+    start = time.perf_counter()
+    sampler.watch(threshold)
+
+    try:
+        response = call()
+    finally:
+        entry = sampler.unwatch()
+
+    duration = time.perf_counter() - start
+
+    if duration >= threshold and entry and entry['samples']:
+        store_profile(view, request, response, duration, 'slow', 'stack_sampler', get_sampler_stats(entry))
+
+    return response
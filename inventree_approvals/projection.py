@@ -0,0 +1,182 @@
+"""Field projection for the PO Approvals plugin list endpoints.
+
+List endpoints accept a fields= parameter (comma-separated) which limits
+the returned fields. Each field declares the work it needs - the model
+columns to load, the relations to join, and any annotations - so that the
+queryset only loads, joins and computes what the requested fields use.
+
+Each field spec is a dict with:
+    only: Model columns to load (relation paths are allowed)
+    related: Relations to join with select_related
+    annotate: Dict of annotations to add to the queryset
+    get: Function of (order, plugin) returning the field value
+"""
+
+from django.db.models import Count, F, Q
+
+from . import helpers
+
+
+def _pending_value(key):
+    """Getter for a value of the pending approval entry of an order."""
+
+    def get(order, plugin):
+        pending = helpers.get_pending_approval(order)
+        return pending.get(key) if pending else None
+
+    return get
+
+
+PO_LIST_FIELDS = {
+    'pk': {'get': lambda order, plugin: order.pk},
+    'reference': {'only': ['reference'], 'get': lambda order, plugin: order.reference},
+    'description': {'only': ['description'], 'get': lambda order, plugin: order.description},
+    'status': {'only': ['status'], 'get': lambda order, plugin: order.status},
+    'status_custom_key': {
+        'only': ['status', 'status_custom_key'],
+        'get': lambda order, plugin: getattr(order, 'status_custom_key', order.status),
+    },
+    'supplier': {'only': ['supplier'], 'get': lambda order, plugin: order.supplier_id},
+    'supplier_detail': {
+        'only': ['supplier__name', 'supplier__image'],
+        'related': ['supplier'],
+        'get': lambda order, plugin: {
+            'pk': order.supplier.pk,
+            'name': order.supplier.name,
+            'image': order.supplier.image.url if order.supplier.image else None,
+        } if order.supplier else None,
+    },
+    'supplier_reference': {
+        'only': ['supplier_reference'],
+        'get': lambda order, plugin: order.supplier_reference,
+    },
+    'line_items': {
+        'annotate': {'projected_line_count': Count('lines')},
+        'get': lambda order, plugin: order.projected_line_count,
+    },
+    'completed_lines': {
+        'annotate': {
+            'projected_completed_count': Count('lines', filter=Q(lines__received__gte=F('lines__quantity'))),
+        },
+        'get': lambda order, plugin: order.projected_completed_count,
+    },
+    'total_price': {
+        'only': ['total_price', 'total_price_currency'],
+        'get': lambda order, plugin: str(order.total_price) if order.total_price else None,
+    },
+    'order_currency': {'only': ['order_currency'], 'get': lambda order, plugin: order.order_currency},
+    'target_date': {
+        'only': ['target_date'],
+        'get': lambda order, plugin: order.target_date.isoformat() if order.target_date else None,
+    },
+    'creation_date': {
+        'only': ['creation_date'],
+        'get': lambda order, plugin: order.creation_date.isoformat() if order.creation_date else None,
+    },
+    'complete_date': {
+        'only': ['complete_date'],
+        'get': lambda order, plugin: order.complete_date.isoformat() if order.complete_date else None,
+    },
+    'responsible_detail': {
+        'related': ['responsible'],
+        'get': lambda order, plugin: {
+            'pk': order.responsible.pk,
+            'name': str(order.responsible),
+        } if order.responsible else None,
+    },
+    'project_code_detail': {
+        'only': ['project_code__code'],
+        'related': ['project_code'],
+        'get': lambda order, plugin: {
+            'pk': order.project_code.pk,
+            'code': order.project_code.code,
+        } if order.project_code else None,
+    },
+    'approval_status': {
+        'only': ['metadata'],
+        'get': lambda order, plugin: helpers.get_approval_state(order).get('status', 'none'),
+    },
+}
+
+PENDING_FIELDS = {
+    'order_id': {'get': lambda order, plugin: order.pk},
+    'order_reference': {'only': ['reference'], 'get': lambda order, plugin: order.reference},
+    'order_total': {
+        'only': ['total_price', 'total_price_currency'],
+        'get': lambda order, plugin: str(order.total_price) if order.total_price else None,
+    },
+    'supplier': {
+        'only': ['supplier__name'],
+        'related': ['supplier'],
+        'get': lambda order, plugin: order.supplier.name if order.supplier else None,
+    },
+    'approval_level': {'get': _pending_value('level')},
+    'requested_by': {'get': _pending_value('requested_by_name')},
+    'requested_at': {'get': _pending_value('requested_at')},
+    'is_high_value': {
+        'only': ['total_price', 'total_price_currency'],
+        'get': lambda order, plugin: plugin.is_high_value_order(order),
+    },
+    'url': {'get': lambda order, plugin: f'/web/purchasing/purchase-order/{order.pk}/po-approvals-panel'},
+}
+
+
+def parse_fields(request, specs):
+    """Get the fields requested with the fields= query parameter.
+
+    Returns:
+        List of field names, in the order of the specs (all fields if none were requested)
+
+    Raises:
+        ValueError: If an unknown field was requested
+    """
+    value = request.query_params.get('fields', '')
+    requested = {field.strip() for field in value.split(',') if field.strip()}
+
+    if not requested:
+        return list(specs)
+
+    unknown = requested.difference(specs)
+
+    if unknown:
+        raise ValueError(f'Unknown fields: {", ".join(sorted(unknown))}')
+
+    return [field for field in specs if field in requested]
+
+
+def project_queryset(queryset, specs, fields, required=()):
+    """Limit a queryset to the columns, joins and annotations the fields need.
+
+    Args:
+        queryset: The queryset to limit
+        specs: The field specs
+        fields: The requested field names
+        required: Columns needed regardless of the fields (e.g. for filtering in Python)
+    """
+    only = {'pk', *required}
+    related = set()
+    annotations = {}
+
+    for field in fields:
+        spec = specs[field]
+        only.update(spec.get('only', []))
+        related.update(spec.get('related', []))
+        annotations.update(spec.get('annotate', {}))
+
+    # Relations which are joined must also be loaded
+    only.update(related)
+
+    queryset = queryset.only(*sorted(only))
+
+    if related:
+        queryset = queryset.select_related(*sorted(related))
+
+    if annotations:
+        queryset = queryset.annotate(**annotations)
+
+    return queryset
+
+
+def project(order, specs, fields, plugin):
+    """Build the output dict of an order, with only the requested fields."""
+    return {field: specs[field]['get'](order, plugin) for field in fields}
@@ -0,0 +1,120 @@
+"""Compact response format for the PO Approvals plugin list endpoints.
+
+List endpoints return {'count': N, 'results': [row, ...]}, where each row
+repeats nested detail objects (supplier, responsible owner, project code).
+The compact format, selected with ?format=compact or an Accept header of
+COMPACT_MEDIA_TYPE, returns the same data as columns and rows, with each
+distinct detail object stored once in a lookup table:
+
+    {
+        "count": 2,
+        "columns": ["pk", "reference", "supplier", ...],
+        "rows": [[1, "PO-0001", 7, ...], [2, "PO-0002", 7, ...]],
+        "lookups": {"supplier": {"7": {"pk": 7, "name": "ACME", ...}}}
+    }
+
+Detail columns are replaced by the primary key of the object, in a column
+without the _detail suffix. The response is encoded with orjson if it is
+installed, and gzip compressed if the client accepts it.
+"""
+
+import gzip
+import json
+
+from django.utils.cache import patch_vary_headers
+
+from rest_framework.renderers import BaseRenderer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+COMPACT_MEDIA_TYPE = 'application/vnd.inventree-approvals.compact+json'
+
+# Nested detail objects which are moved into lookup tables
+DETAIL_SUFFIX = '_detail'
+
+# Responses smaller than this are not worth compressing (bytes)
+COMPRESS_MIN_SIZE = 1024
+
+
+def encode_json(data):
+    """Encode data as compact JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(data, default=str)
+
+    return json.dumps(data, separators=(',', ':'), default=str).encode()
+
+
+def to_columnar(data):
+    """Convert a {'count', 'results'} list response to the compact columnar layout."""
+    if not isinstance(data, dict) or not isinstance(data.get('results'), list):
+        return data
+
+    results = data['results']
+
+    columns = []
+    for row in results[:1]:
+        columns = list(row.keys())
+
+    detail_columns = [column for column in columns if column.endswith(DETAIL_SUFFIX)]
+    lookups = {column[:-len(DETAIL_SUFFIX)]: {} for column in detail_columns}
+
+    # Detail objects become references, in a new column unless the row already has one
+    plain_columns = [column for column in columns if column not in detail_columns]
+    reference_columns = [column for column in detail_columns if column[:-len(DETAIL_SUFFIX)] not in plain_columns]
+
+    rows = []
+
+    for row in results:
+        for column in detail_columns:
+            detail = row.get(column)
+
+            if isinstance(detail, dict) and 'pk' in detail:
+                lookups[column[:-len(DETAIL_SUFFIX)]].setdefault(str(detail['pk']), detail)
+
+        rows.append(
+            [row.get(column) for column in plain_columns]
+            + [(row.get(column) or {}).get('pk') for column in reference_columns]
+        )
+
+    output_columns = plain_columns + [column[:-len(DETAIL_SUFFIX)] for column in reference_columns]
+
+    compact = {key: value for key, value in data.items() if key != 'results'}
+    compact.update({'columns': output_columns, 'rows': rows, 'lookups': lookups})
+
+    return compact
+
+
+class CompactJSONRenderer(BaseRenderer):
+    """Renderer for the compact columnar format."""
+
+    media_type = COMPACT_MEDIA_TYPE
+    format = 'compact'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """Render the response data as compact columnar JSON."""
+        if data is None:
+            return b''
+
+        content = encode_json(to_columnar(data))
+
+        renderer_context = renderer_context or {}
+        request = renderer_context.get('request')
+        response = renderer_context.get('response')
+
+        if response is not None:
+            patch_vary_headers(response, ['Accept', 'Accept-Encoding'])
+
+        if (
+            request is not None
+            and response is not None
+            and len(content) >= COMPRESS_MIN_SIZE
+            and 'gzip' in request.headers.get('Accept-Encoding', '')
+        ):
+            content = gzip.compress(content, compresslevel=5)
+            response['Content-Encoding'] = 'gzip'
+
+        return content
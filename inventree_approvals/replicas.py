@@ -0,0 +1,139 @@
+"""Read-replica routing for the read-only PO Approvals endpoints.
+
+When the READ_REPLICA_DATABASE setting names a database alias (configured
+in the InvenTree DATABASES setting, e.g. a streaming replica of the
+primary), the views decorated with @read_replica run their queries on it:
+
+    DATABASES = {
+        'default': {...},
+        'replica': {..., 'HOST': 'db-replica.example.com'},
+    }
+
+A replica lags behind the primary, so a user who has just requested,
+approved or rejected an approval would not see the change. Every write
+marks the user as sticky (stick_to_primary), and the reads of a sticky user
+stay on the primary for READ_REPLICA_STICKY_SECONDS.
+
+Routing is done by ReplicaRouter, which is inserted ahead of the configured
+database routers on the first decorated request. It only has an opinion
+while a decorated view is running, so the rest of InvenTree is unaffected.
+Writes made while a view is reading from the replica go to the primary.
+
+The sticky markers are kept in the Django cache, which is the local-memory
+cache unless InvenTree has been configured with a shared cache; with the
+local-memory cache, a user is only sticky in the server process which
+handled their write.
+"""
+
+import contextvars
+import functools
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import DEFAULT_DB_ALIAS
+
+import structlog
+
+logger = structlog.get_logger('inventree')
+
+STICKY_KEY = 'po_approvals:replica:sticky:{user}'
+
+# Database alias the current view reads from (None outside @read_replica views)
+_read_alias = contextvars.ContextVar('po_approvals_read_alias', default=None)
+
+
+def validate_alias(value):
+    """Validator for the READ_REPLICA_DATABASE setting."""
+    from django.conf import settings
+
+    if value and value not in settings.DATABASES:
+        raise ValidationError(f'Database alias "{value}" is not configured in DATABASES')
+
+
+class ReplicaRouter:
+    """Database router which sends the reads of @read_replica views to the replica."""
+
+    def db_for_read(self, model, **hints):
+        """Read from the replica while a decorated view is running."""
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        """Write to the primary, including instances which were read from the replica."""
+        return DEFAULT_DB_ALIAS if _read_alias.get() else None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        """Instances read from the replica can be related to those of the primary."""
+        alias = _read_alias.get()
+
+        if alias and {obj1._state.db, obj2._state.db} <= {DEFAULT_DB_ALIAS, alias}:
+            return True
+
+        return None
+
+
+def install_router():
+    """Insert the ReplicaRouter ahead of the configured routers, once per process."""
+    from django.db import router
+
+    if not any(isinstance(r, ReplicaRouter) for r in router.routers):
+        router.routers.insert(0, ReplicaRouter())
+
+
+def stick_to_primary(user, plugin):
+    """Keep the reads of a user on the primary, after they have written."""
+    if not user or not user.pk or not plugin.get_setting('READ_REPLICA_DATABASE'):
+        return
+
+    seconds = int(plugin.get_setting('READ_REPLICA_STICKY_SECONDS') or 0)
+
+    if seconds > 0:
+        cache.set(STICKY_KEY.format(user=user.pk), True, seconds)
+
+
+def get_read_alias(request, plugin):
+    """Get the database alias the reads of a request should use.
+
+    Returns:
+        The replica alias, or None to use the primary
+    """
+    from django.conf import settings
+
+    alias = plugin.get_setting('READ_REPLICA_DATABASE') if plugin else ''
+
+    if not alias or alias == DEFAULT_DB_ALIAS:
+        return None
+
+    # The setting was valid when saved, but the database configuration may have changed
+    if alias not in settings.DATABASES:
+        logger.warning('Read replica database is not configured', alias=alias)
+        return None
+
+    user = getattr(request, 'user', None)
+
+    if user and user.pk and cache.get(STICKY_KEY.format(user=user.pk)):
+        return None
+
+    return alias
+
+
+def read_replica(view_method):
+    """Decorator which runs the queries of an APIView method on the read replica, if configured."""
+
+    @functools.wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        from plugin import registry
+
+        alias = get_read_alias(request, registry.get_plugin('approvals'))
+
+        if alias is None:
+            return view_method(self, request, *args, **kwargs)
+
+        install_router()
+        token = _read_alias.set(alias)
+
+        try:
+            return view_method(self, request, *args, **kwargs)
+        finally:
+            _read_alias.reset(token)
+
+    return wrapper
@@ -0,0 +1,345 @@
+"""Auto-approval rules for the PO Approvals plugin.
+
+Rules are configured as a JSON list in the AUTO_APPROVAL_RULES setting:
+
+    [
+        {"name": "Small orders", "max_total": "250"},
+        {"name": "Trusted supplier", "suppliers": [4, 7], "max_total": "2000"},
+        {"name": "Lab consumables", "categories": [12], "requester_groups": ["Lab"]},
+        {"name": "Repeat orders", "repeat_of_approved": true, "max_total": "5000"}
+    ]
+
+All conditions of a rule must match, and the first matching rule wins.
+Orders which need more than one approval (REQUIRED_APPROVALS, or
+HIGH_VALUE_REQUIRED_APPROVALS for high-value orders) are never
+auto-approved, as a rule would otherwise clear the whole quorum. Nor are
+high-value orders, which need a senior approver, unless a rule sets
+"high_value": true. The total bounds are compared in the rule's
+"currency" (the InvenTree default currency if not set), and orders in
+other currencies do not match them. Each rule is compiled into a queryset
+filter, so that matching a single order or sweeping every pending order is
+done in one query.
+"""
+
+import json
+from decimal import Decimal, InvalidOperation
+
+from django.core.exceptions import ValidationError
+from django.db.models import Case, Exists, IntegerField, OuterRef, Q, Value, When
+
+import structlog
+
+from . import helpers
+
+logger = structlog.get_logger('inventree')
+
+# Conditions which can be used in a rule
+RULE_CONDITIONS = (
+    'suppliers',
+    'min_total',
+    'max_total',
+    'project_codes',
+    'categories',
+    'requester_groups',
+    'repeat_of_approved',
+)
+
+# Options which change how a rule matches, but do not restrict it on their own
+RULE_OPTIONS = (
+    'currency',
+    'high_value',
+)
+
+
+def parse_rules(value):
+    """Parse and validate the auto-approval rules.
+
+    Args:
+        value: JSON string from the AUTO_APPROVAL_RULES setting
+
+    Returns:
+        List of rule dicts, each with a 'name'
+
+    Raises:
+        ValidationError: If the rules are malformed
+    """
+    if not value:
+        return []
+
+    try:
+        rules = json.loads(value)
+    except ValueError as e:
+        raise ValidationError(f'Invalid JSON: {e}')
+
+    if not isinstance(rules, list):
+        raise ValidationError('Auto-approval rules must be a JSON list')
+
+    for index, rule in enumerate(rules):
+        if not isinstance(rule, dict):
+            raise ValidationError(f'Rule {index + 1} must be a JSON object')
+
+        rule.setdefault('name', f'Rule {index + 1}')
+
+        unknown = set(rule) - set(RULE_CONDITIONS) - set(RULE_OPTIONS) - {'name'}
+        if unknown:
+            raise ValidationError(
+                f"Rule '{rule['name']}' has unknown conditions: {', '.join(sorted(unknown))}"
+            )
+
+        # A rule without conditions would approve every order
+        if not any(key in rule for key in RULE_CONDITIONS):
+            raise ValidationError(f"Rule '{rule['name']}' has no conditions")
+
+        for key in ('min_total', 'max_total'):
+            if key in rule:
+                try:
+                    Decimal(str(rule[key]))
+                except InvalidOperation:
+                    raise ValidationError(f"Rule '{rule['name']}': {key} must be a number")
+
+        for key in ('suppliers', 'project_codes', 'categories', 'requester_groups'):
+            if key in rule and not isinstance(rule[key], list):
+                raise ValidationError(f"Rule '{rule['name']}': {key} must be a list")
+
+        # false would be a condition which matches every order
+        if 'repeat_of_approved' in rule and rule['repeat_of_approved'] is not True:
+            raise ValidationError(f"Rule '{rule['name']}': repeat_of_approved can only be true")
+
+        if 'high_value' in rule and not isinstance(rule['high_value'], bool):
+            raise ValidationError(f"Rule '{rule['name']}': high_value must be true or false")
+
+        if 'currency' in rule and not (isinstance(rule['currency'], str) and rule['currency'].strip()):
+            raise ValidationError(f"Rule '{rule['name']}': currency must be a currency code")
+
+    return rules
+
+
+def validate_rules(value):
+    """Validator for the AUTO_APPROVAL_RULES setting."""
+    parse_rules(value)
+
+
+def compile_rule(rule, high_value_threshold=None):
+    """Compile a single rule into a filter against PurchaseOrder.
+
+    Args:
+        rule: The rule dict
+        high_value_threshold: Orders with a total of at least this amount are
+            only matched by rules with "high_value": true (None to match all)
+
+    Returns:
+        Q object matching the orders covered by the rule
+    """
+    from django.contrib.auth import get_user_model
+
+    from common.currency import currency_code_default
+    from order.models import PurchaseOrder, PurchaseOrderLineItem
+
+    # The number of approvals required is stored when approval is requested
+    # (orders requested before it was stored needed one)
+    required = f'metadata__{helpers.METADATA_KEY}__state__required'
+    query = Q(**{required: 1}) | Q(**{f'{required}__isnull': True})
+
+    # High-value orders need a senior approver (see is_high_value_order)
+    if high_value_threshold is not None and not rule.get('high_value'):
+        query &= Q(total_price__isnull=True) | Q(total_price__lt=high_value_threshold)
+
+    if 'suppliers' in rule:
+        query &= Q(supplier_id__in=rule['suppliers'])
+
+    if 'min_total' in rule or 'max_total' in rule:
+        # The bounds are amounts in one currency, so orders in others cannot be compared
+        query &= Q(total_price_currency=(rule.get('currency') or currency_code_default()).strip().upper())
+
+    if 'min_total' in rule:
+        query &= Q(total_price__gte=Decimal(str(rule['min_total'])))
+
+    if 'max_total' in rule:
+        query &= Q(total_price__lte=Decimal(str(rule['max_total'])))
+
+    if 'project_codes' in rule:
+        query &= Q(project_code__code__in=rule['project_codes'])
+
+    if 'categories' in rule:
+        # Every line item must belong to one of the listed categories
+        lines = PurchaseOrderLineItem.objects.filter(order=OuterRef('pk'))
+        query &= Q(Exists(lines)) & ~Q(
+            Exists(lines.exclude(part__part__category_id__in=rule['categories']))
+        )
+
+    if 'requester_groups' in rule:
+        requester_ids = get_user_model().objects.filter(
+            groups__name__in=rule['requester_groups']
+        ).values_list('pk', flat=True)
+
+        query &= Q(**{
+            f'metadata__{helpers.METADATA_KEY}__state__requested_by_id__in': list(requester_ids),
+        })
+
+    if rule.get('repeat_of_approved'):
+        # Another approved order has the fingerprint which the order had when
+        # approval was requested. The fingerprint covers the supplier and
+        # currency, so only orders of the same supplier can match.
+        state = f'metadata__{helpers.METADATA_KEY}__state'
+        approved = PurchaseOrder.objects.filter(
+            supplier_id=OuterRef('supplier_id'),
+            **{
+                f'{state}__status': 'approved',
+                f'{state}__fingerprint': OuterRef(f'{state}__request_fingerprint'),
+            },
+        ).exclude(pk=OuterRef('pk'))
+
+        query &= Q(Exists(approved))
+
+    return query
+
+
+def compile_rules(rules, high_value_threshold=None):
+    """Compile the rules into a single expression.
+
+    The expression evaluates to the index of the first matching rule,
+    or NULL if no rule matches.
+
+    Args:
+        rules: List of rule dicts
+        high_value_threshold: See compile_rule
+
+    Returns:
+        Case expression, or None if there are no rules
+    """
+    if not rules:
+        return None
+
+    return Case(
+        *[When(compile_rule(rule, high_value_threshold), then=Value(index)) for index, rule in enumerate(rules)],
+        default=Value(None),
+        output_field=IntegerField(),
+    )
+
+
+def match_order(order, rules, high_value_threshold=None):
+    """Find the first auto-approval rule which matches an order.
+
+    Args:
+        order: The PurchaseOrder instance
+        rules: List of rule dicts
+        high_value_threshold: See compile_rule
+
+    Returns:
+        The matching rule dict, or None
+    """
+    from order.models import PurchaseOrder
+
+    expression = compile_rules(rules, high_value_threshold)
+    if expression is None:
+        return None
+
+    index = PurchaseOrder.objects.filter(pk=order.pk).annotate(
+        auto_rule=expression
+    ).values_list('auto_rule', flat=True).first()
+
+    return rules[index] if index is not None else None
+
+
+def sweep_pending_orders(plugin, batch_size=500):
+    """Auto-approve all pending orders which match an auto-approval rule.
+
+    The matching orders are found in a single query, then approved in
+    batches. Each batch is locked and matched again before it is written
+    back with bulk updates, so that an approval, rejection or new request
+    recorded since the first query is not overwritten. The number of
+    queries does not grow with the number of pending orders.
+
+    Args:
+        plugin: The plugin instance
+        batch_size: Number of orders to write per update query
+
+    Returns:
+        Number of orders which were auto-approved
+    """
+    from django.db import transaction
+
+    from order.models import PurchaseOrder
+    from order.status_codes import PurchaseOrderStatus
+
+    from . import analytics, approval_index, metrics, search, webhooks
+
+    rules = plugin.get_auto_approval_rules()
+    expression = compile_rules(rules, plugin.get_high_value_threshold())
+
+    if expression is None:
+        return 0
+
+    def matching_orders():
+        """Pending orders annotated with the index of their first matching rule."""
+        return PurchaseOrder.objects.filter(
+            status=PurchaseOrderStatus.PENDING.value,
+            **{f'metadata__{helpers.METADATA_KEY}__state__status': 'pending'},
+        ).annotate(
+            auto_rule=expression
+        ).filter(
+            auto_rule__isnull=False
+        )
+
+    approved_key = plugin.get_custom_state_key('APPROVED')
+    update_fields = ['metadata'] if approved_key is None else ['metadata', 'status_custom_key']
+
+    def approve_batch(pks):
+        """Lock, match again and approve a batch of orders, with their fingerprints read in one query."""
+        with transaction.atomic():
+            batch = list(
+                matching_orders().filter(pk__in=pks).select_for_update().only(
+                    'pk', 'reference', 'metadata', 'status_custom_key', 'supplier', 'order_currency'
+                )
+            )
+
+            if not batch:
+                return 0
+
+            fingerprints = helpers.compute_order_fingerprints(batch)
+
+            # A repeat order must not have changed since approval was requested
+            batch = [
+                order for order in batch
+                if not rules[order.auto_rule].get('repeat_of_approved')
+                or fingerprints[order.pk]['fingerprint'] == helpers.get_approval_state(order).get('request_fingerprint')
+            ]
+            decisions = []
+
+            for order in batch:
+                data = helpers.get_approval_data(order)
+                approval = helpers.apply_auto_approval(
+                    data, rules[order.auto_rule]['name'], fingerprints[order.pk]
+                )
+                metrics.record_decision('auto_approved', approval)
+                decisions.append((order, approval))
+                helpers.set_approval_data(order, data, commit=False)
+
+                if approved_key is not None:
+                    order.status_custom_key = approved_key
+
+            if not batch:
+                return 0
+
+            PurchaseOrder.objects.bulk_update(batch, update_fields)
+            approval_index.sync_orders(batch)
+            search.index_orders(batch)
+            analytics.record_decisions(decisions)
+
+            # Delivered once the batch is committed
+            for order, approval in decisions:
+                webhooks.publish(
+                    plugin, 'approval.auto_approved', order, approval=approval, rule=approval.get('auto_rule')
+                )
+
+        return len(batch)
+
+    pks = list(matching_orders().values_list('pk', flat=True))
+    count = 0
+
+    for start in range(0, len(pks), batch_size):
+        count += approve_batch(pks[start:start + batch_size])
+
+    logger.info('Auto-approval sweep complete', approved=count)
+
+    return count
@@ -0,0 +1,290 @@
+"""Full-text search over purchase orders and their approvals.
+
+The ApprovalSearchDocument table holds the searchable text of each order:
+its reference, supplier name and description, the names of everyone who
+requested or decided an approval, and the approval notes. Documents are
+written whenever the approval data of an order is saved, and rebuilt by a
+nightly task (which also picks up edits to the order itself).
+
+The full-text index depends on the database backend (see migration 0003):
+
+- PostgreSQL: a generated, weighted tsvector column with a GIN index,
+  queried with websearch_to_tsquery() and ranked with ts_rank()
+- SQLite: an FTS5 table kept in sync by triggers, queried with prefix
+  terms and ranked with bm25()
+- Other backends (or SQLite without FTS5): every search term is matched
+  with icontains, newest orders first, without ranking
+
+Reference and supplier matches rank above description matches, which rank
+above names and notes.
+"""
+
+import re
+
+import structlog
+
+logger = structlog.get_logger('inventree')
+
+DOCUMENT_TABLE = 'inventree_approvals_approvalsearchdocument'
+FTS_TABLE = 'inventree_approvals_search_fts'
+
+# Text search configuration of the PostgreSQL index (must match migration 0003)
+PG_CONFIG = 'english'
+
+# bm25() weights of the FTS5 columns: reference, supplier, description, people, notes
+FTS_WEIGHTS = (10.0, 5.0, 2.0, 1.0, 1.0)
+
+DOCUMENT_FIELDS = ('reference', 'supplier', 'description', 'people', 'notes')
+
+# Approval entry keys holding the names of the people involved
+NAME_KEYS = ('requested_by_name', 'requested_approver_name', 'actual_approver_name', 'on_behalf_of_name')
+
+TERM_PATTERN = re.compile(r'\w+')
+
+# Maximum number of terms of a query
+MAX_TERMS = 16
+
+# Per connection alias: whether the FTS5 table exists
+_fts_tables = {}
+
+
+def search_available():
+    """Check whether the search table is installed (requires app integration)."""
+    from django.apps import apps
+
+    return apps.is_installed('inventree_approvals')
+
+
+def parse_terms(text):
+    """Split a query into its search terms."""
+    return TERM_PATTERN.findall(text or '')[:MAX_TERMS]
+
+
+def build_document(order, fields):
+    """Build the search document of an order.
+
+    Args:
+        order: The PurchaseOrder, with its metadata loaded
+        fields: Dict with the 'reference', 'description' and 'supplier__name' of the order
+
+    Returns:
+        Unsaved ApprovalSearchDocument instance
+    """
+    from . import helpers
+    from .models import ApprovalSearchDocument
+
+    people = []
+    notes = []
+
+    for approval in helpers.get_approvals_list(order):
+        for key in NAME_KEYS:
+            name = approval.get(key)
+            if name and name not in people:
+                people.append(name)
+
+        if approval.get('notes'):
+            notes.append(approval['notes'])
+
+    return ApprovalSearchDocument(
+        order_id=order.pk,
+        reference=fields['reference'] or '',
+        supplier=fields['supplier__name'] or '',
+        description=fields['description'] or '',
+        people='\n'.join(people),
+        notes='\n'.join(notes),
+    )
+
+
+def build_documents(orders):
+    """Build the search documents of the given orders.
+
+    The approval data is read from the given instances; the order fields
+    are read in one query, so that orders loaded with only() do not need a
+    query each.
+
+    Returns:
+        List of unsaved ApprovalSearchDocument instances (none for deleted orders)
+    """
+    from order.models import PurchaseOrder
+
+    fields = {
+        values['pk']: values
+        for values in PurchaseOrder.objects.filter(pk__in=[order.pk for order in orders]).values(
+            'pk', 'reference', 'description', 'supplier__name'
+        )
+    }
+
+    return [build_document(order, fields[order.pk]) for order in orders if order.pk in fields]
+
+
+def write_documents(documents):
+    """Insert or update search documents."""
+    from django.db import transaction
+
+    from .models import ApprovalSearchDocument
+
+    with transaction.atomic():
+        ApprovalSearchDocument.objects.bulk_create(
+            documents,
+            update_conflicts=True,
+            unique_fields=['order'],
+            update_fields=list(DOCUMENT_FIELDS),
+        )
+
+
+def read_documents(order_pks):
+    """Read the stored search fields of the given orders, keyed by order pk."""
+    from .models import ApprovalSearchDocument
+
+    return {
+        values['order_id']: tuple(values[field] for field in DOCUMENT_FIELDS)
+        for values in ApprovalSearchDocument.objects.filter(order_id__in=order_pks).values(
+            'order_id', *DOCUMENT_FIELDS
+        )
+    }
+
+
+def index_orders(orders):
+    """Write the search documents of the given orders."""
+    orders = [order for order in orders if order.pk]
+
+    if not orders or not search_available():
+        return
+
+    try:
+        write_documents(build_documents(orders))
+    except Exception:
+        # The metadata is the source of truth, and the nightly rebuild repairs the index
+        logger.exception('Failed to update the search index')
+
+
+def rebuild_search_index(batch_size=1000):
+    """Rebuild the search document of every purchase order.
+
+    Returns:
+        Number of orders indexed
+    """
+    from order.models import PurchaseOrder
+
+    count = 0
+    batch = []
+
+    for order in PurchaseOrder.objects.only('pk', 'metadata').iterator(chunk_size=batch_size):
+        batch.append(order)
+
+        if len(batch) >= batch_size:
+            index_orders(batch)
+            count += len(batch)
+            batch = []
+
+    if batch:
+        index_orders(batch)
+        count += len(batch)
+
+    logger.info('Search index rebuilt', orders=count)
+
+    return count
+
+
+def fts_available(connection):
+    """Check whether the SQLite FTS5 table exists (SQLite may be built without FTS5)."""
+    if connection.alias not in _fts_tables:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [FTS_TABLE])
+            _fts_tables[connection.alias] = cursor.fetchone() is not None
+
+    return _fts_tables[connection.alias]
+
+
+def search_postgresql(connection, text, limit, offset):
+    """Search the tsvector index of the documents."""
+    where = 'search_vector @@ websearch_to_tsquery(%s, %s)'
+
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT COUNT(*) FROM {DOCUMENT_TABLE} WHERE {where}', [PG_CONFIG, text])
+        count = cursor.fetchone()[0]
+
+        cursor.execute(
+            f'SELECT order_id, ts_rank(search_vector, websearch_to_tsquery(%s, %s)) AS score '
+            f'FROM {DOCUMENT_TABLE} WHERE {where} '
+            f'ORDER BY score DESC, order_id DESC LIMIT %s OFFSET %s',
+            [PG_CONFIG, text, PG_CONFIG, text, limit, offset],
+        )
+        hits = cursor.fetchall()
+
+    return count, hits
+
+
+def search_sqlite(connection, terms, limit, offset):
+    """Search the FTS5 table of the documents."""
+    # Quoted terms cannot be read as FTS5 query syntax; each one matches as a prefix
+    match = ' '.join(f'"{term}"*' for term in terms)
+    weights = ', '.join(str(weight) for weight in FTS_WEIGHTS)
+
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT COUNT(*) FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [match])
+        count = cursor.fetchone()[0]
+
+        # bm25() is lower for better matches
+        cursor.execute(
+            f'SELECT rowid, -bm25({FTS_TABLE}, {weights}) AS score '
+            f'FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s '
+            f'ORDER BY score DESC, rowid DESC LIMIT %s OFFSET %s',
+            [match, limit, offset],
+        )
+        hits = cursor.fetchall()
+
+    return count, hits
+
+
+def search_fallback(terms, limit, offset):
+    """Match every term against any document field, without an index."""
+    from django.db.models import Q
+
+    from .models import ApprovalSearchDocument
+
+    documents = ApprovalSearchDocument.objects.all()
+
+    for term in terms:
+        query = Q()
+        for field in DOCUMENT_FIELDS:
+            query |= Q(**{f'{field}__icontains': term})
+        documents = documents.filter(query)
+
+    count = documents.count()
+    pks = documents.order_by('-order_id').values_list('order_id', flat=True)[offset:offset + limit]
+
+    return count, [(pk, None) for pk in pks]
+
+
+def search_orders(text, limit, offset=0):
+    """Search the purchase orders.
+
+    Args:
+        text: The search query (all terms must match)
+        limit: Maximum number of hits to return
+        offset: Number of hits to skip
+
+    Returns:
+        Tuple of (total number of hits, list of (order pk, rank) tuples, best first).
+        The rank is None when the backend does not rank hits.
+    """
+    from django.db import connections, router
+
+    from .models import ApprovalSearchDocument
+
+    terms = parse_terms(text)
+
+    if not terms:
+        return 0, []
+
+    # Follows the read replica routing (see replicas.py)
+    connection = connections[router.db_for_read(ApprovalSearchDocument)]
+
+    if connection.vendor == 'postgresql':
+        return search_postgresql(connection, text, limit, offset)
+
+    if connection.vendor == 'sqlite' and fts_available(connection):
+        return search_sqlite(connection, terms, limit, offset)
+
+    return search_fallback(terms, limit, offset)
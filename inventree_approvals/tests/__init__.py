@@ -0,0 +1 @@
+"""Tests for the PO Approvals plugin."""
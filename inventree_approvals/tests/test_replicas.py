@@ -0,0 +1,166 @@
+"""Tests for the read-replica routing (replicas.py).
+
+The replica is a second database alias which mirrors the default test
+database (the TEST MIRROR setting), so the tests can check which
+connection each query runs on:
+
+    invoke dev.test --runtest inventree_approvals.tests.test_replicas
+"""
+
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections, router
+from django.test import RequestFactory, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from inventree_approvals import replicas
+
+REPLICA = 'replica'
+
+# The alias must exist before the test databases are set up, which happens after the test modules are imported
+if REPLICA not in settings.DATABASES:
+    settings.DATABASES[REPLICA] = {
+        **settings.DATABASES[DEFAULT_DB_ALIAS],
+        'TEST': {'CHARSET': None, 'COLLATION': None, 'MIGRATE': True, 'MIRROR': DEFAULT_DB_ALIAS, 'NAME': None},
+    }
+
+
+class SettingsPlugin:
+    """Plugin with fixed settings, in place of the registered plugin."""
+
+    def __init__(self, **settings):
+        """Initialize the plugin with the given settings."""
+        self.settings = settings
+
+    def get_setting(self, key, default=None):
+        """Get a setting value."""
+        return self.settings.get(key, default)
+
+
+class ReplicaView:
+    """View with a @read_replica method, recording where its queries go."""
+
+    @replicas.read_replica
+    def get(self, request):
+        """Read content types, and report the database of the read."""
+        with CaptureQueriesContext(connections[REPLICA]) as replica_queries:
+            with CaptureQueriesContext(connections[DEFAULT_DB_ALIAS]) as default_queries:
+                list(ContentType.objects.all())
+
+        return {
+            'read_alias': ContentType.objects.all().db,
+            'replica_queries': len(replica_queries),
+            'default_queries': len(default_queries),
+        }
+
+    @replicas.read_replica
+    def post(self, request):
+        """Change a group read from the replica, and report the databases of the read and the write."""
+        group = Group.objects.get(name='Replica test group')
+        read_alias = group._state.db
+
+        group.name = 'Renamed replica test group'
+
+        with CaptureQueriesContext(connections[REPLICA]) as replica_queries:
+            group.save()
+
+        return {
+            'read_alias': read_alias,
+            'write_alias': router.db_for_write(Group, instance=group),
+            'saved_alias': group._state.db,
+            'replica_queries': len(replica_queries),
+        }
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class ReadReplicaTest(TransactionTestCase):
+    """Tests for the @read_replica decorator and the ReplicaRouter.
+
+    The replica has its own connection, which would not see (and, with
+    SQLite, would be locked out by) the uncommitted writes of a TestCase.
+    """
+
+    databases = {DEFAULT_DB_ALIAS, REPLICA}
+
+    def setUp(self):
+        """Configure the plugin to read from the replica."""
+        cache.clear()
+
+        self.user = get_user_model().objects.create_user(username='replica-user', password='password')
+        Group.objects.create(name='Replica test group')
+        self.plugin = SettingsPlugin(READ_REPLICA_DATABASE=REPLICA, READ_REPLICA_STICKY_SECONDS=15)
+
+        patcher = mock.patch('plugin.registry.get_plugin', return_value=self.plugin)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def request(self):
+        """Build a request by the test user."""
+        request = RequestFactory().get('/plugin/approvals/')
+        request.user = self.user
+        return request
+
+    def test_view_reads_from_replica(self):
+        """Test that the queries of a decorated view run on the replica."""
+        result = ReplicaView().get(self.request())
+
+        self.assertEqual(result['read_alias'], REPLICA)
+        self.assertGreater(result['replica_queries'], 0)
+        self.assertEqual(result['default_queries'], 0)
+
+    def test_view_writes_to_default(self):
+        """Test that writes made by a decorated view go to the primary."""
+        result = ReplicaView().post(self.request())
+
+        self.assertEqual(result['read_alias'], REPLICA)
+        self.assertEqual(result['write_alias'], DEFAULT_DB_ALIAS)
+        self.assertEqual(result['saved_alias'], DEFAULT_DB_ALIAS)
+        self.assertEqual(result['replica_queries'], 0)
+        self.assertTrue(Group.objects.using(DEFAULT_DB_ALIAS).filter(name='Renamed replica test group').exists())
+
+    def test_sticky_user_reads_from_default(self):
+        """Test that a user who has just written reads from the primary."""
+        replicas.stick_to_primary(self.user, self.plugin)
+
+        result = ReplicaView().get(self.request())
+
+        self.assertEqual(result['read_alias'], DEFAULT_DB_ALIAS)
+        self.assertEqual(result['replica_queries'], 0)
+        self.assertGreater(result['default_queries'], 0)
+
+    def test_sticky_user_expires(self):
+        """Test that a sticky time of 0 does not keep the user on the primary."""
+        self.plugin.settings['READ_REPLICA_STICKY_SECONDS'] = 0
+        replicas.stick_to_primary(self.user, self.plugin)
+
+        self.assertEqual(ReplicaView().get(self.request())['read_alias'], REPLICA)
+
+    def test_no_replica_configured(self):
+        """Test that a decorated view reads from the primary without a replica."""
+        self.plugin.settings['READ_REPLICA_DATABASE'] = ''
+
+        result = ReplicaView().get(self.request())
+
+        self.assertEqual(result['read_alias'], DEFAULT_DB_ALIAS)
+        self.assertEqual(result['replica_queries'], 0)
+
+    def test_router_inactive_outside_views(self):
+        """Test that the router has no opinion outside decorated views."""
+        # Installs the router
+        ReplicaView().get(self.request())
+
+        self.assertTrue(any(isinstance(r, replicas.ReplicaRouter) for r in router.routers))
+
+        replica_router = replicas.ReplicaRouter()
+        self.assertIsNone(replica_router.db_for_read(ContentType))
+        self.assertIsNone(replica_router.db_for_write(ContentType))
+        self.assertIsNone(replica_router.allow_relation(self.user, Group()))
+
+        self.assertEqual(router.db_for_read(ContentType), DEFAULT_DB_ALIAS)
+        self.assertEqual(router.db_for_write(ContentType), DEFAULT_DB_ALIAS)
+        self.assertEqual(ContentType.objects.all().db, DEFAULT_DB_ALIAS)
@@ -0,0 +1,220 @@
+"""Throttling and concurrency limits for the expensive PO Approvals endpoints.
+
+The list endpoints (po-list/, pending/, pending-any-approver/, users/ and
+search/) do work proportional to the number of orders or users, so a few
+dashboards refreshing at once could otherwise occupy every server worker.
+Views using ThrottledViewMixin are limited by:
+
+- UserRateThrottle: requests per user (THROTTLE_USER_RATE), shared by all
+  of these endpoints
+- GlobalRateThrottle: requests from all users together (THROTTLE_GLOBAL_RATE)
+- ConcurrencyThrottle: requests in progress at the same time, per endpoint
+  (THROTTLE_CONCURRENCY)
+
+Requests over a limit get a 429 response with a Retry-After header. An
+empty rate, or a concurrency of 0, disables that limit; every limit is
+disabled by default.
+
+The counters are kept in the Django cache, which is the local-memory cache
+unless InvenTree has been configured with a shared cache; with the
+local-memory cache, every limit applies per server process.
+"""
+
+import random
+import uuid
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+
+from rest_framework.throttling import BaseThrottle, SimpleRateThrottle
+
+from . import metrics
+
+# Rate periods, by their first letter (as DRF: "10/s", "60/min", "1000/hour", "5000/day")
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+CACHE_PREFIX = 'po_approvals:throttle'
+
+# Concurrency slots are released at the end of the request, or after this long
+# if the process handling it died (seconds)
+SLOT_TIMEOUT = 60
+
+# Retry-After of requests over the concurrency limit (seconds)
+CONCURRENCY_RETRY_AFTER = 1
+
+
+def parse_rate(value):
+    """Parse a throttle rate.
+
+    Args:
+        value: Rate string such as "60/min", or an empty string
+
+    Returns:
+        Tuple of (requests, period seconds), or None if the rate is empty
+
+    Raises:
+        ValidationError: If the rate is malformed
+    """
+    value = (value or '').strip()
+
+    if not value:
+        return None
+
+    requests, _, period = value.partition('/')
+
+    try:
+        requests = int(requests)
+        duration = PERIODS[period.strip()[:1].lower()]
+    except (KeyError, ValueError):
+        raise ValidationError(f'Invalid rate "{value}", expected e.g. "60/min"')
+
+    if requests < 1:
+        raise ValidationError('The rate must allow at least one request')
+
+    return requests, duration
+
+
+def validate_rate(value):
+    """Validator for the throttle rate settings."""
+    parse_rate(value)
+
+
+def get_setting(name, default=None):
+    """Read a plugin setting, or the default if the plugin is not loaded."""
+    from plugin import registry
+
+    plugin = registry.get_plugin('approvals')
+
+    return plugin.get_setting(name) if plugin else default
+
+
+def record_throttled(view, throttle):
+    """Count a request rejected by a throttle."""
+    metrics.registry.inc('po_approvals_throttled_total', {
+        'view': type(view).__name__,
+        'throttle': throttle,
+    })
+
+
+class PluginRateThrottle(SimpleRateThrottle):
+    """Request rate limit configured by a plugin setting."""
+
+    # Plugin setting holding the rate
+    setting = None
+
+    cache_format = f'{CACHE_PREFIX}:%(scope)s:%(ident)s'
+
+    def get_rate(self):
+        """Read the rate from the plugin setting (None disables the throttle)."""
+        value = get_setting(self.setting, '')
+
+        try:
+            return value if parse_rate(value) else None
+        except ValidationError:
+            return None
+
+    def parse_rate(self, rate):
+        """Parse the rate into (requests, duration)."""
+        return parse_rate(rate) or (None, None)
+
+    def allow_request(self, request, view):
+        """Check the request against the rate."""
+        if super().allow_request(request, view):
+            return True
+
+        record_throttled(view, self.scope)
+        return False
+
+
+class UserRateThrottle(PluginRateThrottle):
+    """Limits the request rate of each user."""
+
+    scope = 'user'
+    setting = 'THROTTLE_USER_RATE'
+
+    def get_cache_key(self, request, view):
+        """Key the history by user (or client address for anonymous requests)."""
+        if request.user and request.user.is_authenticated:
+            ident = request.user.pk
+        else:
+            ident = self.get_ident(request)
+
+        return self.cache_format % {'scope': self.scope, 'ident': ident}
+
+
+class GlobalRateThrottle(PluginRateThrottle):
+    """Limits the request rate of all users together."""
+
+    scope = 'global'
+    setting = 'THROTTLE_GLOBAL_RATE'
+
+    def get_cache_key(self, request, view):
+        """Key the history by scope only."""
+        return self.cache_format % {'scope': self.scope, 'ident': 'all'}
+
+
+class ConcurrencyThrottle(BaseThrottle):
+    """Limits the requests to one view which are in progress at the same time.
+
+    The limit is a set of THROTTLE_CONCURRENCY slots in the cache, claimed
+    with cache.add(). The claimed slot is stored on the request, and
+    released by ThrottledViewMixin once the response is finalized.
+    """
+
+    SLOT_KEY = CACHE_PREFIX + ':concurrency:{view}:{slot}'
+
+    def allow_request(self, request, view):
+        """Claim a free concurrency slot of the view."""
+        try:
+            limit = int(get_setting('THROTTLE_CONCURRENCY', 0) or 0)
+        except (TypeError, ValueError):
+            limit = 0
+
+        if limit <= 0:
+            return True
+
+        token = uuid.uuid4().hex
+
+        # Starting at a random slot spreads the claims over the slots
+        start = random.randrange(limit)
+
+        for offset in range(limit):
+            key = self.SLOT_KEY.format(view=type(view).__name__, slot=(start + offset) % limit)
+
+            if cache.add(key, token, SLOT_TIMEOUT):
+                request._po_approvals_slot = (key, token)
+                return True
+
+        record_throttled(view, 'concurrency')
+        return False
+
+    def wait(self):
+        """Seconds until a slot is likely to be free."""
+        return CONCURRENCY_RETRY_AFTER
+
+
+def release_slot(request):
+    """Release the concurrency slot claimed by a request, if any."""
+    slot = getattr(request, '_po_approvals_slot', None)
+
+    if slot is None:
+        return
+
+    key, token = slot
+    request._po_approvals_slot = None
+
+    # The slot may have timed out and been claimed by another request
+    if cache.get(key) == token:
+        cache.delete(key)
+
+
+class ThrottledViewMixin:
+    """APIView mixin which applies the rate and concurrency limits."""
+
+    throttle_classes = [UserRateThrottle, GlobalRateThrottle, ConcurrencyThrottle]
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        """Release the concurrency slot, whatever the outcome of the request."""
+        release_slot(request)
+
+        return super().finalize_response(request, response, *args, **kwargs)
@@ -0,0 +1,390 @@
+"""Outbound event webhooks for the PO Approvals plugin.
+
+Subscriptions are configured as a JSON list in the WEBHOOK_SUBSCRIPTIONS
+setting:
+
+    [
+        {"url": "https://erp.example.com/hooks/approvals", "secret": "s3cret"},
+        {"url": "https://chat.example.com/hook", "secret": "k3y", "events": ["approval.rejected"]}
+    ]
+
+Without "events", a subscription receives every event in EVENTS.
+
+Events are delivered in the background, after the database transaction
+which produced them has been committed. Each endpoint has its own queue,
+and at most one delivery in flight: events which arrive while a delivery
+is pending or running are sent together, as one batch:
+
+    POST <url>
+    X-Approvals-Timestamp: 1700000000
+    X-Approvals-Signature: sha256=<hex HMAC-SHA256 of "<timestamp>.<body>" with the secret>
+
+    {"events": [{"id": "...", "event": "approval.approved", "timestamp": "...", "order": {...}, ...}]}
+
+Failed deliveries are retried with exponential backoff, up to MAX_ATTEMPTS,
+after which the batch is dropped. Deliveries run on a bounded pool of
+WEBHOOK_WORKERS threads; as an endpoint only ever uses one of them, a slow
+or failing subscriber does not delay the others, and never the request.
+
+Queued events are kept in memory, so events which have not been delivered
+when the server process stops are lost.
+"""
+
+import hashlib
+import heapq
+import hmac
+import itertools
+import json
+import os
+import random
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from django.core.exceptions import ValidationError
+
+import structlog
+
+logger = structlog.get_logger('inventree')
+
+EVENTS = (
+    'approval.requested',
+    'approval.approved',
+    'approval.rejected',
+    'approval.auto_approved',
+)
+
+SIGNATURE_HEADER = 'X-Approvals-Signature'
+TIMESTAMP_HEADER = 'X-Approvals-Timestamp'
+
+# Events queued for an endpoint are held this long before sending, so that events
+# raised together (e.g. by one request or sweep) go in one batch (seconds)
+BATCH_DELAY = 0.2
+
+# Maximum events per request
+MAX_BATCH = 100
+
+# Maximum events queued per endpoint; further events are dropped
+MAX_QUEUE = 1000
+
+# Timeout of a single delivery (seconds)
+TIMEOUT = 5
+
+# Deliveries of a batch before it is dropped
+MAX_ATTEMPTS = 5
+
+# Delay before the first retry, doubled for each further retry (seconds)
+RETRY_BACKOFF = 2
+
+
+def parse_subscriptions(value):
+    """Parse and validate the webhook subscriptions.
+
+    Args:
+        value: JSON string from the WEBHOOK_SUBSCRIPTIONS setting
+
+    Returns:
+        List of subscription dicts, each with 'url', 'secret' and 'events'
+
+    Raises:
+        ValidationError: If the subscriptions are malformed
+    """
+    if not value:
+        return []
+
+    try:
+        subscriptions = json.loads(value)
+    except ValueError as e:
+        raise ValidationError(f'Invalid JSON: {e}')
+
+    if not isinstance(subscriptions, list):
+        raise ValidationError('Webhook subscriptions must be a JSON list')
+
+    for index, subscription in enumerate(subscriptions):
+        if not isinstance(subscription, dict):
+            raise ValidationError(f'Subscription {index + 1} must be a JSON object')
+
+        url = subscription.get('url')
+        if not isinstance(url, str) or not url.startswith(('http://', 'https://')):
+            raise ValidationError(f'Subscription {index + 1} must have an http(s) "url"')
+
+        if not isinstance(subscription.get('secret'), str) or not subscription['secret']:
+            raise ValidationError(f'Subscription {index + 1} must have a "secret"')
+
+        events = subscription.setdefault('events', list(EVENTS))
+        if not isinstance(events, list):
+            raise ValidationError(f'Subscription {index + 1} "events" must be a list')
+
+        unknown = set(events) - set(EVENTS)
+        if unknown:
+            raise ValidationError(
+                f'Subscription {index + 1} has unknown events: {", ".join(sorted(unknown))}'
+            )
+
+    return subscriptions
+
+
+def validate_subscriptions(value):
+    """Validator for the WEBHOOK_SUBSCRIPTIONS setting."""
+    parse_subscriptions(value)
+
+
+def sign(secret, timestamp, body):
+    """Compute the signature header value of a request body."""
+    digest = hmac.new(secret.encode(), f'{timestamp}.'.encode() + body, hashlib.sha256).hexdigest()
+    return f'sha256={digest}'
+
+
+def post_batch(url, secret, events):
+    """Send a batch of events to an endpoint.
+
+    Returns:
+        True if the endpoint accepted the batch (2xx response)
+    """
+    import requests
+
+    body = json.dumps({'events': events}, separators=(',', ':'), default=str).encode()
+    timestamp = str(int(time.time()))
+
+    try:
+        response = requests.post(
+            url,
+            data=body,
+            headers={
+                'Content-Type': 'application/json',
+                TIMESTAMP_HEADER: timestamp,
+                SIGNATURE_HEADER: sign(secret, timestamp, body),
+            },
+            timeout=TIMEOUT,
+        )
+    except requests.RequestException as e:
+        logger.warning('Webhook delivery failed', url=url, events=len(events), error=str(e))
+        return False
+
+    if not 200 <= response.status_code < 300:
+        logger.warning('Webhook delivery failed', url=url, events=len(events), status_code=response.status_code)
+        return False
+
+    return True
+
+
+class Endpoint:
+    """Queue and delivery state of one webhook URL."""
+
+    def __init__(self, url, secret):
+        """Initialize the endpoint."""
+        self.url = url
+        self.secret = secret
+        self.queue = deque()
+        # A delivery is scheduled or running
+        self.busy = False
+        # Failed deliveries of the batch at the head of the queue
+        self.attempts = 0
+
+
+class WebhookDispatcher:
+    """Delivers queued events to their endpoints on a bounded thread pool.
+
+    A single timer thread schedules the deliveries (after BATCH_DELAY, or
+    the retry backoff), and hands them to the pool when they are due.
+    """
+
+    def __init__(self, workers, send=post_batch):
+        """Initialize the dispatcher.
+
+        Args:
+            workers: Maximum number of concurrent deliveries
+            send: Function of (url, secret, events) which delivers a batch, returning True on success
+        """
+        self.workers = workers
+        self.send = send
+        self.pid = os.getpid()
+
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='po-approvals-webhook')
+        self.lock = threading.Condition()
+        self.endpoints = {}
+        self.schedule = []
+        self.sequence = itertools.count()
+        self.stopped = False
+
+        self.timer = threading.Thread(target=self.run_timer, name='po-approvals-webhook-timer', daemon=True)
+        self.timer.start()
+
+    def enqueue(self, subscriptions, event):
+        """Queue an event for delivery to the given subscriptions."""
+        with self.lock:
+            for subscription in subscriptions:
+                endpoint = self.endpoints.get(subscription['url'])
+
+                if endpoint is None:
+                    endpoint = self.endpoints[subscription['url']] = Endpoint(subscription['url'], subscription['secret'])
+
+                endpoint.secret = subscription['secret']
+
+                # The head of the queue may be in flight, so the new event is dropped
+                if len(endpoint.queue) >= MAX_QUEUE:
+                    logger.warning('Webhook queue full, event dropped', url=endpoint.url, event=event['event'])
+                    continue
+
+                endpoint.queue.append(event)
+
+                if not endpoint.busy:
+                    endpoint.busy = True
+                    self.schedule_delivery(endpoint, BATCH_DELAY)
+
+    def schedule_delivery(self, endpoint, delay):
+        """Schedule the next delivery of an endpoint (the lock must be held)."""
+        heapq.heappush(self.schedule, (time.monotonic() + delay, next(self.sequence), endpoint))
+        self.lock.notify()
+
+    def run_timer(self):
+        """Hand due deliveries to the thread pool."""
+        with self.lock:
+            while not self.stopped:
+                if not self.schedule:
+                    self.lock.wait()
+                    continue
+
+                due, _, endpoint = self.schedule[0]
+                remaining = due - time.monotonic()
+
+                if remaining > 0:
+                    self.lock.wait(remaining)
+                    continue
+
+                heapq.heappop(self.schedule)
+                self.executor.submit(self.deliver, endpoint)
+
+    def deliver(self, endpoint):
+        """Send the next batch of an endpoint, and schedule what follows."""
+        from . import metrics
+
+        with self.lock:
+            batch = list(itertools.islice(endpoint.queue, MAX_BATCH))
+
+        start = time.perf_counter()
+
+        try:
+            sent = bool(batch) and self.send(endpoint.url, endpoint.secret, batch)
+        except Exception:
+            logger.exception('Webhook delivery failed', url=endpoint.url)
+            sent = False
+
+        if batch:
+            metrics.registry.inc('po_approvals_notifications_total', {
+                'channel': 'webhook',
+                'result': 'success' if sent else 'failure',
+            })
+            metrics.registry.observe(
+                'po_approvals_notification_duration_seconds', {'channel': 'webhook'}, time.perf_counter() - start
+            )
+
+        with self.lock:
+            if sent or endpoint.attempts + 1 >= MAX_ATTEMPTS:
+                if not sent:
+                    logger.error('Webhook batch dropped after retries', url=endpoint.url, events=len(batch))
+
+                # Events queued meanwhile stay behind the batch, which is still at the head
+                for _ in batch:
+                    endpoint.queue.popleft()
+
+                endpoint.attempts = 0
+                delay = 0
+            else:
+                endpoint.attempts += 1
+                delay = RETRY_BACKOFF * 2 ** (endpoint.attempts - 1) * random.uniform(0.8, 1.2)
+
+            if endpoint.queue and not self.stopped:
+                self.schedule_delivery(endpoint, delay)
+            else:
+                endpoint.busy = False
+
+    def pending(self):
+        """Number of events waiting for delivery."""
+        with self.lock:
+            return sum(len(endpoint.queue) for endpoint in self.endpoints.values())
+
+    def shutdown(self, wait=False):
+        """Stop scheduling deliveries."""
+        with self.lock:
+            self.stopped = True
+            self.lock.notify()
+
+        self.executor.shutdown(wait=wait)
+
+
+_dispatcher = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_dispatcher(plugin):
+    """Get the dispatcher of this process, sized by the WEBHOOK_WORKERS setting."""
+    global _dispatcher
+
+    workers = max(int(plugin.get_setting('WEBHOOK_WORKERS') or 1), 1)
+
+    with _dispatcher_lock:
+        # Threads do not survive a fork, so each worker process needs its own dispatcher
+        if _dispatcher is None or _dispatcher.pid != os.getpid() or _dispatcher.workers != workers:
+            if _dispatcher is not None and _dispatcher.pid == os.getpid():
+                _dispatcher.shutdown()
+
+            _dispatcher = WebhookDispatcher(workers)
+
+        return _dispatcher
+
+
+def get_subscriptions(plugin, event):
+    """Get the subscriptions which receive an event."""
+    try:
+        subscriptions = parse_subscriptions(plugin.get_setting('WEBHOOK_SUBSCRIPTIONS', ''))
+    except ValidationError:
+        return []
+
+    return [subscription for subscription in subscriptions if event in subscription['events']]
+
+
+def order_payload(order):
+    """Describe an order in an event, from its loaded fields only."""
+    deferred = order.get_deferred_fields()
+
+    data = {
+        'pk': order.pk,
+        'reference': None if 'reference' in deferred else order.reference,
+        'supplier': None if 'supplier_id' in deferred else order.supplier_id,
+    }
+
+    if 'total_price' not in deferred:
+        data['total_price'] = str(order.total_price) if order.total_price else None
+
+    return data
+
+
+def publish(plugin, event, order, **data):
+    """Queue an event for its subscribers, once the current transaction commits.
+
+    Args:
+        plugin: The plugin instance
+        event: One of EVENTS
+        order: The PurchaseOrder the event is about
+        **data: Further event fields (e.g. the approval dict)
+    """
+    from django.db import transaction
+
+    subscriptions = get_subscriptions(plugin, event)
+
+    if not subscriptions:
+        return
+
+    payload = {
+        'id': uuid.uuid4().hex,
+        'event': event,
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'order': order_payload(order),
+        **data,
+    }
+
+    transaction.on_commit(lambda: get_dispatcher(plugin).enqueue(subscriptions, payload))